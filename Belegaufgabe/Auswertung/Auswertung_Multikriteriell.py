@@ -1,4 +1,5 @@
-import pandas as pd
+import sys
+from pathlib import Path
 import matplotlib.pyplot as plt
 from mpl_toolkits.axes_grid1.inset_locator import inset_axes, mark_inset
 
@@ -7,6 +8,11 @@ import os
 # Ordner wechseln, damit die CSV-Dateien gefunden werden
 os.chdir(os.path.dirname(__file__))
 
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
+from results_store import ResultsStore, import_legacy_csv, latest_run, load_evaluations
+from pareto import archive_front, hypervolume_over_time
+from density_plot import density_plot, overlay_points
+
 colors = [
     "#4C72B0",
     "#DD8452",
@@ -18,8 +24,21 @@ colors = [
     "#7d7d7d",
 ]
 
-df_pareto = pd.read_csv("pareto_CH4_vs_Vcat.csv")
-df_all = pd.read_csv("all_evaluated_points.csv")
+# Daten aus dem Ergebnis-Speicher (beim ersten Mal werden die alten CSVs übernommen)
+store = ResultsStore("../Ergebnisse")
+if not store.has("evaluations"):
+    import_legacy_csv(store, all_points_csv="all_evaluated_points.csv",
+                      pareto_csv="pareto_CH4_vs_Vcat.csv")
+run_id = latest_run(store)
+
+# Front direkt aus dem Archiv (inkl. T_max-Grenze des Laufs), nicht nur der pymoo-Export
+runs = store.read("runs", columns=["Tmax_allowed_K"], filters=[("run_id", "==", run_id)])
+Tmax_allowed = runs["Tmax_allowed_K"].dropna().iloc[0] if runs["Tmax_allowed_K"].notna().any() else None
+
+df_pareto = archive_front(store, run_ids=[run_id], Tmax_allowed=Tmax_allowed)
+df_all = load_evaluations(store, run_id, columns=["CH4_out", "Vcat_m3", "failed"])
+# fehlgeschlagene Läufe (Strafwert CH4_out = 1e3) nicht mit darstellen
+df_all = df_all[~df_all["failed"].fillna(False).astype(bool) & (df_all["CH4_out"] < 1e3)]
 
 pareto_ch4_out = df_pareto["CH4_out"]
 all_ch4_out    = df_all["CH4_out"]
@@ -27,19 +46,34 @@ all_ch4_out    = df_all["CH4_out"]
 pareto_Vcat_out = df_pareto["Vcat_m3"]
 all_Vcat_out    = df_all["Vcat_m3"]
 
+# ab so vielen Punkten Dichte-Raster statt Scatter (Raster werden gecacht, das Inset
+# bekommt ein eigenes Raster über seinem Fenster)
+DENSITY_FROM = 20_000
+use_density = len(df_all) > DENSITY_FROM
+raster_cache = "img/.raster_cache"
+
+# >>> ZOOM-BEREICH (hier ggf. feinjustieren) <<<
+zoom_xlim = (0.0002, 0.003)
+zoom_ylim = (1e-7, 5e-7)
+
 # === Hauptplot ===
 fig, ax = plt.subplots(figsize=(7,5))
 
-ax.scatter(
-    all_ch4_out,
-    all_Vcat_out,
-    label="Alle Punkte",
-    color=colors[-1],
-    marker="+",
-    s=20
-)
-
-ax.scatter(
+if use_density:
+    density_plot(ax, all_ch4_out, all_Vcat_out, cache_dir=raster_cache)
+    ax.plot([], [], color=colors[-1], marker="s", ls="", label="Alle Punkte (Dichte)")
+else:
+    ax.scatter(
+        all_ch4_out,
+        all_Vcat_out,
+        label="Alle Punkte",
+        color=colors[-1],
+        marker="+",
+        s=20
+    )
+
+overlay_points(
+    ax,
     pareto_ch4_out,
     pareto_Vcat_out,
     label="Pareto-Front",
@@ -66,15 +100,21 @@ axins = inset_axes(
     borderpad=1
 )
 
-axins.scatter(
-    all_ch4_out,
-    all_Vcat_out,
-    color=colors[-1],
-    marker="+",
-    s=12
-)
-
-axins.scatter(
+if use_density:
+    # eigenes Raster nur über dem Zoom-Fenster
+    density_plot(axins, all_ch4_out, all_Vcat_out, xlim=zoom_xlim, ylim=zoom_ylim,
+                 cache_dir=raster_cache)
+else:
+    axins.scatter(
+        all_ch4_out,
+        all_Vcat_out,
+        color=colors[-1],
+        marker="+",
+        s=12
+    )
+
+overlay_points(
+    axins,
     pareto_ch4_out,
     pareto_Vcat_out,
     color="red",
@@ -89,14 +129,24 @@ axins.tick_params(
     labelbottom=False
 )
 
-# >>> ZOOM-BEREICH (hier ggf. feinjustieren) <<<
-axins.set_xlim(0.0002, 0.003)
-axins.set_ylim(1e-7, 5e-7)
+axins.set_xlim(*zoom_xlim)
+axins.set_ylim(*zoom_ylim)
 
 axins.grid()
 
 # Verbindung Hauptplot ↔ Zoom
 mark_inset(ax, axins, loc1=2, loc2=4, fc="none", ec="0.4")
 
+# === Hypervolumen über die Generationen (alle Läufe, gemeinsamer Referenzpunkt) ===
+df_hv = hypervolume_over_time(store, Tmax_allowed=Tmax_allowed)
+
+fig_hv, ax_hv = plt.subplots(figsize=(7,4))
+for k, (rid, grp) in enumerate(df_hv.groupby("run_id")):
+    ax_hv.plot(grp["n_evals"], grp["hypervolume"], label=rid, color=colors[k % len(colors)])
+ax_hv.set_xlabel("Auswertungen")
+ax_hv.set_ylabel("Hypervolumen")
+ax_hv.grid()
+ax_hv.legend(loc="lower right", fontsize=7)
+
 plt.show()
 #plt.savefig("img/Pareto_front_zoom", dpi=500)
\ No newline at end of file
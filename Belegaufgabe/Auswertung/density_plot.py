@@ -0,0 +1,180 @@
+# density_plot.py
+"""
+Dichte-Darstellung für sehr viele Punkte (statt ax.scatter).
+
+Bei 10^5 - 10^6 Auswertungen (Sweeps, mehrere Läufe) ist ein Scatter-Plot mit
+Haupt- und Zoom-Achse kaum noch zu zeichnen. Hier werden die Punkte mit NumPy in
+ein 2-D-Histogramm (Raster) einsortiert und als Bild gezeichnet:
+
+  - Binning über Index-Berechnung + np.bincount (schneller als np.histogram2d)
+  - log-Achsen: Bins im log10-Raum (gleich breit auf der log-Achse)
+  - lineare Achsen: imshow; log-Achsen: pcolormesh mit den log-verteilten Kanten
+    (imshow kann auf log-Achsen nicht korrekt entzerren)
+  - Raster-Cache über Hash der Daten + Binning-Parameter (Speicher, optional Platte):
+    ein zweiter Aufruf mit denselben Daten und Grenzen (z.B. ein erneuter Plot)
+    kostet kein Binning
+  - ein feines Raster (fine_bins) über die volle Ausdehnung wird einmal gebinnt; Hauptplot
+    und Zoom-Inset (xlim/ylim) schneiden daraus ihr Fenster aus und fassen Zellen auf
+    ~bins zusammen -> ein weiteres Inset / anderer Zoom kostet kein neues Binning.
+    Nur wenn das Fenster weniger feine Zellen als bins enthält, wird dort neu gebinnt
+  - Strafwerte fehlgeschlagener Läufe (CH4_out = 1e3) vorher herausfiltern, sie spannen
+    sonst die Achse auf und alle echten Punkte landen in wenigen Zellen
+  - Pareto-Punkte bleiben Vektor-Marker darüber (overlay_points)
+
+    art = density_plot(ax, x, y, xscale="log", cache_dir="img/.raster_cache")
+    density_plot(axins, x, y, xlim=(2e-4, 3e-3), ylim=(1e-7, 5e-7), xscale="log",
+                 cache_dir="img/.raster_cache")
+    overlay_points(ax, x_pareto, y_pareto, color="red")
+"""
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+from matplotlib.colors import LogNorm, Normalize
+
+_MEM_CACHE = OrderedDict()
+_MEM_CACHE_SIZE = 16
+
+
+def _limits(v, lim, log):
+    if lim is not None:
+        return float(lim[0]), float(lim[1])
+    v = v[v > 0] if log else v
+    if not v.size:
+        return (1.0, 10.0) if log else (0.0, 1.0)      # keine Punkte -> leeres Raster
+    return float(v.min()), float(v.max())
+
+
+def raster_key(x, y, bins, xlim, ylim, xscale, yscale) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(x, dtype=float).tobytes())
+    h.update(np.ascontiguousarray(y, dtype=float).tobytes())
+    h.update(repr((tuple(bins), xlim, ylim, xscale, yscale)).encode())
+    return h.hexdigest()
+
+
+def density_raster(x, y, bins=(400, 300), xlim=None, ylim=None, xscale="linear", yscale="linear",
+                   cache_dir=None):
+    """
+    Counts per raster cell. Returns (H, xedges, yedges) with H[iy, ix] (image
+    orientation); edges are in data units (log-spaced for log axes).
+    """
+    x = np.asarray(x, dtype=float).ravel()
+    y = np.asarray(y, dtype=float).ravel()
+    key = raster_key(x, y, bins, xlim, ylim, xscale, yscale)
+
+    if key in _MEM_CACHE:
+        _MEM_CACHE.move_to_end(key)
+        return _MEM_CACHE[key]
+    path = os.path.join(cache_dir, key + ".npz") if cache_dir else None
+    if path and os.path.exists(path):
+        with np.load(path) as z:
+            out = (z["H"], z["xedges"], z["yedges"])
+        _remember(key, out)
+        return out
+
+    xlog, ylog = xscale == "log", yscale == "log"
+    ok = np.isfinite(x) & np.isfinite(y)
+    if xlog:
+        ok &= x > 0
+    if ylog:
+        ok &= y > 0
+    x, y = x[ok], y[ok]
+    x0, x1 = _limits(x, xlim, xlog)
+    y0, y1 = _limits(y, ylim, ylog)
+    u = np.log10(x) if xlog else x
+    v = np.log10(y) if ylog else y
+    u0, u1 = (np.log10(x0), np.log10(x1)) if xlog else (x0, x1)
+    v0, v1 = (np.log10(y0), np.log10(y1)) if ylog else (y0, y1)
+
+    nx, ny = int(bins[0]), int(bins[1])
+    ix = np.floor((u - u0) / ((u1 - u0) or 1.0) * nx).astype(np.int64)
+    iy = np.floor((v - v0) / ((v1 - v0) or 1.0) * ny).astype(np.int64)
+    ix[ix == nx] = nx - 1              # rechter/oberer Rand gehört zur letzten Zelle
+    iy[iy == ny] = ny - 1
+    inside = (ix >= 0) & (ix < nx) & (iy >= 0) & (iy < ny)
+    H = np.bincount(iy[inside] * nx + ix[inside], minlength=nx * ny).reshape(ny, nx).astype(np.int32)
+
+    xedges = np.linspace(u0, u1, nx + 1)
+    yedges = np.linspace(v0, v1, ny + 1)
+    out = (H, 10.0 ** xedges if xlog else xedges, 10.0 ** yedges if ylog else yedges)
+
+    _remember(key, out)
+    if path:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez_compressed(path, H=out[0], xedges=out[1], yedges=out[2])
+    return out
+
+
+def _coarsen(H, xe, ye, fx, fy):
+    # Blöcke von fy x fx Zellen summieren (letzter Block ggf. schmaler)
+    ix, iy = np.arange(0, H.shape[1], fx), np.arange(0, H.shape[0], fy)
+    H = np.add.reduceat(np.add.reduceat(H, iy, axis=0), ix, axis=1)
+    return H, np.append(xe[ix], xe[-1]), np.append(ye[iy], ye[-1])
+
+
+def _window(edges, lim):
+    # Zellindizes [i0, i1), die das Fenster lim überdecken
+    if lim is None:
+        return 0, len(edges) - 1
+    i0 = int(np.searchsorted(edges, lim[0], side="right")) - 1
+    i1 = int(np.searchsorted(edges, lim[1], side="left"))
+    return max(i0, 0), min(i1, len(edges) - 1)
+
+
+def zoom_raster(x, y, bins=(400, 300), xlim=None, ylim=None, xscale="linear", yscale="linear",
+                fine_bins=(2000, 1500), cache_dir=None):
+    """
+    Raster for the window xlim/ylim with about `bins` cells, cut from one fine
+    full-extent raster (fine_bins, cached) and coarsened. Rebins only the window
+    when it holds fewer fine cells than `bins`. Returns (H, xedges, yedges).
+    """
+    H, xe, ye = density_raster(x, y, fine_bins, None, None, xscale, yscale, cache_dir)
+    (x0, x1), (y0, y1) = _window(xe, xlim), _window(ye, ylim)
+    nx, ny = x1 - x0, y1 - y0
+    if nx < int(bins[0]) or ny < int(bins[1]):
+        return density_raster(x, y, bins, xlim, ylim, xscale, yscale, cache_dir)
+    return _coarsen(H[y0:y1, x0:x1], xe[x0:x1 + 1], ye[y0:y1 + 1],
+                    nx // int(bins[0]), ny // int(bins[1]))
+
+
+def _uniform(edges):
+    d = np.diff(edges)
+    return np.allclose(d, d[0])
+
+
+def _remember(key, value):
+    _MEM_CACHE[key] = value
+    while len(_MEM_CACHE) > _MEM_CACHE_SIZE:
+        _MEM_CACHE.popitem(last=False)
+
+
+def density_plot(ax, x, y, bins=(400, 300), xlim=None, ylim=None, xscale="linear", yscale="linear",
+                 cmap="Greys", log_counts=True, cache_dir=None, fine_bins=(2000, 1500), **kwargs):
+    """
+    Draw the point density of (x, y) on `ax` (raster from zoom_raster, so main plot
+    and insets share one binning). Empty cells stay transparent.
+    Returns the image / mesh artist (for a colorbar).
+    """
+    H, xe, ye = zoom_raster(x, y, bins, xlim, ylim, xscale, yscale, fine_bins, cache_dir)
+    Hm = np.ma.masked_equal(H, 0)
+    vmax = max(int(H.max()), 1)
+    norm = LogNorm(vmin=1, vmax=vmax) if log_counts else Normalize(vmin=0, vmax=vmax)
+
+    ax.set_xscale(xscale)
+    ax.set_yscale(yscale)
+    if xscale == "linear" and yscale == "linear" and _uniform(xe) and _uniform(ye):
+        art = ax.imshow(Hm, origin="lower", extent=(xe[0], xe[-1], ye[0], ye[-1]), aspect="auto",
+                        interpolation="nearest", cmap=cmap, norm=norm, **kwargs)
+    else:
+        art = ax.pcolormesh(xe, ye, Hm, cmap=cmap, norm=norm, shading="flat", **kwargs)
+    return art
+
+
+def overlay_points(ax, x, y, **kwargs):
+    """Vector markers on top of a density raster (e.g. the Pareto front)."""
+    kwargs.setdefault("marker", "x")
+    kwargs.setdefault("s", 20)
+    kwargs.setdefault("zorder", 3)
+    return ax.scatter(x, y, **kwargs)
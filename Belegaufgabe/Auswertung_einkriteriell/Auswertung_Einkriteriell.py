@@ -1,19 +1,29 @@
 # plot_results.py
+import sys
+from pathlib import Path
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import os 
 
 os.chdir(os.path.dirname(__file__))
 
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
+from results_store import ResultsStore, import_legacy_csv, latest_run, load_history
+
 CSV = "optimization_history_einkriteriell.csv"
 
-def plot_history(csv_path=CSV):
-    df = pd.read_csv(csv_path)
+def plot_history(run_id=None, store_root="../Ergebnisse"):
+    # Verlauf aus dem Ergebnis-Speicher (beim ersten Mal wird die alte CSV übernommen)
+    store = ResultsStore(store_root)
+    if not store.has("history"):
+        import_legacy_csv(store, history_csv=CSV)
+    if run_id is None:
+        run_id = latest_run(store, "history")
+    df = load_history(store, run_id)
 
     it = df["iteration"].to_numpy()
     ch4 = df["CH4"].to_numpy()
-    av = df["cat_area_per_vol_1_per_cm"].to_numpy()
+    av = df["A_over_V_1_per_cm"].to_numpy()
     d = df["diameter_cm"].to_numpy()
     eps = df["porosity"].to_numpy()
 
@@ -0,0 +1,130 @@
+# Runtime_Async.py
+# Benchmark: generationsweise (scipy-DE / pymoo-NSGA-II) vs. asynchron steady-state
+# Gemessen: Durchsatz (evals/s) und time-to-target (erste Zeit mit best CH4 <= target)
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
+
+import numpy as np
+import cantera as ct
+from scipy import optimize
+
+from Kaskade_Klasse import CSTRCascadeModel, cm
+from kaskade_worker import preload_model, objective_point, objectives_point
+from optimize_kaskade_async import async_de, async_nsga2, time_to_target, throughput
+
+
+def build_model():
+    return CSTRCascadeModel(
+        yaml_file="methane_pox_on_pt.yaml",
+        tc_C=800.0,
+        p_Pa=1 * ct.one_atm,
+        length_m=0.3 * cm,
+        mass_flow_rate_kg_s=1e-6,
+        n_cstr=200,
+        gas_comp="CH4:1, O2:0.6, AR:0.1",
+        energy_enabled=True,
+    )
+
+
+BOUNDS = [(1000.0, 2000.0), (1.0, 3.0), (0.2, 0.5)]
+
+
+def run_generational_de(pool, pop_size, max_evals, seed):
+    """scipy-DE (updating="deferred"); History wird pro Generation im map-Wrapper erfasst."""
+    history = []
+    state = {"n": 0, "best": np.inf}
+    t0 = time.perf_counter()
+
+    def timed_map(func, iterable):
+        vals = list(pool.map(func, iterable))
+        state["n"] += len(vals)
+        state["best"] = min(state["best"], min(vals))
+        history.append((time.perf_counter() - t0, state["n"], state["best"]))
+        return vals
+
+    # scipy: popsize ist Multiplikator pro Parameter
+    maxiter = max(1, max_evals // pop_size - 1)
+    optimize.differential_evolution(
+        objective_point,
+        bounds=BOUNDS,
+        popsize=max(1, pop_size // len(BOUNDS)),
+        maxiter=maxiter,
+        workers=timed_map,
+        updating="deferred",
+        polish=False,
+        tol=0.0,
+        seed=seed,
+    )
+    return history
+
+
+def make_problem(model, pool):
+    from optimize_kaskade_multikriteriell import CatMultiObjectiveProblem
+    return CatMultiObjectiveProblem(model, xl=[b[0] for b in BOUNDS], xu=[b[1] for b in BOUNDS],
+                                    Tmax_allowed=2800.0, evaluator=pool)
+
+
+def run_generational_nsga2(model, pool, pop_size, n_gen, seed):
+    from pymoo.algorithms.moo.nsga2 import NSGA2
+    from pymoo.operators.crossover.sbx import SBX
+    from pymoo.operators.mutation.pm import PM
+    from pymoo.optimize import minimize
+    from pymoo.termination import get_termination
+
+    problem = make_problem(model, pool)
+    history = []
+    t0 = time.perf_counter()
+
+    def callback(algorithm):
+        F = algorithm.pop.get("F")
+        G = algorithm.pop.get("G")
+        feas = np.all(G <= 0.0, axis=1) if G is not None else np.ones(len(F), bool)
+        best = F[feas, 0].min() if feas.any() else np.inf
+        prev = history[-1][2] if history else np.inf
+        history.append((time.perf_counter() - t0, algorithm.evaluator.n_eval, min(best, prev)))
+
+    algo = NSGA2(pop_size=pop_size, crossover=SBX(prob=0.9, eta=8), mutation=PM(eta=10),
+                 eliminate_duplicates=True)
+    minimize(problem, algo, get_termination("n_gen", n_gen), seed=seed, callback=callback)
+    return history
+
+
+def report(label, history, target):
+    ttt = time_to_target(history, target)
+    ttt_s = f"{ttt:.1f} s" if ttt is not None else "nicht erreicht"
+    t, n, best = history[-1]
+    print(f"{label:<22} evals={n:5d}  wall={t:7.1f} s  {throughput(history):6.2f} evals/s  "
+          f"best CH4={best:.3e}  time-to-target={ttt_s}")
+
+
+def bench(n_workers=os.cpu_count(), pop_size=15, max_evals=600, target=None, seed=1):
+    model = build_model()
+
+    with ProcessPoolExecutor(n_workers, initializer=preload_model, initargs=(model.config,)) as pool:
+        print(f"\n--- Einkriteriell (objective_CH4), {n_workers} Worker, {max_evals} evals ---")
+        hist_gen = run_generational_de(pool, pop_size, max_evals, seed)
+        res_async = async_de(model, BOUNDS, pool, n_workers, pop_size=pop_size,
+                             max_evals=max_evals, seed=seed, func=objective_point)
+        # Ziel: bestes CH4 des generationsweisen Laufs (+1 %), falls nicht vorgegeben
+        tgt = target if target is not None else hist_gen[-1][2] * 1.01
+        report("DE generational", hist_gen, tgt)
+        report("DE async", res_async["history"], tgt)
+
+        print("\n--- Mehrkriteriell (CH4 vs. Vcat, T_max <= 2800 K) ---")
+        n_gen = max(1, max_evals // 50)
+        hist_nsga = run_generational_nsga2(model, pool, 50, n_gen, seed)
+        res_async_mo = async_nsga2(make_problem(model, pool), pool, n_workers, pop_size=50,
+                                   max_evals=hist_nsga[-1][1], seed=seed, func=objectives_point)
+        tgt = hist_nsga[-1][2] * 1.01
+        report("NSGA-II generational", hist_nsga, tgt)
+        report("NSGA-II async", res_async_mo["history"], tgt)
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,51 @@
+# Runtime_BO.py
+# Benchmark: scipy-DE (generationsweise) vs. Bayes'sche Optimierung mit Batch-Akquisition
+# Gemessen: Simulationen und Wandzeit, bis BO das End-CH4 von DE erreicht (time-to-equal-CH4)
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from kaskade_worker import preload_model
+from optimize_kaskade_async import time_to_target
+from optimize_kaskade_bo import bayes_opt
+from Runtime_Async import BOUNDS, build_model, run_generational_de
+
+
+def evals_to_target(history, target: float):
+    for _, n, best in history:
+        if best <= target:
+            return n
+    return None
+
+
+def report(label, history, target):
+    t, n, best = history[-1]
+    ttt = time_to_target(history, target)
+    ett = evals_to_target(history, target)
+    reached = f"{ttt:7.1f} s / {ett:5d} evals" if ttt is not None else "nicht erreicht"
+    print(f"{label:<18} evals={n:5d}  wall={t:7.1f} s  best CH4={best:.4e}  bis Ziel: {reached}")
+
+
+def bench(n_workers=os.cpu_count(), pop_size=15, de_evals=600, bo_evals=150, seed=1):
+    os.chdir(Path(__file__).resolve().parents[1] / "Simulation")
+    model = build_model()
+
+    with ProcessPoolExecutor(n_workers, initializer=preload_model, initargs=(model.config,)) as pool:
+        print(f"\n--- DE ({de_evals} evals) vs. BO ({bo_evals} evals), {n_workers} Worker ---")
+        hist_de = run_generational_de(pool, pop_size, de_evals, seed)
+        res_bo = bayes_opt(model, BOUNDS, pool, n_workers, max_evals=bo_evals, seed=seed)
+
+    # Ziel: End-CH4 von DE (+1 %)
+    target = hist_de[-1][2] * 1.01
+    print(f"Ziel CH4 <= {target:.4e}")
+    report("DE generational", hist_de, target)
+    report("BO (LP-Batch)", res_bo["history"], target)
+
+
+if __name__ == "__main__":
+    bench()
@@ -4,10 +4,9 @@ import sys
 from pathlib import Path
 import os 
 
-sys.path.append(str(Path(__file__).resolve().parents[1]))
-os.chdir(os.path.dirname(__file__))
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
 
-from Simulation.optimize_kaskade_einkriteriell import main
+from optimize_kaskade_einkriteriell import main
 
 
 def bench(n_runs=10):
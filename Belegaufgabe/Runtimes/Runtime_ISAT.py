@@ -0,0 +1,65 @@
+# Runtime_ISAT.py
+# Benchmark: Stufen-Lösung direkt (advance_to_steady_state) vs. über die ISAT-Tabelle
+# Gemessen: Wandzeit pro Design (erste / zweite Hälfte -> Aufwärmen der Tabelle),
+# Abweichung von CH4_out und T_max gegenüber der direkten Lösung, Tabellen-Statistik
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from Kaskade_Klasse import CSTRCascadeModel
+from optimize_kaskade_async import _lhs
+from Runtime_Async import BOUNDS, build_model
+
+
+def run_designs(model, X):
+    """(CH4, T_max, wall_s) per design; NaN for failed simulations."""
+    out = []
+    for x in X:
+        t0 = time.perf_counter()
+        try:
+            res = model.simulate(*x)
+            out.append((res["CH4"], res["T_max"], time.perf_counter() - t0))
+        except Exception:
+            out.append((np.nan, np.nan, time.perf_counter() - t0))
+    return np.array(out)
+
+
+def compare(label, ref, alt):
+    """Print runtime and accuracy of `alt` against the reference results `ref`."""
+    half = len(ref) // 2
+    ok = np.isfinite(ref[:, 0]) & np.isfinite(alt[:, 0])
+    err_ch4 = np.abs(alt[ok, 0] - ref[ok, 0]) / np.abs(ref[ok, 0])
+    err_T = np.abs(alt[ok, 1] - ref[ok, 1])
+    print(f"{label:<14} wall/Design: {alt[:half, 2].mean():7.3f} s (1. Hälfte)  "
+          f"{alt[half:, 2].mean():7.3f} s (2. Hälfte)  Speed-up {ref[:, 2].sum() / alt[:, 2].sum():5.2f}x")
+    if ok.any():
+        print(f"{'':<14} CH4 rel. Fehler: median {np.median(err_ch4):.2e}, max {err_ch4.max():.2e};  "
+              f"T_max: max {err_T.max():.2f} K;  fehlgeschlagen: {int((~ok).sum())}")
+
+
+def bench(n_designs=40, rtols=(1e-4, 1e-3), seed=1):
+    os.chdir(Path(__file__).resolve().parents[1] / "Simulation")
+    lo, hi = np.array(BOUNDS).T
+    X = _lhs(np.random.default_rng(seed), n_designs, lo, hi)
+
+    ref_model = build_model()
+    ref = run_designs(ref_model, X)
+    print(f"\n--- {n_designs} Designs, n_cstr={ref_model.n} ---")
+    print(f"{'direkt':<14} wall/Design: {ref[:, 2].mean():7.3f} s")
+
+    for rtol in rtols:
+        model = CSTRCascadeModel(**{**ref_model.config, "isat_rtol": rtol})
+        alt = run_designs(model, X)
+        compare(f"ISAT {rtol:.0e}", ref, alt)
+        print(f"{'':<14} {model.isat_stats}")
+
+
+if __name__ == "__main__":
+    bench()
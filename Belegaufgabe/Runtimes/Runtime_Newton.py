@@ -0,0 +1,51 @@
+# Runtime_Newton.py
+# Benchmark: Marschieren (gekoppelt / QSS) vs. ganze Kaskade als ein Newton-System
+# (engine="newton", Start aus grober Kaskade bzw. dem Profil des vorherigen Designs)
+# Gemessen: Wandzeit pro Design, Abweichung von CH4_out und T_max, Zerlegungen der Jacobi-Blöcke
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from Kaskade_Klasse import CSTRCascadeModel
+from optimize_kaskade_async import _lhs
+from Runtime_Async import BOUNDS, build_model
+from Runtime_ISAT import compare, run_designs
+
+
+def nearest_neighbour_path(X, lo, hi):
+    """Order designs so that consecutive ones are close (wie ein konvergierender Optimierer)."""
+    Z = (X - lo) / (hi - lo)
+    order, left = [0], list(range(1, len(X)))
+    while left:
+        d = np.linalg.norm(Z[left] - Z[order[-1]], axis=1)
+        order.append(left.pop(int(np.argmin(d))))
+    return X[order]
+
+
+def bench(n_designs=40, seed=1):
+    os.chdir(Path(__file__).resolve().parents[1] / "Simulation")
+    lo, hi = np.array(BOUNDS).T
+    X = nearest_neighbour_path(_lhs(np.random.default_rng(seed), n_designs, lo, hi), lo, hi)
+
+    ref_model = build_model()
+    ref = run_designs(ref_model, X)
+    print(f"\n--- {n_designs} Designs (Nachbar-Reihenfolge), n_cstr={ref_model.n} ---")
+    print(f"{'gekoppelt':<14} wall/Design: {ref[:, 2].mean():7.3f} s")
+
+    qss = CSTRCascadeModel(**{**ref_model.config, "surface_mode": "qss"})
+    compare("QSS marsch.", ref, run_designs(qss, X))
+    print(f"{'':<14} {qss.qss_stats}")
+
+    newton = CSTRCascadeModel(**{**ref_model.config, "surface_mode": "qss", "engine": "newton"})
+    compare("Newton", ref, run_designs(newton, X))
+    print(f"{'':<14} {newton.cascade_stats}")
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,39 @@
+# Runtime_QSS.py
+# Benchmark: gekoppelte Integration (Gas + Bedeckungen) vs. quasistationäre Bedeckungen
+# (surface_mode="qss", Stufe als Gasphasen-Newton) auf dem Belegaufgabe-Designraum
+# Gemessen: Wandzeit pro Design, Abweichung von CH4_out und T_max, Newton-Statistik
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "Simulation"))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from Kaskade_Klasse import CSTRCascadeModel
+from optimize_kaskade_async import _lhs
+from Runtime_Async import BOUNDS, build_model
+from Runtime_ISAT import compare, run_designs
+
+
+def bench(n_designs=40, seed=1):
+    os.chdir(Path(__file__).resolve().parents[1] / "Simulation")
+    lo, hi = np.array(BOUNDS).T
+    X = _lhs(np.random.default_rng(seed), n_designs, lo, hi)
+
+    for energy in (False, True):
+        ref_model = CSTRCascadeModel(**{**build_model().config, "energy_enabled": energy})
+        ref = run_designs(ref_model, X)
+        print(f"\n--- {n_designs} Designs, n_cstr={ref_model.n}, Energie {'an' if energy else 'aus'} ---")
+        print(f"{'gekoppelt':<14} wall/Design: {ref[:, 2].mean():7.3f} s")
+
+        model = CSTRCascadeModel(**{**ref_model.config, "surface_mode": "qss"})
+        alt = run_designs(model, X)
+        compare("QSS", ref, alt)
+        print(f"{'':<14} {model.qss_stats}")
+
+
+if __name__ == "__main__":
+    bench()
@@ -0,0 +1,107 @@
+# Runtime_Startup.py
+# Benchmark: Start-up der Worker-Prozesse (spawn) bis zur ersten Auswertung
+#   1) Kalt-Import einzelner Module in einem frischen Interpreter
+#   2) pro Worker: Zeit bis Initializer fertig (Modell gebaut) und bis erste Auswertung fertig,
+#      schlank (kaskade_worker) vs. mit den früheren Importen der Optimierer-Skripte
+
+import multiprocessing as mp
+import os
+import statistics as stats
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+SIM_DIR = Path(__file__).resolve().parents[1] / "Simulation"
+sys.path.append(str(SIM_DIR))
+
+from kaskade_worker import preload_model, startup_probe
+
+MODEL_KWARGS = dict(
+    yaml_file="methane_pox_on_pt.yaml",
+    tc_C=800.0,
+    p_Pa=101325.0,
+    length_m=0.3 * 0.01,
+    mass_flow_rate_kg_s=1e-6,
+    n_cstr=200,
+    gas_comp="CH4:1, O2:0.6, AR:0.1",
+    energy_enabled=True,
+)
+
+X_PROBE = [1500.0, 2.0, 0.35]
+
+# was ein Worker früher über optimize_kaskade_* / kaskade_cluster mitgeladen hat
+LEGACY_IMPORTS = ("matplotlib.pyplot", "scipy.optimize", "pymoo.algorithms.moo.nsga2",
+                  "pymoo.optimize", "pyarrow.dataset")
+
+IMPORT_TARGETS = ("kaskade_worker", "Kaskade_Klasse", "optimize_kaskade_einkriteriell",
+                  "optimize_kaskade_multikriteriell") + LEGACY_IMPORTS
+
+
+def preload_with_imports(modules, model_kwargs):
+    """Initializer emulating the old worker start-up: heavy imports, then the model."""
+    import importlib
+    for m in modules:
+        importlib.import_module(m)
+    preload_model(model_kwargs)
+
+
+def cold_import_s(module: str, repeats: int = 3) -> float:
+    """Best-of-n wall time of `import module` in a fresh interpreter (cwd = Simulation)."""
+    code = ("import time; t = time.perf_counter(); import " + module +
+            "; print(time.perf_counter() - t)")
+    best = float("inf")
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], cwd=SIM_DIR, capture_output=True, text=True)
+        if out.returncode != 0:
+            return float("nan")
+        best = min(best, float(out.stdout.strip().splitlines()[-1]))
+    return best
+
+
+def time_to_first_eval(n_workers: int, initializer, initargs, start_method: str = "spawn") -> list:
+    """
+    Fresh pool; one probe per worker (a barrier holds each worker after its first
+    evaluation). Returns per-worker dicts with seconds since pool creation.
+    """
+    ctx = mp.get_context(start_method)
+    with ctx.Manager() as manager:
+        barrier = manager.Barrier(n_workers)
+        t0 = time.time()
+        with ProcessPoolExecutor(n_workers, mp_context=ctx, initializer=initializer,
+                                 initargs=initargs) as pool:
+            futs = [pool.submit(startup_probe, X_PROBE, barrier) for _ in range(n_workers)]
+            res = [f.result() for f in futs]
+    for r in res:
+        r["ready_s"] = r["t_ready"] - t0
+        r["first_eval_s"] = r["t_first_eval"] - t0
+        r["eval_s"] = r["t_first_eval"] - r["t_eval_start"]
+    return res
+
+
+def report(label, res):
+    ready = [r["ready_s"] for r in res]
+    first = [r["first_eval_s"] for r in res]
+    ev = [r["eval_s"] for r in res]
+    heavy = sorted(set(m for r in res for m in r["heavy_modules"]))
+    print(f"{label:<20} workers={len(res):3d}  ready mean/max={stats.mean(ready):6.2f}/{max(ready):6.2f} s  "
+          f"first eval mean/max={stats.mean(first):6.2f}/{max(first):6.2f} s  "
+          f"eval={stats.median(ev):5.2f} s  heavy={','.join(heavy) or '-'}")
+
+
+def bench(n_workers=os.cpu_count(), start_method="spawn"):
+    os.chdir(SIM_DIR)   # Mechanismus-Datei relativ zu Simulation/
+
+    print("\n--- Kalt-Import (frischer Interpreter, bestes von 3) ---")
+    for m in IMPORT_TARGETS:
+        print(f"{m:<36} {cold_import_s(m) * 1e3:8.1f} ms")
+
+    print(f"\n--- Zeit bis zur ersten Auswertung pro Worker ({start_method}, {n_workers} Worker) ---")
+    report("kaskade_worker", time_to_first_eval(n_workers, preload_model, (MODEL_KWARGS,), start_method))
+    report("legacy imports", time_to_first_eval(n_workers, preload_with_imports,
+                                                (LEGACY_IMPORTS, MODEL_KWARGS), start_method))
+
+
+if __name__ == "__main__":
+    bench()
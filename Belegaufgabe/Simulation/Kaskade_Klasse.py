@@ -1,10 +1,62 @@
 # cstr_cascade_model.py
+import hashlib
+import json
 import math
+import time
 import cantera as ct
 import numpy as np
 
 cm = 0.01
 
+# Betriebsbedingungen, die simulate() pro Aufruf überschreiben kann; Optimierer hängen
+# sie als zusätzliche Entscheidungsvariablen hinten an x = [A/V, d, eps, ...] an
+OPERATING_VARS = ("tc_C", "p_Pa", "mass_flow_rate_kg_s", "n_cstr", "ch4_o2")
+
+
+def composition(gas_comp, ch4_o2: float | None = None):
+    """
+    gas_comp ("CH4:1, O2:0.6, AR:0.1" or dict) with CH4 rescaled to CH4/O2 = ch4_o2
+    (O2 and inerts unchanged). Without ch4_o2 gas_comp is returned as is.
+    """
+    if ch4_o2 is None:
+        return gas_comp
+    if isinstance(gas_comp, str):
+        comp = {}
+        for part in gas_comp.split(","):
+            name, val = part.split(":")
+            comp[name.strip()] = float(val)
+    else:
+        comp = dict(gas_comp)
+    comp["CH4"] = float(ch4_o2) * comp["O2"]
+    return comp
+
+
+class SimulationError(RuntimeError):
+    """
+    Failure inside simulate(). .record is a plain dict (picklable, CSV/JSON friendly):
+    reason, stage (1-based, None if before the march), exception type/message,
+    integrator statistics of the failing stage and elapsed wall time.
+    """
+
+    def __init__(self, reason: str, stage=None, exc=None, solver_stats=None, elapsed_s=None):
+        self.record = {
+            "reason": reason,
+            "stage": stage,
+            "exception": type(exc).__name__ if exc is not None else None,
+            "message": str(exc) if exc is not None else "",
+            "solver_stats": dict(solver_stats or {}),
+            "elapsed_s": elapsed_s,
+        }
+        super().__init__(f"{reason} (stage {stage}): {self.record['message']}")
+
+
+def _solver_stats(sim) -> dict:
+    # ReactorNet.solver_stats gibt es erst ab Cantera 3.0
+    try:
+        return {k: int(v) for k, v in sim.solver_stats.items()}
+    except Exception:
+        return {}
+
 
 class CSTRCascadeModel:
     """
@@ -28,8 +80,36 @@ class CSTRCascadeModel:
             A_surf_stage = (cat_apv_SI * porosity) * V_stage
 
     If your cat_area_per_vol is defined differently, adjust A_surf_stage accordingly.
+
+    Operating conditions: the Cantera network is built once per model object (lazily,
+    on the first simulate()). simulate(tc_C=..., p_Pa=..., mass_flow_rate_kg_s=...,
+    gas_comp=..., ch4_o2=..., n_cstr=...) overrides the constructor values for one call
+    by resetting states, volume, area and mass flow of the existing objects.
+
+    Budgets: max_steps limits the integrator steps per stage (sim.max_steps),
+    simulate(max_wall_s=..., max_steps_total=...) limits one whole run. Violations
+    and solver errors raise SimulationError with a structured .record.
+
+    ISAT: with isat_rtol set, each stage goes through an ISATTable (kaskade_isat):
+    inlet state + stage parameters -> outlet state, retrieved as a linear approximation
+    where it is accurate to isat_rtol instead of integrating. isat_share_dir shares the
+    table between worker processes.
+
+    surface_mode="qss": the coverages are not integrated with the gas but solved
+    quasi-steady at each gas state; each stage is then a gas-only Newton solve
+    (kaskade_steady.QSSStage), with the coupled integration as fallback per stage.
+
+    engine="newton": instead of marching, all N stage balances (gas-only, quasi-steady
+    coverages) are solved as one block lower-bidiagonal system (kaskade_steady.CascadeNewton),
+    started from a coarse cascade or the profile of the previous design; falls back to
+    marching if Newton does not converge. Requires surface_mode="qss". max_wall_s also
+    bounds the Newton solve; max_steps_total counts integrator steps only (the Newton
+    path takes none, only the marching fallback does).
     """
 
+    # optional: wird nach jeder Stufe mit der Stufennummer aufgerufen (Watchdog-Fortschritt)
+    progress_hook = None
+
     def __init__(
         self,
         yaml_file: str,
@@ -45,9 +125,25 @@ class CSTRCascadeModel:
         # optional profiling
         track_species: tuple[str, ...] = ("CH4",),
         track_coverages: bool = False,
+        max_steps: int = 200000,
+        # optional: ISAT-Tabelle um die Stufen-Lösung (None -> aus)
+        isat_rtol: float | None = None,
+        isat_max_mb: float = 256.0,
+        isat_share_dir: str | None = None,
+        # "coupled": Bedeckungen mitintegriert; "qss": quasistationär, Stufe nur Gasphase
+        surface_mode: str = "coupled",
+        # "march": Stufe für Stufe; "newton": ganze Kaskade als ein System
+        engine: str = "march",
     ):
         if n_cstr < 1:
             raise ValueError("n_cstr must be >= 1")
+        if surface_mode not in ("coupled", "qss"):
+            raise ValueError(f"surface_mode must be 'coupled' or 'qss', not {surface_mode!r}")
+        if engine not in ("march", "newton"):
+            raise ValueError(f"engine must be 'march' or 'newton', not {engine!r}")
+        if engine == "newton" and surface_mode != "qss":
+            # das Kaskaden-Newton löst nur die Gasphase mit quasistationären Bedeckungen
+            raise ValueError("engine='newton' requires surface_mode='qss'")
 
         self.yaml_file = yaml_file
         self.t0 = tc_C + 273.15
@@ -61,6 +157,65 @@ class CSTRCascadeModel:
         self.gas_name = gas_name
         self.track_species = tuple(track_species)
         self.track_coverages = bool(track_coverages)
+        self.max_steps = int(max_steps)
+        self.isat_rtol = isat_rtol
+        self.isat_max_mb = float(isat_max_mb)
+        self.isat_share_dir = isat_share_dir
+        self.surface_mode = surface_mode
+        self.engine = engine
+
+        # Konstruktor-Argumente merken -> Worker können das gleiche Modell nachbauen
+        self.config = {
+            "yaml_file": yaml_file,
+            "tc_C": tc_C,
+            "p_Pa": p_Pa,
+            "length_m": length_m,
+            "mass_flow_rate_kg_s": mass_flow_rate_kg_s,
+            "n_cstr": int(n_cstr),
+            "gas_comp": gas_comp,
+            "energy_enabled": bool(energy_enabled),
+            "surface_name": surface_name,
+            "gas_name": gas_name,
+            "track_species": tuple(track_species),
+            "track_coverages": bool(track_coverages),
+            "max_steps": int(max_steps),
+            "isat_rtol": isat_rtol,
+            "isat_max_mb": float(isat_max_mb),
+            "isat_share_dir": isat_share_dir,
+            "surface_mode": surface_mode,
+            "engine": engine,
+        }
+
+        # Cantera-Netzwerk, erst beim ersten simulate() gebaut (nicht picklebar -> __getstate__)
+        self._net = None
+        # ISAT-Tabelle, überlebt einen Neubau des Netzwerks; pro Prozess (teilen über isat_share_dir)
+        self._isat = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_net"] = None
+        state["_isat"] = None
+        return state
+
+    @property
+    def isat_stats(self) -> dict | None:
+        return None if self._isat is None else self._isat.stats()
+
+    @property
+    def qss_stats(self) -> dict | None:
+        stage = (self._net or {}).get("qss")
+        return None if stage is None else stage.stats()
+
+    @property
+    def cascade_stats(self) -> dict | None:
+        cascade = (self._net or {}).get("cascade")
+        return None if cascade is None else cascade.stats()
+
+    @property
+    def config_hash(self) -> str:
+        """Short hash of the model configuration (same hash -> results are comparable)."""
+        txt = json.dumps(self.config, sort_keys=True, default=str)
+        return hashlib.sha1(txt.encode()).hexdigest()[:12]
 
     @staticmethod
     def _area_from_diameter_cm(diameter_cm: float) -> float:
@@ -70,25 +225,24 @@ class CSTRCascadeModel:
     def _cat_apv_to_SI(cat_area_per_vol_per_cm: float) -> float:
         return cat_area_per_vol_per_cm / cm  # 1/cm -> 1/m
 
-    def simulate(
-        self,
-        cat_area_per_vol_per_cm: float,
-        diameter_cm: float,
-        porosity: float,
-        return_profile: bool = False,
-        T_amb_C: float | None = None,   # Umgebungstemp in °C; None => kein Wärmeaustausch
-        U_W_m2K: float = 0.0,           # Wärmeübergangskoeffizient
-    ) -> dict:
-        # --- geometry ---
-        A_cs = self._area_from_diameter_cm(diameter_cm)
-        V_bed = A_cs * self.length
-        V_gas = porosity * V_bed
-        V_stage = V_gas / self.n
-
-        cat_apv_SI = self._cat_apv_to_SI(cat_area_per_vol_per_cm)
-        A_surf_stage = (cat_apv_SI * porosity) * V_stage
+    @staticmethod
+    def split_x(x, operating_vars=()) -> tuple:
+        """
+        x = [A/V, d_cm, porosity, *values of operating_vars] ->
+        (A/V, d_cm, porosity, overrides dict for simulate()).
+        """
+        overrides = {}
+        for name, v in zip(operating_vars, x[3:]):
+            if name not in OPERATING_VARS:
+                raise ValueError(f"unknown operating variable {name!r} (allowed: {OPERATING_VARS})")
+            overrides[name] = int(round(float(v))) if name == "n_cstr" else float(v)
+        return float(x[0]), float(x[1]), float(x[2]), overrides
+
+    def _network(self) -> dict:
+        """Build all Cantera objects once; simulate() only resets their state."""
+        if self._net is not None:
+            return self._net
 
-        # --- build objects ONCE ---
         # upstream gas (reservoir)
         gas_in = ct.Solution(self.yaml_file, self.gas_name)
         gas_in.TPX = self.t0, self.p0, self.gas_comp
@@ -97,42 +251,240 @@ class CSTRCascadeModel:
         # reactor gas
         gas_r = ct.Solution(self.yaml_file, self.gas_name)
         gas_r.TPX = self.t0, self.p0, self.gas_comp
-        r = ct.IdealGasReactor(gas_r, energy=self.energy_flag, volume=V_stage)
+        r = ct.IdealGasReactor(gas_r, energy=self.energy_flag, volume=1.0)
 
-        # surface attached to reactor
+        # surface attached to reactor; Anfangsbedeckung aus der YAML merken
         surf = ct.Interface(self.yaml_file, self.surface_name, [gas_r])
         surf.TP = self.t0, self.p0
+        cov0 = surf.coverages.copy()
         rsurf = ct.ReactorSurface(surf, r)
-        rsurf.area = A_surf_stage
 
         # downstream reservoir (state doesn't matter much; use a separate gas object)
         gas_out = ct.Solution(self.yaml_file, self.gas_name)
         gas_out.TPX = self.t0, self.p0, self.gas_comp
         downstream = ct.Reservoir(gas_out)
 
-        # --- optional heat loss to ambient via wall (non-adiabatic) ---
-        if T_amb_C is not None and U_W_m2K > 0.0:
-            T_amb = T_amb_C + 273.15
-
-            gas_amb = ct.Solution(self.yaml_file, self.gas_name)
-            gas_amb.TP = T_amb, self.p0
-            amb = ct.Reservoir(gas_amb)
-
-            # external heat-transfer area: cylinder mantle per stage
-            D = diameter_cm * cm
-            L_stage = self.length / self.n
-            A_ht = math.pi * D * L_stage  # [m^2]
-
-            wall = ct.Wall(r, amb, A=A_ht, U=U_W_m2K)
+        # Wand zur Umgebung immer vorhanden; U = 0 -> adiabat (kein Wärmestrom)
+        gas_amb = ct.Solution(self.yaml_file, self.gas_name)
+        gas_amb.TP = self.t0, self.p0
+        amb = ct.Reservoir(gas_amb)
+        wall = ct.Wall(r, amb, A=1.0, U=0.0)
 
         # flow devices: fixed mdot, pressure-controlled outlet
         mfc = ct.MassFlowController(upstream, r, mdot=self.mdot)
-        _pc = ct.PressureController(r, downstream, primary=mfc, K=1e-5)
+        pc = ct.PressureController(r, downstream, primary=mfc, K=1e-5)
 
         sim = ct.ReactorNet([r])
         sim.rtol = 1e-9
         sim.atol = 1e-15
-        sim.max_steps = 200000
+        sim.max_steps = self.max_steps
+
+        self._net = {
+            "gas_in": gas_in, "upstream": upstream, "gas_r": gas_r, "r": r, "surf": surf,
+            "rsurf": rsurf, "cov0": cov0, "gas_out": gas_out, "downstream": downstream,
+            "gas_amb": gas_amb, "amb": amb, "wall": wall, "mfc": mfc, "pc": pc, "sim": sim,
+        }
+        return self._net
+
+    def _isat_table(self, n_species: int, n_surf: int):
+        if self._isat is None:
+            from kaskade_isat import ISATTable
+            # q = [T, rho, Y..., V_stage, A_surf_stage, mdot, U*A_wall, T_amb], f = [T, rho, Y..., theta...]
+            x_atol = np.r_[1.0, 1e-6, np.full(n_species, 1e-6), 1e-15, 1e-12, 1e-12, 1e-6, 1.0]
+            f_atol = np.r_[1.0, 1e-6, np.full(n_species, 1e-9), np.full(n_surf, 1e-9)]
+            self._isat = ISATTable(x_atol, f_atol, rtol=self.isat_rtol, n_check=2 + n_species,
+                                   fd_rel=1e-4, max_mb=self.isat_max_mb, share_dir=self.isat_share_dir)
+        return self._isat
+
+    @staticmethod
+    def _set_stage_params(net, params):
+        V_stage, A_surf_stage, mdot, UA, T_amb = params
+        net["r"].volume = V_stage
+        net["rsurf"].area = A_surf_stage
+        net["mfc"].mass_flow_rate = mdot
+        net["wall"].heat_transfer_coeff = UA / net["wall"].area
+        net["gas_amb"].TP = T_amb, net["gas_amb"].P
+        net["amb"].syncState()
+
+    def _isat_solver(self, net, params, qss_states: dict | None = None):
+        """
+        solve(q) for the ISAT table: one stage from inlet q, coverages of the previous stage as start.
+        qss mode: every solve (also the finite-difference ones) starts from the same QSSStage
+        state; the state after the first solve (at the query point) is kept in qss_states["base"].
+        """
+        gas_in, r, rsurf, sim = net["gas_in"], net["r"], net["rsurf"], net["sim"]
+        K = gas_in.n_species
+        cov = np.array(rsurf.coverages)
+        stage = self._qss(net) if self.surface_mode == "qss" else None
+        state0 = stage.state() if stage is not None else None
+
+        def solve(q):
+            gas_in.TDY = q[0], q[1], q[2:2 + K]
+            net["upstream"].syncState()
+            net["gas_r"].TDY = q[0], q[1], q[2:2 + K]
+            r.syncState()
+            rsurf.coverages = cov
+            if stage is not None:
+                stage.restore(state0)
+            perturbed = not np.array_equal(q[2 + K:], params)
+            if perturbed:
+                self._set_stage_params(net, q[2 + K:])
+            try:
+                sim.reinitialize()
+                self._direct_stage(net)
+            finally:
+                if perturbed:
+                    self._set_stage_params(net, params)
+            if stage is not None and qss_states is not None and "base" not in qss_states:
+                qss_states["base"] = stage.state()
+            return np.concatenate([[r.T, r.density], r.thermo.Y, rsurf.coverages])
+
+        return solve
+
+    def _direct_stage(self, net):
+        """Solve the current stage (reactor starts at the inlet state) without ISAT."""
+        if self.surface_mode == "qss":
+            self._qss_stage(net)
+        else:
+            net["sim"].advance_to_steady_state()
+
+    def _qss(self, net):
+        """The network's QSSStage (created on first use)."""
+        if "qss" not in net:
+            from kaskade_steady import QSSStage
+            net["qss"] = QSSStage(net, energy=self.energy_flag == "on")
+        return net["qss"]
+
+    def _qss_stage(self, net):
+        """One stage with quasi-steady coverages; falls back to the coupled solve if Newton fails."""
+        stage = self._qss(net)
+        gas_in, gas_r, r, rsurf = net["gas_in"], net["gas_r"], net["r"], net["rsurf"]
+        cov = np.array(rsurf.coverages)
+        u = stage.solve(np.r_[gas_in.Y, gas_in.T], gas_in.P)
+        if u is None:
+            # gekoppelt integrieren, vom Eintritt und den Bedeckungen der vorigen Stufe
+            gas_r.TDY = gas_in.TDY
+            r.syncState()
+            rsurf.coverages = cov
+            net["sim"].reinitialize()
+            net["sim"].advance_to_steady_state()
+            stage.cov = np.array(rsurf.coverages)
+            return
+        gas_r.TPY = u[-1], gas_in.P, np.clip(u[:-1], 0.0, None)
+        r.syncState()
+        rsurf.coverages = stage.cov
+
+    def _cascade_solve(self, net, params_for, n: int, deadline=None):
+        """All stage outlets (n, K+1) by CascadeNewton, or None (-> marching); DeadlineExceeded passes through."""
+        cascade = net.get("cascade")
+        if cascade is None:
+            from kaskade_steady import CascadeNewton
+            cascade = net["cascade"] = CascadeNewton(self._qss(net))
+        from kaskade_steady import DeadlineExceeded
+        gas_in = net["gas_in"]
+        net["qss"].reset(net["cov0"])
+        try:
+            return cascade.solve(np.r_[gas_in.Y, gas_in.T], gas_in.P, params_for, n, deadline)
+        except DeadlineExceeded:
+            cascade.reset()
+            raise
+        except Exception:
+            cascade.n_failed += 1
+            cascade.reset()
+            return None
+
+    def _isat_stage(self, net, params):
+        """One stage through the ISAT table; leaves the outlet state in the reactor."""
+        gas_in, r, rsurf = net["gas_in"], net["r"], net["rsurf"]
+        K = gas_in.n_species
+        table = self._isat_table(K, len(rsurf.coverages))
+        q = np.concatenate([[gas_in.T, gas_in.density], gas_in.Y, params])
+        stage = self._qss(net) if self.surface_mode == "qss" else None
+        state0 = stage.state() if stage is not None else None
+        qss_states = {}
+        u_in = np.r_[gas_in.Y, gas_in.T]
+        f = table.query(q, self._isat_solver(net, params, qss_states))
+        net["gas_r"].TDY = f[0], f[1], np.clip(f[2:2 + K], 0.0, None)
+        r.syncState()
+        cov = np.clip(f[2 + K:], 0.0, None)
+        rsurf.coverages = cov / cov.sum()
+        if stage is not None:
+            # QSS-Zustand der Lösung am Abfragepunkt, nicht der letzten Finite-Differenzen-Lösung;
+            # bei einem Tabellentreffer: Bedeckungen und Schritt aus dem abgerufenen Wert
+            if "base" in qss_states:
+                stage.restore(qss_states["base"])
+            else:
+                stage.restore((rsurf.coverages, state0[1], np.r_[r.thermo.Y, r.T] - u_in))
+
+    def simulate(
+        self,
+        cat_area_per_vol_per_cm: float,
+        diameter_cm: float,
+        porosity: float,
+        return_profile: bool = False,
+        T_amb_C: float | None = None,   # Umgebungstemp in °C; None => kein Wärmeaustausch
+        U_W_m2K: float = 0.0,           # Wärmeübergangskoeffizient
+        max_wall_s: float | None = None,       # Zeitbudget für den ganzen Lauf
+        max_steps_total: int | None = None,    # Integrator-Schritte über alle Stufen
+        # Betriebsbedingungen für diesen Aufruf (None -> Werte aus dem Konstruktor)
+        tc_C: float | None = None,
+        p_Pa: float | None = None,
+        mass_flow_rate_kg_s: float | None = None,
+        gas_comp=None,
+        ch4_o2: float | None = None,            # CH4/O2-Verhältnis, skaliert CH4 in gas_comp
+        n_cstr: int | None = None,
+    ) -> dict:
+        t_start = time.perf_counter()
+        T0 = self.t0 if tc_C is None else tc_C + 273.15
+        P0 = self.p0 if p_Pa is None else float(p_Pa)
+        mdot = self.mdot if mass_flow_rate_kg_s is None else float(mass_flow_rate_kg_s)
+        X0 = composition(self.gas_comp if gas_comp is None else gas_comp, ch4_o2)
+        n = self.n if n_cstr is None else int(n_cstr)
+        if n < 1:
+            raise ValueError("n_cstr must be >= 1")
+
+        # --- geometry ---
+        A_cs = self._area_from_diameter_cm(diameter_cm)
+        V_bed = A_cs * self.length
+        V_gas = porosity * V_bed
+        V_stage = V_gas / n
+
+        cat_apv_SI = self._cat_apv_to_SI(cat_area_per_vol_per_cm)
+        A_surf_stage = (cat_apv_SI * porosity) * V_stage
+
+        # --- bestehendes Netzwerk auf diesen Aufruf zurücksetzen ---
+        net = self._network()
+        gas_in, upstream, r, surf, rsurf = net["gas_in"], net["upstream"], net["r"], net["surf"], net["rsurf"]
+        sim = net["sim"]
+
+        gas_in.TPX = T0, P0, X0
+        upstream.syncState()
+        net["gas_out"].TPX = T0, P0, X0
+        net["downstream"].syncState()
+        net["gas_r"].TPX = T0, P0, X0
+        r.syncState()
+        r.volume = V_stage
+
+        surf.TP = T0, P0
+        rsurf.coverages = net["cov0"]
+        rsurf.area = A_surf_stage
+        if "qss" in net:
+            net["qss"].reset(net["cov0"])
+
+        # --- optional heat loss to ambient via wall (non-adiabatic) ---
+        wall = net["wall"]
+        if T_amb_C is not None and U_W_m2K > 0.0:
+            net["gas_amb"].TP = T_amb_C + 273.15, P0
+            net["amb"].syncState()
+            # external heat-transfer area: cylinder mantle per stage
+            wall.area = math.pi * (diameter_cm * cm) * (self.length / n)  # [m^2]
+            wall.heat_transfer_coeff = U_W_m2K
+        else:
+            wall.heat_transfer_coeff = 0.0
+
+        net["mfc"].mass_flow_rate = mdot
+        sim.initial_time = 0.0      # Integrator neu starten, Zeit wie bei frischem Netz
+
         # --- optional profiling buffers (per stage) ---
         profile = None
         if return_profile:
@@ -146,10 +498,65 @@ class CSTRCascadeModel:
             if self.track_coverages:
                 profile["coverages"] = []
 
+        # --- optional: ganze Kaskade als ein Newton-System ---
+        U = None
+        if self.engine == "newton":
+            UA_total = wall.heat_transfer_coeff * math.pi * (diameter_cm * cm) * self.length
+            T_amb = net["gas_amb"].T
+
+            def params_for(m):
+                return V_gas / m, cat_apv_SI * porosity * V_gas / m, mdot, UA_total / m, T_amb
+
+            from kaskade_steady import DeadlineExceeded
+            deadline = t_start + max_wall_s if max_wall_s is not None else None
+            try:
+                U = self._cascade_solve(net, params_for, n, deadline)
+            except DeadlineExceeded as e:
+                raise SimulationError("wall_budget", exc=e, elapsed_s=time.perf_counter() - t_start) from e
+            cascade = net["cascade"]
+            # Zustände zurück auf den Eintritt (für die Auswertung unten bzw. das Marschieren)
+            gas_in.TPX = T0, P0, X0
+            upstream.syncState()
+            net["gas_r"].TPX = T0, P0, X0
+            r.syncState()
+            rsurf.coverages = net["cov0"]
+            if U is None:
+                sim.reinitialize()
+
         # --- march through N CSTRs ---
+        stage_params = None
+        if self.isat_rtol is not None:
+            stage_params = np.array([V_stage, A_surf_stage, mdot,
+                                     wall.heat_transfer_coeff * wall.area, net["gas_amb"].T])
         Tmax = -1e300
-        for i in range(self.n):
-            sim.advance_to_steady_state()
+        steps_total = 0
+        for i in range(n):
+            try:
+                if U is not None:
+                    # Lösung liegt schon vor, nur den Zustand der Stufe setzen
+                    net["gas_r"].TPY = U[i, -1], P0, np.clip(U[i, :-1], 0.0, None)
+                    r.syncState()
+                    rsurf.coverages = cascade.covs[i]
+                elif stage_params is not None:
+                    self._isat_stage(net, stage_params)
+                else:
+                    self._direct_stage(net)
+            except Exception as e:
+                self._net = None    # Integrator-Zustand unklar -> beim nächsten Aufruf neu bauen
+                raise SimulationError("solver", stage=i + 1, exc=e, solver_stats=_solver_stats(sim),
+                                      elapsed_s=time.perf_counter() - t_start) from e
+
+            # Newton-Lösung: kein Integrator gelaufen, dessen Statistik ist nicht von dieser Stufe
+            stats = _solver_stats(sim) if U is None else {}
+            steps_total += stats.get("steps", 0)
+            elapsed = time.perf_counter() - t_start
+            if max_wall_s is not None and elapsed > max_wall_s:
+                raise SimulationError("wall_budget", stage=i + 1, solver_stats=stats, elapsed_s=elapsed)
+            if max_steps_total is not None and steps_total > max_steps_total:
+                raise SimulationError("step_budget", stage=i + 1, solver_stats=stats, elapsed_s=elapsed)
+            if self.progress_hook is not None:
+                self.progress_hook(i + 1)
+
             if r.T > Tmax:
                 Tmax = r.T
             if profile is not None:
@@ -169,30 +576,31 @@ class CSTRCascadeModel:
             # TDY is robust for state transfer
             gas_in.TDY = r.thermo.TDY
             upstream.syncState()
-            sim.reinitialize()
+            if U is None:
+                sim.reinitialize()     # mit Newton-Lösung wird nicht integriert
 
+        if self._isat is not None:
+            self._isat.sync()
         ch4 = r.thermo["CH4"].X[0]
 
-        T_max = None
-        if profile is not None:
-            T_max = float(max(profile["T"]))
-
+        # Tmax wird in der Schleife immer mitgeführt -> auch ohne Profil korrekt
         out = {
             "CH4": float(ch4),
             "T_out": float(r.T),
-            "T_max": float(T_max) if T_max is not None else float(r.T),
+            "T_max": float(Tmax),
             "P_out": float(r.thermo.P),
             "A_surf_stage": float(A_surf_stage),
             "V_stage": float(V_stage),
+            "wall_s": time.perf_counter() - t_start,
         }
         if profile is not None:
             out["profile"] = profile
         return out
 
-    def objective_CH4(self, params) -> float:
-        cat_area_per_vol, diameter_cm, porosity = params
+    def objective_CH4(self, params, operating_vars=()) -> float:
+        cat_area_per_vol, diameter_cm, porosity, overrides = self.split_x(params, operating_vars)
         try:
-            res = self.simulate(cat_area_per_vol, diameter_cm, porosity, return_profile=False)
+            res = self.simulate(cat_area_per_vol, diameter_cm, porosity, return_profile=False, **overrides)
             return res["CH4"]
         except Exception:
             return 1e3
@@ -201,9 +609,7 @@ class CSTRCascadeModel:
         cat_area_per_vol, diameter_cm, porosity = params
 
         # geometrisches V_cat (robust!)
-        A_cs = np.pi / 4.0 * (diameter_cm * cm) ** 2
-        V_bed = A_cs * self.length_m
-        vcat = (1.0 - porosity) * V_bed
+        vcat = self.Vcat(diameter_cm, porosity)
 
         try:
             res = self.simulate(cat_area_per_vol, diameter_cm, porosity,
@@ -0,0 +1,118 @@
+# budget.py
+"""
+Abbruch nach Budget und Stagnation für DE (scipy) und NSGA-II (pymoo).
+
+Bisher feste Budgets (maxiter=100 bzw. n_gen=50): die Läufe rechnen weiter, obwohl sich
+seit vielen Generationen nichts mehr tut. BudgetManager wird einmal pro Generation
+mit dem aktuellen Stand gefüttert und liefert einen Abbruchgrund (oder None):
+
+  - wall_time     Wandzeit-Limit erreicht, oder die nächste Generation würde es
+                  (nach der Dauer der letzten) sicher überschreiten
+  - max_evals     Auswertungs-Limit erreicht
+  - best_stalled  bestes CH4 hat sich über `window` Generationen relativ um < best_rtol verbessert
+  - hv_stalled    Hypervolumen ebenso (hv_rtol)
+  - spread        Populationsstreuung (mittlere Std. der Variablen / Bounds-Spanne) < min_spread
+
+Die Treiber beenden den Optimierer dann sauber (DE: callback -> True, pymoo:
+termination.terminate()), schreiben Logs und einen Checkpoint und tragen den Grund in
+History und runs-Tabelle ein.
+
+    budget = BudgetManager(max_wall_s=3600, window=20, best_rtol=1e-4)
+    reason = budget.update(n_evals=..., best=...)      # pro Generation
+"""
+import os
+import time
+
+import numpy as np
+
+
+def population_spread(X, xl, xu) -> float:
+    """Mean standard deviation of the population per variable, relative to the bounds."""
+    X = np.asarray(X, dtype=float)
+    span = np.asarray(xu, dtype=float) - np.asarray(xl, dtype=float)
+    return float(np.mean(X.std(axis=0) / span))
+
+
+class BudgetManager:
+    """
+    Per-generation stop criteria; None disables a criterion.
+
+    Parameters
+    ----------
+    max_wall_s, max_evals:
+        Hard budgets.
+    window:
+        Generations over which improvement is measured.
+    best_rtol, hv_rtol:
+        Minimum relative improvement of best objective / hypervolume over `window`.
+    min_spread:
+        Minimum population_spread().
+    """
+
+    def __init__(self, max_wall_s: float | None = None, max_evals: int | None = None, window: int = 10,
+                 best_rtol: float | None = None, hv_rtol: float | None = None,
+                 min_spread: float | None = None):
+        self.max_wall_s = max_wall_s
+        self.max_evals = max_evals
+        self.window = int(window)
+        self.best_rtol = best_rtol
+        self.hv_rtol = hv_rtol
+        self.min_spread = min_spread
+        self.history = []       # (t_s, n_evals, best, hv, spread) pro Generation
+        self.stop_reason = None
+        self.start()
+
+    def start(self):
+        self.t0 = time.perf_counter()
+        self.history.clear()
+        self.stop_reason = None
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def _stalled(self, k: int, rtol: float, larger_is_better: bool) -> bool:
+        if rtol is None or len(self.history) <= self.window:
+            return False
+        new, old = self.history[-1][k], self.history[-1 - self.window][k]
+        if new is None or old is None or not np.isfinite(new) or not np.isfinite(old):
+            return False
+        gain = (new - old) if larger_is_better else (old - new)
+        return gain <= rtol * abs(old)
+
+    def update(self, n_evals: int | None = None, best: float | None = None, hv: float | None = None,
+               spread: float | None = None) -> str | None:
+        """Record one generation; returns the stop reason (also kept in .stop_reason) or None."""
+        t = self.elapsed
+        self.history.append((t, n_evals, best, hv, spread))
+        reason = None
+        if self.max_wall_s is not None:
+            last = t - self.history[-2][0] if len(self.history) > 1 else 0.0
+            if t >= self.max_wall_s or t + last > self.max_wall_s:
+                reason = "wall_time"
+        if reason is None and self.max_evals is not None and n_evals is not None and n_evals >= self.max_evals:
+            reason = "max_evals"
+        if reason is None and self._stalled(2, self.best_rtol, larger_is_better=False):
+            reason = "best_stalled"
+        if reason is None and self._stalled(3, self.hv_rtol, larger_is_better=True):
+            reason = "hv_stalled"
+        if reason is None and self.min_spread is not None and spread is not None and spread < self.min_spread:
+            reason = "spread"
+        if reason is not None:
+            self.stop_reason = reason
+        return reason
+
+    def rescale_hv(self, hv):
+        """Replace the hypervolume of the last len(hv) generations (reference point moved)."""
+        hv = list(hv)[-len(self.history):] if self.history else []
+        k = len(self.history) - len(hv)
+        for i, v in enumerate(hv):
+            t, n, best, _, spread = self.history[k + i]
+            self.history[k + i] = (t, n, best, v, spread)
+
+
+def write_checkpoint(path: str, **arrays):
+    """Final optimizer state as .npz (population, objectives, best point, ...)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, **{k: np.asarray(v) for k, v in arrays.items()})
+    return path
@@ -0,0 +1,212 @@
+# failure_classifier.py
+"""
+Online-Klassifikator für Fehlschlag-Regionen im Parameterraum.
+
+In all_evaluated_points.csv stehen viele Strafpunkte (CH4_out = 1e3 / T_max = 1e9):
+Simulationen, die abgestürzt sind. Der Optimierer schlägt trotzdem immer wieder
+Designs in diesen Regionen vor. FailureClassifier ist ein kNN (wie K-Neighbors in
+Seminar/S6/Analyse.py), aber in NumPy/scipy und inkrementell trainierbar:
+
+  - Parameter werden wie in data_scaling() auf [0, 1] skaliert (über die Bounds)
+  - p_fail(x) = distanzgewichteter Anteil Fehlschläge unter den k nächsten Nachbarn
+    (cKDTree, neu gebaut erst bei der nächsten Abfrage nach neuen Punkten)
+  - Trainingsdaten in einem Puffer mit verdoppelter Kapazität (kein vstack je Batch)
+  - als "Fehlschlag" zählen Abstürze UND Punkte über der T_max-Grenze: beide liefern
+    keinen zulässigen Punkt, die volle Simulation ist dort verschwendet
+  - Vorschläge mit p_fail >= threshold werden nicht voll simuliert, sondern bekommen
+    den Strafwert - oder zuerst einen billigen Low-Fidelity-Check (z.B. wenige Stufen)
+  - ein Anteil audit_rate der Sperren wird trotzdem simuliert, um zu zählen, wie oft
+    der Klassifikator falsch liegt ("overruled")
+
+Einbindung:
+  - DE:      workers=clf.gate_map(pool.map, penalty=1e3)
+  - NSGA-II: CatMultiObjectiveProblem(..., failure_classifier=clf)
+"""
+import csv
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class FailureClassifier:
+    """
+    Distance-weighted kNN over bounds-scaled parameters, trained online.
+
+    Parameters
+    ----------
+    bounds:
+        [(lo, hi), ...] of the decision variables (for [0, 1] scaling).
+    k:
+        Number of neighbours.
+    threshold:
+        p_fail at or above which a proposal is blocked.
+    min_samples / min_failures:
+        The classifier only blocks once it has seen this many points / failures.
+    audit_rate:
+        Fraction of blocked proposals that are simulated anyway (overrule statistics).
+    log_path:
+        Optional CSV; one row per blocked or audited proposal.
+    """
+
+    def __init__(self, bounds, k: int = 7, threshold: float = 0.8, min_samples: int = 50,
+                 min_failures: int = 5, audit_rate: float = 0.1, seed=None,
+                 log_path: str | None = None):
+        b = np.asarray(bounds, dtype=float)
+        self.lo, self.hi = b[:, 0], b[:, 1]
+        self.k = int(k)
+        self.threshold = float(threshold)
+        self.min_samples = int(min_samples)
+        self.min_failures = int(min_failures)
+        self.audit_rate = float(audit_rate)
+        self.rng = np.random.default_rng(seed)
+        self.log_path = log_path
+
+        self._n = 0
+        self._X = np.empty((64, len(self.lo)))
+        self._y = np.empty(64, dtype=bool)
+        self._tree = None           # KD-Baum über _X[:_n_tree]
+        self._n_tree = 0
+
+        # Statistik
+        self.n_queries = 0
+        self.n_blocked = 0       # Strafwert ohne Vollsimulation
+        self.n_audited = 0       # gesperrt, aber trotzdem simuliert
+        self.n_overruled = 0     # gesperrt, Simulation lief aber durch
+        self.n_missed = 0        # freigegeben, Simulation schlug fehl
+
+        if log_path:
+            with open(log_path, "w", newline="") as f:
+                csv.writer(f).writerow(["event", "p_fail", "failed", *[f"x{i}" for i in range(len(self.lo))]])
+
+    # --- Training / Vorhersage ---------------------------------------
+    def _scale(self, X):
+        return (np.atleast_2d(np.asarray(X, dtype=float))[:, :len(self.lo)] - self.lo) / (self.hi - self.lo)
+
+    @property
+    def n_samples(self) -> int:
+        return self._n
+
+    def update(self, X, failed):
+        """Add outcomes (failed: bool per row)."""
+        Z = self._scale(X)
+        failed = np.asarray(failed, dtype=bool).ravel()
+        n_new = self._n + len(Z)
+        if n_new > len(self._X):
+            cap = max(2 * len(self._X), n_new)
+            X_buf, y_buf = np.empty((cap, self._X.shape[1])), np.empty(cap, dtype=bool)
+            X_buf[:self._n], y_buf[:self._n] = self._X[:self._n], self._y[:self._n]
+            self._X, self._y = X_buf, y_buf
+        self._X[self._n:n_new] = Z
+        self._y[self._n:n_new] = failed
+        self._n = n_new
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Failure probability per row of X (0 while untrained)."""
+        Q = self._scale(X)
+        if self._n == 0:
+            return np.zeros(len(Q))
+        if self._n_tree != self._n:
+            self._tree = cKDTree(self._X[:self._n])
+            self._n_tree = self._n
+        k = min(self.k, self._n)
+        dn, nn = self._tree.query(Q, k=k)
+        dn, nn = dn.reshape(len(Q), k), nn.reshape(len(Q), k)
+        w = 1.0 / (dn + 1e-9)
+        return (w * self._y[nn]).sum(axis=1) / w.sum(axis=1)
+
+    @property
+    def active(self) -> bool:
+        return self._n >= self.min_samples and int(self._y[:self._n].sum()) >= self.min_failures
+
+    # --- Gate --------------------------------------------------------
+    def decide(self, X):
+        """
+        Returns (run_full, p_fail, audited) per row. run_full=False -> use penalty
+        (or low-fidelity check). Audited rows are blocked-but-simulated anyway.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        n = len(X)
+        self.n_queries += n
+        if not self.active:
+            return np.ones(n, bool), np.zeros(n), np.zeros(n, bool)
+        p = self.predict_proba(X)
+        blocked = p >= self.threshold
+        audited = blocked & (self.rng.random(n) < self.audit_rate)
+        return ~blocked | audited, p, audited
+
+    def record(self, X, p, failed, audited, blocked):
+        """Update statistics/log after the simulations of one batch and learn from them."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        failed = np.asarray(failed, bool)
+        ran = ~blocked | audited
+        self.n_blocked += int((blocked & ~audited).sum())
+        self.n_audited += int(audited.sum())
+        self.n_overruled += int((audited & ~failed).sum())
+        self.n_missed += int((~blocked & failed).sum())
+        if self.log_path and (blocked.any()):
+            with open(self.log_path, "a", newline="") as f:
+                w = csv.writer(f)
+                for i in np.flatnonzero(blocked):
+                    event = ("overruled" if not failed[i] else "confirmed") if audited[i] else "blocked"
+                    w.writerow([event, p[i], bool(failed[i]) if ran[i] else "", *X[i]])
+        if ran.any():
+            self.update(X[ran], failed[ran])
+
+    def summary(self) -> dict:
+        return {
+            "samples": self.n_samples,
+            "queries": self.n_queries,
+            "blocked": self.n_blocked,
+            "audited": self.n_audited,
+            "overruled": self.n_overruled,
+            "overrule_rate": self.n_overruled / self.n_audited if self.n_audited else float("nan"),
+            "missed": self.n_missed,
+        }
+
+    # --- DE: map-Wrapper ---------------------------------------------
+    def gate_map(self, inner_map=map, penalty: float = 1e3, low_fidelity=None):
+        """
+        Wrap a map-callable (pool.map, cluster.map, builtin map) for
+        differential_evolution(workers=...). Failure is recognised by value >= penalty.
+
+        low_fidelity: optional objective (cheap, e.g. model with few stages); blocked
+        points that pass it are promoted to a full simulation (counted as overruled).
+        """
+
+        def gated(func, iterable):
+            X = np.array([np.asarray(x, dtype=float) for x in iterable])
+            run, p, audited = self.decide(X)
+            blocked = p >= self.threshold
+
+            if low_fidelity is not None and (blocked & ~audited).any():
+                idx = np.flatnonzero(blocked & ~audited)
+                lf = np.asarray(list(inner_map(low_fidelity, X[idx])), dtype=float)
+                promoted = idx[lf < penalty]
+                run[promoted] = True
+                audited[promoted] = True
+
+            out = np.full(len(X), float(penalty))
+            idx = np.flatnonzero(run)
+            if idx.size:
+                out[idx] = np.asarray(list(inner_map(func, X[idx])), dtype=float)
+            self.record(X, p, out >= penalty, audited, blocked)
+            return list(out)
+
+        return gated
+
+    # --- Vorwissen aus alten Läufen ----------------------------------
+    def fit_csv(self, path: str, x_cols=("A_over_V_1_per_cm", "diameter_cm", "porosity"),
+                ch4_penalty: float = 1e3, tmax_penalty: float = 1e9, Tmax_allowed: float | None = None):
+        """Pre-train from an all_evaluated_points.csv-style file (Tmax_allowed: infeasible = failed)."""
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        if not rows:
+            return self
+        X = np.array([[float(r[c]) for c in x_cols] for r in rows])
+        # Strafwerte markieren Fehlschläge; unzulässig wie im Problem: G = T_max - Tmax_allowed > 0
+        t_max = [float(r.get("T_max_K") or 0.0) for r in rows]
+        failed = np.array([float(r["CH4_out"]) >= ch4_penalty or t >= tmax_penalty
+                           or (Tmax_allowed is not None and t > Tmax_allowed)
+                           for r, t in zip(rows, t_max)])
+        self.update(X, failed)
+        return self
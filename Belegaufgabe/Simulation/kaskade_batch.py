@@ -0,0 +1,302 @@
+# kaskade_batch.py
+"""
+Batch-Runner: viele Fälle in einem (oder wenigen) langlebigen Prozessen.
+
+Belegaufgabe-Reaktormodell.py, Simulation_Profile.py und Praktikum/P2/P2.py rechnen
+je einen fest eingetragenen Fall und werden jeweils als eigener Python-Prozess
+gestartet -> jedes Mal Import von cantera/matplotlib und Laden des Mechanismus.
+Hier stehen die Fälle in einer Datei (JSON oder YAML) und laufen alle in einem
+Prozess bzw. einem Pool; Modelle und Phasen werden pro Prozess wiederverwendet.
+
+    python kaskade_batch.py run  cases.yaml --workers 4 --out ../Ergebnisse/batch_test
+    python kaskade_batch.py plot ../Ergebnisse/batch_test            # optional, separat
+
+Fall-Datei (Liste oder {"defaults": {...}, "cases": [...]}; defaults werden in
+jeden Fall gemischt, "model"/"params" jeweils schlüsselweise und nur in Fälle
+derselben Art (kind) -> ein flow_reactor erbt keine Kaskaden-Parameter wie energy_enabled):
+
+    defaults:
+      kind: cascade
+      model: {yaml_file: methane_pox_on_pt.yaml, tc_C: 800, p_Pa: 101325,
+              length_m: 0.003, mass_flow_rate_kg_s: 1.0e-6, n_cstr: 200, energy_enabled: true}
+    cases:
+      - name: basis
+        params: {cat_area_per_vol_per_cm: 1500, diameter_cm: 2.0, porosity: 0.3}
+        profile: true
+      - name: pfr_1000C
+        kind: flow_reactor                    # wie P2.py (FlowReactor)
+        model: {yaml_file: methane_pox_on_pt.yaml, tc_C: 1000, length_m: 0.003, area_m2: 1.0e-4,
+                cat_area_per_vol_per_m: 1.0e5, velocity_m_s: 0.00667, porosity: 0.3,
+                gas_comp: "CH4:1, O2:1.5, AR:0.1"}
+
+Ausgabe im Ordner --out:
+  results.csv     eine Zeile je Fall (skalare Ergebnisse)
+  profiles.npz    Profile aller Fälle, Schlüssel "<fall>/<größe>"
+  manifest.json   Fälle, Status, Laufzeit je Fall, Prozess, Gesamtzeit, Versionen
+
+Der run-Pfad importiert kein matplotlib; das passiert nur im plot-Unterbefehl.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+KINDS = ("cascade", "flow_reactor")
+
+# pro Prozess wiederverwendet (Schlüssel: Konfiguration als JSON)
+_MODELS = {}
+_PHASES = {}        # (yaml, surface, gas) -> (surf, gas, Anfangsbedeckung aus der YAML)
+
+
+# ----------------------------------------------------------------------
+# Fall-Datei
+# ----------------------------------------------------------------------
+def _merge(defaults: dict, case: dict) -> dict:
+    out = dict(defaults)
+    if case.get("kind", "cascade") != defaults.get("kind", "cascade"):
+        # model/params der defaults gelten nur für deren kind
+        out = {k: v for k, v in out.items() if k not in ("kind", "model", "params")}
+    for k, v in case.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = {**out[k], **v}
+        else:
+            out[k] = v
+    return out
+
+
+def load_cases(path: str) -> list:
+    """Read a JSON/YAML case file; returns the list of fully merged cases."""
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml  # nur für YAML-Falldateien nötig
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if isinstance(data, list):
+        data = {"cases": data}
+    defaults = data.get("defaults", {})
+    cases = []
+    for i, c in enumerate(data.get("cases", [])):
+        c = _merge(defaults, c)
+        c.setdefault("name", f"case{i:03d}")
+        c.setdefault("kind", "cascade")
+        if c["kind"] not in KINDS:
+            raise ValueError(f"case {c['name']!r}: unknown kind {c['kind']!r} (expected one of {KINDS})")
+        cases.append(c)
+    names = [c["name"] for c in cases]
+    if len(set(names)) != len(names):
+        raise ValueError("case names must be unique")
+    return cases
+
+
+# ----------------------------------------------------------------------
+# Fälle rechnen (im Worker)
+# ----------------------------------------------------------------------
+def _warmup():
+    # Initializer: cantera einmal pro Worker importieren
+    import cantera  # noqa: F401
+
+
+def _cascade_model(model_kwargs: dict):
+    key = json.dumps(model_kwargs, sort_keys=True)
+    if key not in _MODELS:
+        from Kaskade_Klasse import CSTRCascadeModel
+        _MODELS[key] = CSTRCascadeModel(**model_kwargs)
+    return _MODELS[key]
+
+
+def _run_cascade(case: dict):
+    model = _cascade_model(case.get("model", {}))
+    res = model.simulate(**case.get("params", {}), return_profile=bool(case.get("profile", False)))
+    profile = res.pop("profile", None) or {}
+    arrays = {k: np.asarray(v, dtype=float) for k, v in profile.items()}
+    if "stage" in arrays:
+        arrays["z_m"] = arrays["stage"] * (model.length / model.n)
+    return res, arrays
+
+
+def _phases(yaml_file: str, surface_name: str, gas_name: str):
+    key = (yaml_file, surface_name, gas_name)
+    if key not in _PHASES:
+        import cantera as ct
+        surf = ct.Interface(yaml_file, surface_name)
+        _PHASES[key] = (surf, surf.adjacent[gas_name], surf.coverages.copy())
+    return _PHASES[key]
+
+
+def _run_flow_reactor(case: dict):
+    import cantera as ct
+
+    m = case.get("model", {})
+    surf, gas, cov0 = _phases(m.get("yaml_file", "methane_pox_on_pt.yaml"),
+                              m.get("surface_name", "Pt_surf"), m.get("gas_name", "gas"))
+    t = m.get("tc_C", 1000.0) + 273.15
+    p = m.get("p_Pa", ct.one_atm)
+    length = m.get("length_m", 0.3e-2)
+    area = m.get("area_m2", 1e-4)
+    porosity = m.get("porosity", 0.3)
+    surf.TP = t, p
+    # Bedeckung des vorherigen Falls nicht übernehmen -> Ergebnis unabhängig von Reihenfolge / Worker
+    surf.coverages = cov0
+    gas.TPX = t, p, m.get("gas_comp", "CH4:1, O2:1.5, AR:0.1")
+
+    r = ct.FlowReactor(gas)
+    r.area = area
+    r.surface_area_to_volume_ratio = m.get("cat_area_per_vol_per_m", 1e5) * porosity
+    r.mass_flow_rate = m.get("velocity_m_s", 40e-2 / 60.0) * gas.density * area * porosity
+    r.energy_enabled = bool(m.get("energy_enabled", False))
+    rsurf = ct.ReactorSurface(surf, r)
+    sim = ct.ReactorNet([r])
+
+    # Ausgabegitter statt jedes Integratorschritts (wie Praktikum/flow_recorder.py)
+    n_gas = gas.n_species
+    grid = np.linspace(0.0, length, int(case.get("n_points", 201)))
+    data = np.empty((len(grid), 3 + n_gas + surf.n_species))
+    for i, z in enumerate(grid):
+        if z > sim.distance:
+            sim.advance(z)
+        data[i, :3] = sim.distance, r.T, r.phase.P
+        data[i, 3:3 + n_gas] = r.phase.X
+        data[i, 3 + n_gas:] = rsurf.kinetics.coverages
+    arrays = {"z_m": data[:, 0], "T": data[:, 1], "P": data[:, 2],
+              "X": data[:, 3:3 + n_gas], "coverages": data[:, 3 + n_gas:]}
+    res = {"T_out": float(r.T), "T_max": float(data[:, 1].max()), "P_out": float(r.phase.P),
+           "CH4": float(r.phase["CH4"].X[0]), "n_points": len(grid)}
+    return res, arrays
+
+
+def run_case(case: dict) -> dict:
+    """Run one case; never raises (errors end up in the returned record)."""
+    t0 = time.perf_counter()
+    rec = {"name": case["name"], "kind": case["kind"], "pid": os.getpid(), "ok": True,
+           "error": None, "result": {}, "arrays": {}}
+    try:
+        runner = _run_cascade if case["kind"] == "cascade" else _run_flow_reactor
+        rec["result"], rec["arrays"] = runner(case)
+    except Exception as e:
+        rec["ok"] = False
+        rec["error"] = f"{type(e).__name__}: {e}"
+        rec["failure"] = getattr(e, "record", None)
+    rec["wall_s"] = time.perf_counter() - t0
+    return rec
+
+
+# ----------------------------------------------------------------------
+# Batch
+# ----------------------------------------------------------------------
+def run_batch(cases: list, out_dir: str, n_workers: int = 1) -> dict:
+    """Run all cases (inline for n_workers=1, else a process pool) and write the outputs."""
+    os.makedirs(out_dir, exist_ok=True)
+    t0 = time.perf_counter()
+    if n_workers <= 1:
+        _warmup()
+        records = [run_case(c) for c in cases]
+    else:
+        with ProcessPoolExecutor(n_workers, initializer=_warmup) as pool:
+            records = list(pool.map(run_case, cases))
+    total = time.perf_counter() - t0
+
+    # results.csv: skalare Ergebnisse, eine Zeile je Fall
+    keys = []
+    for rec in records:
+        keys += [k for k in rec["result"] if k not in keys]
+    with open(os.path.join(out_dir, "results.csv"), "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["name", "kind", "ok", "wall_s", *keys])
+        for rec in records:
+            w.writerow([rec["name"], rec["kind"], rec["ok"], f"{rec['wall_s']:.4f}",
+                        *[rec["result"].get(k, "") for k in keys]])
+
+    # profiles.npz: alle Profile in einer Datei
+    arrays = {f"{rec['name']}/{k}": v for rec in records for k, v in rec["arrays"].items()}
+    np.savez_compressed(os.path.join(out_dir, "profiles.npz"), **arrays)
+
+    try:
+        import cantera
+        ct_version = cantera.__version__
+    except ImportError:
+        ct_version = None
+    manifest = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "n_cases": len(cases),
+        "n_failed": sum(not r["ok"] for r in records),
+        "n_workers": n_workers,
+        "total_wall_s": total,
+        "sum_case_wall_s": sum(r["wall_s"] for r in records),
+        "python": platform.python_version(),
+        "cantera": ct_version,
+        "cases": [
+            {"name": r["name"], "kind": r["kind"], "ok": r["ok"], "wall_s": r["wall_s"], "pid": r["pid"],
+             "error": r["error"], "failure": r.get("failure"),
+             "arrays": sorted(r["arrays"]), "case": c}
+            for r, c in zip(records, cases)
+        ],
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    return manifest
+
+
+# ----------------------------------------------------------------------
+# optionaler Plot-Schritt (einziger Ort mit matplotlib)
+# ----------------------------------------------------------------------
+def plot_batch(out_dir: str, cases=None, quantity: str = "T", save: bool = False):
+    import matplotlib.pyplot as plt
+
+    with open(os.path.join(out_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+    data = np.load(os.path.join(out_dir, "profiles.npz"))
+    fig, ax = plt.subplots(figsize=(7, 4.5))
+    for c in manifest["cases"]:
+        name = c["name"]
+        if cases and name not in cases:
+            continue
+        if f"{name}/z_m" in data and f"{name}/{quantity}" in data:
+            ax.plot(data[f"{name}/z_m"] * 1e3, data[f"{name}/{quantity}"], label=name)
+    ax.set_xlabel("z [mm]")
+    ax.set_ylabel(quantity)
+    ax.grid()
+    ax.legend(loc="best")
+    if save:
+        fig.savefig(os.path.join(out_dir, f"profiles_{quantity}.png"), dpi=200)
+    else:
+        plt.show()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run many reactor cases in one process / pool.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    p_run = sub.add_parser("run", help="run a case file")
+    p_run.add_argument("case_file")
+    p_run.add_argument("--out", default=None, help="output directory (default: ../Ergebnisse/batch_<file>)")
+    p_run.add_argument("--workers", type=int, default=1)
+
+    p_plot = sub.add_parser("plot", help="plot profiles of a finished batch")
+    p_plot.add_argument("out_dir")
+    p_plot.add_argument("--case", action="append", help="only these cases (repeatable)")
+    p_plot.add_argument("--quantity", default="T", help="profile key, e.g. T, CH4, P")
+    p_plot.add_argument("--save", action="store_true", help="write PNG instead of showing")
+
+    args = ap.parse_args(argv)
+    if args.cmd == "run":
+        # Modell-Imports (Kaskade_Klasse) liegen neben diesem Skript
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        cases = load_cases(args.case_file)
+        out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Ergebnisse",
+                                       "batch_" + os.path.splitext(os.path.basename(args.case_file))[0])
+        manifest = run_batch(cases, out, args.workers)
+        print(f"{manifest['n_cases']} cases ({manifest['n_failed']} failed) in "
+              f"{manifest['total_wall_s']:.1f} s -> {os.path.abspath(out)}")
+    else:
+        plot_batch(args.out_dir, args.case, args.quantity, args.save)
+
+
+if __name__ == "__main__":
+    main()
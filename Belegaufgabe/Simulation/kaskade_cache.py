@@ -0,0 +1,193 @@
+# kaskade_cache.py
+"""
+Toleranzbasierter Ergebnis-Cache (KD-Baum) statt exakter round(x, 6)-Schlüssel.
+
+Mit round(x, 6) werden zwei Designs, die sich um 1e-7 in der Porosität unterscheiden,
+beide simuliert, und Designs im Abstand 1e-5 (im Ergebnis praktisch identisch) werden
+nie wiederverwendet. ToleranceCache vergleicht stattdessen pro Dimension gegen eine
+Toleranz:
+
+    |x_i - x_i'| <= tol_i  für alle i   ->  Treffer
+
+  - tol_i = atol_i + rtol_i * scale_i  (scale z.B. Bounds-Spanne -> skalenbewusst)
+  - Koordinaten werden durch tol geteilt, Treffer = Chebyshev-Abstand <= 1 (cKDTree, p=inf)
+  - inkrementelles Einfügen: statischer Baum + kleiner Puffer (Brute-Force), Neubau des
+    Baums erst wenn der Puffer ~sqrt(n) groß ist (amortisiert billig)
+  - Speicherlimit max_entries: am längsten nicht genutzte Einträge fliegen raus (LRU)
+  - optional interpolate(): lokale lineare Regression über Nachbarn + Fehlerschätzung
+
+Verhält sich wie ein dict mit Parametervektoren als Schlüssel (in / [] / []=), kann also
+den alten Cache im CatMultiObjectiveProblem direkt ersetzen.
+"""
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class ToleranceCache:
+    """
+    Nearest-neighbour result cache with per-dimension tolerances.
+
+    Parameters
+    ----------
+    atol, rtol, scale:
+        Per-dimension tolerance tol = atol + rtol * |scale|.
+    max_entries:
+        Memory bound; least recently used entries are evicted beyond it.
+    """
+
+    def __init__(self, atol, rtol=0.0, scale=1.0, max_entries: int = 200_000):
+        self.tol = np.asarray(atol, dtype=float) + np.asarray(rtol, dtype=float) * np.abs(
+            np.asarray(scale, dtype=float))
+        if np.any(self.tol <= 0.0):
+            raise ValueError("all tolerances must be > 0")
+        self.dim = len(self.tol)
+        self.max_entries = int(max_entries)
+
+        # wachsende Puffer (Kapazität verdoppeln), belegt sind die ersten _n Zeilen
+        self._n = 0
+        self._Z = np.empty((64, self.dim))      # skalierte Koordinaten (x / tol)
+        self._V = None                          # Werte, shape (cap, m)
+        self._stamp = np.empty(64, dtype=np.int64)
+        self._clock = 0
+        self._tree = None
+        self._n_tree = 0                        # Einträge [0, _n_tree) liegen im Baum
+
+        self.hits = 0
+        self.misses = 0
+        self.interpolated = 0
+
+    @classmethod
+    def from_bounds(cls, xl, xu, rel_tol: float = 1e-4, **kwargs):
+        """
+        Tolerance = rel_tol * (xu - xl) per dimension. Default 1e-4: porosity span 0.3
+        -> tol 3e-5, so designs 1e-5 apart hit (1e-5 would give 3e-6 and miss them).
+        """
+        span = np.asarray(xu, dtype=float) - np.asarray(xl, dtype=float)
+        return cls(atol=0.0 * span, rtol=rel_tol, scale=span, **kwargs)
+
+    def __len__(self) -> int:
+        return self._n
+
+    # --- Suche -------------------------------------------------------
+    def _z(self, x):
+        return np.asarray(x, dtype=float)[: self.dim] / self.tol
+
+    def _nearest(self, z):
+        """(index, chebyshev distance) of the closest stored point."""
+        best_i, best_d = -1, np.inf
+        if self._tree is not None:
+            d, i = self._tree.query(z, k=1, p=np.inf)
+            if np.isfinite(d):
+                best_i, best_d = int(i), float(d)
+        if self._n > self._n_tree:
+            buf = self._Z[self._n_tree:self._n]
+            dists = np.max(np.abs(buf - z), axis=1)
+            j = int(np.argmin(dists))
+            if dists[j] < best_d:
+                best_i, best_d = self._n_tree + j, float(dists[j])
+        return best_i, best_d
+
+    def _neighbours(self, z, radius: float):
+        idx = []
+        if self._tree is not None:
+            idx.extend(self._tree.query_ball_point(z, r=radius, p=np.inf))
+        if self._n > self._n_tree:
+            buf = self._Z[self._n_tree:self._n]
+            idx.extend((self._n_tree + np.flatnonzero(np.max(np.abs(buf - z), axis=1) <= radius)).tolist())
+        return np.asarray(idx, dtype=int)
+
+    def lookup(self, x):
+        """Stored value within tolerance, or None."""
+        if len(self) == 0:
+            self.misses += 1
+            return None
+        i, d = self._nearest(self._z(x))
+        if i >= 0 and d <= 1.0:
+            self.hits += 1
+            self._clock += 1
+            self._stamp[i] = self._clock
+            return self._V[i]
+        self.misses += 1
+        return None
+
+    def interpolate(self, x, radius: float = 20.0, min_points: int | None = None):
+        """
+        Local linear estimate from neighbours within `radius` (in tolerance units).
+
+        Returns (value, err) or (None, inf) if there are too few neighbours. err is the
+        weighted RMS residual of the local fit (per output), i.e. a rough error estimate.
+        """
+        z = self._z(x)
+        idx = self._neighbours(z, radius) if len(self) else np.empty(0, int)
+        need = min_points if min_points is not None else self.dim + 2
+        if idx.size < need:
+            return None, np.inf
+        dz = self._Z[idx] - z
+        V = self._V[idx]
+        w = 1.0 / (np.max(np.abs(dz), axis=1) + 1.0)
+        A = np.hstack([np.ones((idx.size, 1)), dz]) * w[:, None]
+        coef, *_ = np.linalg.lstsq(A, V * w[:, None], rcond=None)
+        resid = (A @ coef - V * w[:, None]) / w[:, None]
+        dof = max(idx.size - self.dim - 1, 1)
+        err = np.sqrt((w[:, None] * resid ** 2).sum(axis=0) / (w.sum() * dof / idx.size))
+        self.interpolated += 1
+        return coef[0], err
+
+    # --- Einfügen / Verdrängen ---------------------------------------
+    def insert(self, x, value):
+        value = np.atleast_1d(np.asarray(value, dtype=float))
+        if self._V is None:
+            self._V = np.empty((len(self._Z), value.size))
+        if self._n == len(self._Z):
+            cap = 2 * len(self._Z)
+            self._Z = np.resize(self._Z, (cap, self.dim))
+            self._V = np.resize(self._V, (cap, self._V.shape[1]))
+            self._stamp = np.resize(self._stamp, cap)
+        self._clock += 1
+        self._Z[self._n] = self._z(x)
+        self._V[self._n] = value
+        self._stamp[self._n] = self._clock
+        self._n += 1
+
+        if len(self) > self.max_entries:
+            self._evict()
+        elif len(self) - self._n_tree > max(32, int(np.sqrt(len(self)))):
+            self._rebuild()
+
+    def _evict(self):
+        # 10 % Reserve freimachen, damit nicht bei jedem insert neu gebaut wird
+        keep_n = int(0.9 * self.max_entries)
+        keep = np.sort(np.argsort(self._stamp[:self._n])[-keep_n:])
+        self._Z[:keep_n] = self._Z[keep]
+        self._V[:keep_n] = self._V[keep]
+        self._stamp[:keep_n] = self._stamp[keep]
+        self._n = keep_n
+        self._rebuild()
+
+    def _rebuild(self):
+        # Baum nur über die belegten Zeilen (Kopie, damit spätere Schreibzugriffe ihn nicht stören)
+        self._tree = cKDTree(self._Z[:self._n].copy()) if self._n else None
+        self._n_tree = self._n
+
+    # --- dict-Schnittstelle (Ersatz für den alten round()-Cache) ------
+    def __contains__(self, x) -> bool:
+        found = False
+        if len(self):
+            i, d = self._nearest(self._z(x))
+            found = i >= 0 and d <= 1.0
+        if not found:
+            self.misses += 1
+        return found
+
+    def __getitem__(self, x):
+        v = self.lookup(x)
+        if v is None:
+            raise KeyError(tuple(np.asarray(x, dtype=float)))
+        return tuple(float(a) for a in v)
+
+    def __setitem__(self, x, value):
+        self.insert(x, value)
+
+    def stats(self) -> dict:
+        return {"entries": len(self), "hits": self.hits, "misses": self.misses,
+                "interpolated": self.interpolated}
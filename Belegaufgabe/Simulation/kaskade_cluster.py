@@ -0,0 +1,396 @@
+# kaskade_cluster.py
+"""
+Verteilte Auswertung der CSTR-Kaskade über TCP (Koordinator + Worker-Pool).
+
+    Koordinator  <---- TCP (multiprocessing.connection, authkey) ---->  Worker 1..n
+
+  - Worker bauen beim Start EINMAL ein CSTRCascadeModel (model_kwargs vom Koordinator)
+    und holen sich danach Parametervektoren aus der Task-Queue (pull: "ready" -> "task").
+  - Während einer Rechnung schickt jeder Worker Heartbeats. Bleiben diese länger als
+    heartbeat_timeout aus oder bricht die Verbindung ab, gilt der Worker als tot und
+    seine laufende Task wird erneut in die Queue gestellt (max. max_retries mal).
+  - Schnittstelle wie concurrent.futures: submit(func, *args) -> Future, map(func, it).
+    Damit passt der Koordinator direkt als `workers=` in differential_evolution und
+    als evaluator im CatMultiObjectiveProblem.
+
+Worker auf einem Rechenknoten starten (authkey als Hex im Environment):
+
+    KASKADE_CLUSTER_KEY=<hex> python kaskade_cluster.py worker --host <coord> --port <port>
+
+Lokal (Tests / Laptop) startet LocalCluster n Worker-Prozesse auf 127.0.0.1:
+
+    with LocalCluster(4, model_kwargs=model.config) as cluster:
+        optimize_kaskade_einkriteriell.main(workers=cluster.map)
+        optimize_kaskade_multikriteriell.main(evaluator=cluster)
+"""
+import argparse
+import hashlib
+import itertools
+import os
+import pickle
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+from multiprocessing.connection import Client, Listener
+
+AUTHKEY_ENV = "KASKADE_CLUSTER_KEY"
+
+# Funktionen gegen das vorgeladene Modell leben im import-leichten kaskade_worker;
+# hier nur re-exportiert (Worker: preload_model über die "init"-Nachricht)
+from kaskade_worker import ch4_point, objective_point, preload_model, simulate_point  # noqa: F401
+
+
+# ----------------------------------------------------------------------
+# Koordinator
+# ----------------------------------------------------------------------
+class WorkerLost(RuntimeError):
+    """A task was given up after its worker died more than max_retries times."""
+
+
+class _Task:
+    # EIN Future pro Task, auch über Wiederholungen hinweg (der Aufrufer hält genau dieses)
+    __slots__ = ("task_id", "func_id", "args", "future", "attempts")
+
+    def __init__(self, task_id, func_id, args, future):
+        self.task_id = task_id
+        self.func_id = func_id
+        self.args = args
+        self.future = future
+        self.attempts = 0
+
+
+def _settle(fut: Future, value=None, exc: BaseException | None = None):
+    """Set result / exception unless the future is already done (close() vs. late result)."""
+    try:
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(value)
+    except InvalidStateError:
+        pass
+
+
+class ClusterCoordinator:
+    """
+    TCP coordinator: owns the task queue and one handler thread per connected worker.
+
+    Parameters
+    ----------
+    host, port:
+        Listen address. port=0 picks a free port (see .address).
+    model_kwargs:
+        Constructor arguments of CSTRCascadeModel that every worker preloads
+        (usually model.config). None -> workers only run plain functions.
+    heartbeat_timeout:
+        Seconds without any message from a worker before it is declared dead.
+    max_retries:
+        How often a task is re-submitted after losing its worker.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        model_kwargs: dict | None = None,
+        authkey: bytes | None = None,
+        heartbeat_timeout: float = 30.0,
+        max_retries: int = 3,
+    ):
+        self.model_kwargs = model_kwargs
+        self.authkey = authkey if authkey is not None else os.urandom(16)
+        self.heartbeat_timeout = float(heartbeat_timeout)
+        self.max_retries = int(max_retries)
+
+        self._listener = Listener((host, port), authkey=self.authkey)
+        self.address = self._listener.address
+
+        self._tasks = queue.Queue()
+        self._funcs = {}               # func_id -> gepickelte Funktion
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._workers = {}             # name -> handler thread
+        self._inflight = {}            # task_id -> _Task, gerade auf einem Worker
+
+        # Statistik
+        self.n_done = 0
+        self.n_resubmitted = 0
+        self.n_workers_lost = 0
+
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    # --- public API --------------------------------------------------
+    @property
+    def n_workers(self) -> int:
+        with self._lock:
+            return len(self._workers)
+
+    def wait_for_workers(self, n: int, timeout: float = 60.0):
+        t_end = time.monotonic() + timeout
+        while self.n_workers < n:
+            if time.monotonic() > t_end:
+                raise TimeoutError(f"only {self.n_workers}/{n} workers connected")
+            time.sleep(0.05)
+
+    def submit(self, func, *args) -> Future:
+        if self._closed:
+            raise RuntimeError("coordinator is closed")
+        fut = Future()
+        self._tasks.put(_Task(next(self._ids), self._register(func), args, fut))
+        return fut
+
+    def map(self, func, iterable):
+        """Order-preserving map; matches differential_evolution(workers=...)."""
+        futures = [self.submit(func, x) for x in iterable]
+        return [f.result() for f in futures]
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._listener.close()
+        except OSError:
+            pass
+        # alle offenen Futures beenden: wartende und gerade laufende (auch wiederholte, schon RUNNING)
+        pending = []
+        while True:
+            try:
+                pending.append(self._tasks.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            pending += list(self._inflight.values())
+            self._inflight.clear()
+        for task in pending:
+            if not task.future.cancel():
+                _settle(task.future, exc=WorkerLost(f"task {task.task_id}: coordinator closed"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- internals ---------------------------------------------------
+    def _register(self, func) -> str:
+        # jede Funktion nur einmal pickeln, Worker cachen sie über func_id
+        data = pickle.dumps(func)
+        func_id = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            self._funcs.setdefault(func_id, data)
+        return func_id
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                if self._closed:
+                    return
+                continue  # z.B. falscher authkey
+            threading.Thread(target=self._serve_worker, args=(conn,), daemon=True).start()
+
+    def _next_task(self):
+        while not self._closed:
+            try:
+                task = self._tasks.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            # erneut eingereihte Tasks laufen schon (RUNNING), nur beim ersten Mal umschalten
+            if task.attempts > 0 or task.future.set_running_or_notify_cancel():
+                if task.future.done():
+                    continue
+                with self._lock:
+                    self._inflight[task.task_id] = task
+                return task
+        return None
+
+    def _recv(self, conn):
+        """Next non-heartbeat message; TimeoutError if the worker went silent."""
+        while True:
+            if not conn.poll(self.heartbeat_timeout):
+                raise TimeoutError("heartbeat timeout")
+            msg = conn.recv()
+            if msg[0] != "heartbeat":
+                return msg
+
+    def _requeue(self, task: _Task, reason: str):
+        with self._lock:
+            self._inflight.pop(task.task_id, None)
+        task.attempts += 1
+        if task.attempts > self.max_retries or self._closed:
+            _settle(task.future, exc=WorkerLost(f"task {task.task_id} lost {task.attempts}x ({reason})"))
+            return
+        # gleiches Future (bleibt RUNNING), Task nur wieder einreihen
+        self.n_resubmitted += 1
+        self._tasks.put(task)
+
+    def _serve_worker(self, conn):
+        name = None
+        task = None
+        known_funcs = set()
+        try:
+            msg = conn.recv()
+            if msg[0] != "hello":
+                return
+            name = msg[1]
+            with self._lock:
+                self._workers[name] = threading.current_thread()
+            conn.send(("init", self.model_kwargs))
+            if self._recv(conn)[0] != "ready":
+                raise RuntimeError("worker failed to initialise")
+
+            while True:
+                task = self._next_task()
+                if task is None:
+                    break
+                payload = None
+                if task.func_id not in known_funcs:
+                    payload = self._funcs[task.func_id]
+                    known_funcs.add(task.func_id)
+                conn.send(("task", task.task_id, task.func_id, payload, task.args))
+
+                msg = self._recv(conn)
+                if msg[0] != "result" or msg[1] != task.task_id:
+                    raise RuntimeError(f"unexpected message {msg[0]!r}")
+                _, _, ok, value = msg
+                with self._lock:
+                    self._inflight.pop(task.task_id, None)
+                if ok:
+                    _settle(task.future, value)
+                else:
+                    _settle(task.future, exc=value)
+                task = None
+                self.n_done += 1
+        except (EOFError, OSError, TimeoutError, RuntimeError, pickle.UnpicklingError) as e:
+            self.n_workers_lost += 1
+            if task is not None:
+                self._requeue(task, f"{type(e).__name__}: {e}")
+        finally:
+            try:
+                conn.send(("stop",))
+            except (OSError, ValueError):
+                pass
+            conn.close()
+            if name is not None:
+                with self._lock:
+                    self._workers.pop(name, None)
+
+
+# ----------------------------------------------------------------------
+# Worker
+# ----------------------------------------------------------------------
+def run_worker(host: str, port: int, authkey: bytes, heartbeat_s: float = 2.0,
+               name: str | None = None):
+    """Connect to a coordinator and process tasks until it sends "stop"."""
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    conn = Client((host, port), authkey=authkey)
+    send_lock = threading.Lock()
+
+    def send(msg):
+        with send_lock:
+            conn.send(msg)
+
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(heartbeat_s):
+            try:
+                send(("heartbeat",))
+            except (OSError, ValueError):
+                return
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+
+    funcs = {}
+    try:
+        send(("hello", name))
+        msg = conn.recv()
+        if msg[0] == "init":
+            preload_model(msg[1])
+        send(("ready",))
+
+        while True:
+            msg = conn.recv()
+            if msg[0] == "stop":
+                break
+            _, task_id, func_id, payload, args = msg
+            if payload is not None:
+                funcs[func_id] = pickle.loads(payload)
+            try:
+                value = funcs[func_id](*args)
+                reply = ("result", task_id, True, value)
+            except Exception as e:
+                reply = ("result", task_id, False, e)
+            try:
+                send(reply)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                send(("result", task_id, False, RuntimeError(f"unpicklable result: {e}")))
+    except (EOFError, OSError):
+        pass  # Koordinator weg -> Worker beendet sich
+    finally:
+        stop.set()
+        conn.close()
+
+
+# ----------------------------------------------------------------------
+# Lokaler Stand-in: Koordinator + n Worker-Prozesse auf localhost
+# ----------------------------------------------------------------------
+class LocalCluster(ClusterCoordinator):
+    """
+    Coordinator plus n_workers worker subprocesses on 127.0.0.1.
+
+        with LocalCluster(4, model_kwargs=model.config) as cluster:
+            optimize.differential_evolution(..., workers=cluster.map)
+    """
+
+    def __init__(self, n_workers: int, model_kwargs: dict | None = None,
+                 heartbeat_s: float = 2.0, **kwargs):
+        super().__init__(host="127.0.0.1", port=0, model_kwargs=model_kwargs, **kwargs)
+        env = dict(os.environ)
+        env[AUTHKEY_ENV] = self.authkey.hex()
+        here = os.path.dirname(os.path.abspath(__file__))
+        env["PYTHONPATH"] = here + os.pathsep + env.get("PYTHONPATH", "")
+        host, port = self.address
+        self.procs = [
+            subprocess.Popen(
+                [sys.executable, os.path.join(here, "kaskade_cluster.py"), "worker",
+                 "--host", host, "--port", str(port), "--heartbeat", str(heartbeat_s)],
+                env=env, cwd=here,
+            )
+            for _ in range(int(n_workers))
+        ]
+        self.wait_for_workers(len(self.procs))
+
+    def close(self):
+        super().close()
+        for p in self.procs:
+            try:
+                p.wait(timeout=5.0)
+            except subprocess.TimeoutExpired:
+                p.kill()
+                p.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CSTR-Kaskade: Cluster-Worker")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    w = sub.add_parser("worker", help="Worker starten und mit Koordinator verbinden")
+    w.add_argument("--host", required=True)
+    w.add_argument("--port", type=int, required=True)
+    w.add_argument("--heartbeat", type=float, default=2.0, help="Heartbeat-Intervall [s]")
+    args = parser.parse_args(argv)
+
+    key = os.environ.get(AUTHKEY_ENV)
+    if not key:
+        parser.error(f"{AUTHKEY_ENV} (hex) muss gesetzt sein")
+    run_worker(args.host, args.port, bytes.fromhex(key), heartbeat_s=args.heartbeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# kaskade_isat.py
+"""
+ISAT-Tabelle (In Situ Adaptive Tabulation, Pope 1997) für die Stufen-Lösung der Kaskade.
+
+Jede Stufe jedes Laufs löst dasselbe Problem: Eintrittszustand (T, rho, Y) plus
+Stufenparameter (V_stage, A_surf_stage, mdot, Wärmeverlust U*A, T_amb) -> stationärer
+Austrittszustand über advance_to_steady_state(). Über tausende Optimierer-Auswertungen
+werden dieselben Bereiche dieser Abbildung immer wieder gelöst. Hier tabelliert:
+
+  - Eintrag: Stützstelle q0, Lösung f0 = f(q0), Linearisierung A = df/dq (Finite
+    Differenzen) und ein Ellipsoid der Genauigkeit (EOA) {q : z^T M z <= 1},
+    z = (q - q0) / (|q0| + x_atol)
+  - retrieve: liegt q im EOA eines Eintrags -> f0 + A (q - q0), keine Integration
+  - grow: sonst direkte Lösung; ist die lineare Näherung eines nahen Eintrags trotzdem
+    genau genug (max |f - f_lin| / (|f| + f_atol) <= rtol), wird dessen EOA minimal
+    erweitert, bis q enthalten ist
+  - add: sonst neuer Eintrag (kostet n_in zusätzliche Lösungen für A)
+  - Kandidatensuche: MRU-Eintrag, dann k nächste Stützstellen (cKDTree, global skaliert)
+  - Speicherlimit max_mb: am längsten nicht genutzte Einträge fliegen raus (LRU)
+  - optional geteilt zwischen Workern: share_dir -> sync() schreibt neue Einträge als
+    isat-<pid>-<n>.npz und liest die der anderen Worker (Dateisystem, wie ProfileStore)
+
+Nur die ersten n_check Komponenten von f (Gasphase) gehen in den Fehler ein; weitere
+(Bedeckungen als Startwert der nächsten Stufe) werden nur mitgeführt.
+
+    table = ISATTable(x_atol, f_atol, rtol=1e-4, n_check=2 + n_species)
+    f = table.query(q, solve)       # solve(q) -> f, direkte Stufen-Lösung
+"""
+import os
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class ISATTable:
+    """
+    Tabulated map q -> f(q) with linearizations and ellipsoids of accuracy.
+
+    Parameters
+    ----------
+    x_atol, f_atol:
+        Absolute floors of the relative input / output scaling (one per component).
+    rtol:
+        Accuracy of a retrieved value (relative, on the first n_check outputs).
+    n_check:
+        Number of leading outputs included in the error check (None: all).
+    r_max:
+        Largest initial EOA radius in scaled input coordinates.
+    max_mb:
+        Memory bound of the table.
+    share_dir:
+        Directory for exchanging new records between workers (None: private table).
+    """
+
+    def __init__(self, x_atol, f_atol, rtol: float = 1e-4, n_check: int | None = None,
+                 r_max: float = 1e-2, fd_rel: float = 1e-6, k_nearest: int = 8,
+                 max_mb: float = 256.0, share_dir: str | None = None):
+        self.x_atol = np.asarray(x_atol, dtype=float)
+        self.f_atol = np.asarray(f_atol, dtype=float)
+        self.n_in, self.n_out = len(self.x_atol), len(self.f_atol)
+        self.rtol = float(rtol)
+        self.n_check = self.n_out if n_check is None else int(n_check)
+        self.r_max = float(r_max)
+        self.fd_rel = float(fd_rel)
+        self.k_nearest = int(k_nearest)
+        rec_bytes = 8 * (2 * self.n_in + self.n_out + self.n_out * self.n_in + self.n_in ** 2 + 1)
+        self.max_records = max(16, int(max_mb * 2 ** 20 / rec_bytes))
+        self.share_dir = share_dir
+
+        self._n = 0
+        self._alloc(64)
+        self._clock = 0
+        self._gscale = None         # globale Skalierung für den KD-Baum (erste Stützstelle)
+        self._tree = None
+        self._n_tree = 0
+        self._mru = -1
+        self._n_synced = 0          # eigene Einträge [_n_synced, ...) noch nicht geteilt
+        self._seen = set()          # bereits gelesene Dateien anderer Worker
+        self._n_files = 0
+
+        self.retrieves = 0
+        self.grows = 0
+        self.adds = 0
+        self.direct = 0             # Lösungen insgesamt (inkl. Finite Differenzen)
+
+    def _alloc(self, cap):
+        self._Q = np.empty((cap, self.n_in))
+        self._SX = np.empty((cap, self.n_in))
+        self._F = np.empty((cap, self.n_out))
+        self._A = np.empty((cap, self.n_out, self.n_in))
+        self._M = np.empty((cap, self.n_in, self.n_in))
+        self._stamp = np.empty(cap, dtype=np.int64)
+        self._own = np.empty(cap, dtype=bool)
+
+    def _grow_capacity(self):
+        cap = 2 * len(self._Q)
+        for name in ("_Q", "_SX", "_F", "_A", "_M", "_stamp", "_own"):
+            old = getattr(self, name)
+            new = np.empty((cap,) + old.shape[1:], dtype=old.dtype)
+            new[:self._n] = old[:self._n]
+            setattr(self, name, new)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getstate__(self):
+        # Baum nicht mitschicken, wird beim nächsten Zugriff neu gebaut
+        state = self.__dict__.copy()
+        state["_tree"], state["_n_tree"] = None, 0
+        return state
+
+    # --- Suche -------------------------------------------------------
+    def _g(self, q):
+        return q / self._gscale
+
+    def _candidates(self, q) -> list:
+        """MRU record first, then the k nearest stored points."""
+        if self._n == 0:
+            return []
+        g = self._g(q)
+        idx = []
+        if self._tree is not None:
+            k = min(self.k_nearest, self._n_tree)
+            _, i = self._tree.query(g, k=k)
+            idx.extend(np.atleast_1d(i).tolist())
+        if self._n > self._n_tree:
+            buf = self._Q[self._n_tree:self._n] / self._gscale
+            d = np.linalg.norm(buf - g, axis=1)
+            idx.extend((self._n_tree + np.argsort(d)[:self.k_nearest]).tolist())
+        if 0 <= self._mru < self._n:
+            idx.insert(0, self._mru)
+        return list(dict.fromkeys(int(i) for i in idx if i < self._n))
+
+    def _inside(self, i, q) -> bool:
+        z = (q - self._Q[i]) / self._SX[i]
+        return float(z @ self._M[i] @ z) <= 1.0
+
+    def _linear(self, i, q):
+        return self._F[i] + self._A[i] @ (q - self._Q[i])
+
+    def _error(self, f_lin, f) -> float:
+        c = self.n_check
+        return float(np.max(np.abs(f_lin[:c] - f[:c]) / (np.abs(f[:c]) + self.f_atol[:c])))
+
+    # --- Abfrage -----------------------------------------------------
+    def query(self, q, solve):
+        """f(q): retrieved linear approximation, or solve(q) (growing / adding records)."""
+        q = np.asarray(q, dtype=float)
+        cand = self._candidates(q)
+        for i in cand:
+            if self._inside(i, q):
+                self._touch(i)
+                self.retrieves += 1
+                return self._linear(i, q)
+
+        f = np.asarray(solve(q), dtype=float)
+        self.direct += 1
+        grown = False
+        for i in cand:
+            if self._error(self._linear(i, q), f) <= self.rtol:
+                self._grow_eoa(i, q)
+                grown = True
+        if grown:
+            self.grows += 1
+        else:
+            self._add(q, f, solve)
+            self.adds += 1
+        return f
+
+    def _touch(self, i):
+        self._clock += 1
+        self._stamp[i] = self._clock
+        self._mru = i
+
+    def _grow_eoa(self, i, q):
+        # minimales Ellipsoid, das das alte EOA und q enthält (Rang-1-Update):
+        # M' = M + (1/|y|^2 - 1)/|y|^2 (M p)(M p)^T,  |y|^2 = p^T M p > 1
+        p = (q - self._Q[i]) / self._SX[i]
+        Mp = self._M[i] @ p
+        y2 = float(p @ Mp)
+        if y2 > 1.0:
+            self._M[i] += ((1.0 / y2 - 1.0) / y2) * np.outer(Mp, Mp)
+        self._touch(i)
+
+    def _add(self, q, f, solve):
+        # Linearisierung per Vorwärts-Differenzen
+        sx = np.abs(q) + self.x_atol
+        A = np.empty((self.n_out, self.n_in))
+        for j in range(self.n_in):
+            h = self.fd_rel * sx[j]
+            qj = q.copy()
+            qj[j] += h
+            A[:, j] = (np.asarray(solve(qj), dtype=float) - f) / h
+            self.direct += 1
+        # Start-EOA aus der Linearisierung (Pope): |S_f A S_x z| <= rtol, höchstens Radius r_max
+        c = self.n_check
+        B = A[:c] * sx[None, :] / (np.abs(f[:c]) + self.f_atol[:c])[:, None]
+        M = B.T @ B / self.rtol ** 2 + np.eye(self.n_in) / self.r_max ** 2
+        self._insert(q, sx, f, A, M, own=True)
+
+    def _insert(self, q, sx, f, A, M, own: bool):
+        if self._gscale is None:
+            self._gscale = np.abs(q) + self.x_atol
+        if self._n == len(self._Q):
+            self._grow_capacity()
+        i = self._n
+        self._Q[i], self._SX[i], self._F[i], self._A[i], self._M[i] = q, sx, f, A, M
+        self._own[i] = own
+        self._n += 1
+        self._touch(i)
+        if self._n > self.max_records:
+            self._evict()
+        elif self._n - self._n_tree > max(32, int(np.sqrt(self._n))):
+            self._rebuild()
+
+    def _evict(self):
+        # eigene, noch nicht geteilte Einträge vorher rausschreiben
+        self.sync(read=False)
+        keep_n = int(0.9 * self.max_records)
+        keep = np.sort(np.argsort(self._stamp[:self._n])[-keep_n:])
+        for name in ("_Q", "_SX", "_F", "_A", "_M", "_stamp", "_own"):
+            arr = getattr(self, name)
+            arr[:keep_n] = arr[keep]
+        self._n = self._n_synced = keep_n
+        self._mru = -1
+        self._rebuild()
+
+    def _rebuild(self):
+        self._tree = cKDTree(self._Q[:self._n] / self._gscale) if self._n else None
+        self._n_tree = self._n
+
+    # --- Teilen zwischen Workern ------------------------------------
+    def sync(self, read: bool = True):
+        """Write own new records to share_dir and (read=True) load the other workers' files."""
+        if self.share_dir is None:
+            return
+        os.makedirs(self.share_dir, exist_ok=True)
+        new = np.flatnonzero(self._own[self._n_synced:self._n]) + self._n_synced
+        if new.size:
+            path = os.path.join(self.share_dir, f"isat-{os.getpid()}-{self._n_files:05d}.npz")
+            np.savez(path + ".tmp.npz", Q=self._Q[new], SX=self._SX[new], F=self._F[new],
+                     A=self._A[new], M=self._M[new])
+            os.replace(path + ".tmp.npz", path)     # atomar: andere lesen keine halben Dateien
+            self._seen.add(os.path.basename(path))
+            self._n_files += 1
+        self._n_synced = self._n
+        if not read:
+            return
+        for name in sorted(os.listdir(self.share_dir)):
+            if not name.endswith(".npz") or name.endswith(".tmp.npz") or name in self._seen:
+                continue
+            self._seen.add(name)
+            with np.load(os.path.join(self.share_dir, name)) as d:
+                for rec in zip(d["Q"], d["SX"], d["F"], d["A"], d["M"]):
+                    self._insert(*rec, own=False)
+        self._n_synced = self._n
+
+    def stats(self) -> dict:
+        return {"records": self._n, "retrieves": self.retrieves, "grows": self.grows,
+                "adds": self.adds, "direct_solves": self.direct}
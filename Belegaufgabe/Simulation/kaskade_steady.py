@@ -0,0 +1,389 @@
+# kaskade_steady.py
+"""
+Stationäre Stufen-Bilanz der Kaskade ohne Zeitintegration (QSS der Oberflächenbedeckungen).
+
+Die Bedeckungen der ReactorSurface relaxieren auf Zeitskalen weit unter der Verweilzeit
+des Gases; diese Steifigkeit erzwingt atol=1e-15 und die vielen Schritte in
+advance_to_steady_state(). Hier werden die Bedeckungen eliminiert:
+
+  - Oberfläche quasistationär: zu jedem Gaszustand (T, P, Y) wird die Platzbilanz
+    algebraisch gelöst (Interface.advance_coverages_to_steady_state, gedämpftes Newton
+    in Cantera), Startwert = zuletzt gelöste Bedeckung (vorherige Stufe / Iteration)
+  - übrig bleibt nur die Gasphase, u = [Y_1..Y_K, T]:
+
+        R_Y = Y_in - Y + (omega V + s A) W / mdot                       = 0
+        R_T = (h_in - h(T, Y) - U A (T - T_amb) / mdot) / cp_in         = 0   (Energie an)
+        R_T = T_in - T                                                  = 0   (Energie aus)
+
+    (stationär: keine Akkumulation auf der Oberfläche -> Enthalpie rein = raus + Wärmeverlust)
+  - gedämpftes Newton mit Finite-Differenzen-Jacobi-Matrix; die LU-Zerlegung wird über
+    Iterationen und Stufen wiederverwendet und erst neu berechnet, wenn die Konvergenz
+    nachlässt (vereinfachtes Newton)
+  - Startwert: Eintritt + Änderung der vorherigen Stufe (Extrapolation entlang der Kaskade)
+  - konvergiert eine Stufe nicht, meldet solve() None -> Aufrufer integriert gekoppelt
+
+CascadeNewton: statt Stufe für Stufe alle N Stufenbilanzen als ein System. Stufe i hängt
+nur von u_i und u_{i-1} ab -> Jacobi-Matrix block-untere-bidiagonal, Newton-Schritt per
+Vorwärtssubstitution (eine LU je Diagonalblock, über Iterationen wiederverwendet).
+Startwert aus grober Kaskade (coarse_n Stufen, interpoliert) oder aus dem Profil des
+letzten (benachbarten) Designs. Optional mit Deadline (perf_counter-Zeitpunkt): wird
+sie überschritten, bricht solve() mit DeadlineExceeded ab (Wandzeit-Budget von simulate()).
+
+Reaktor, Gas und Interface sind die des Kaskaden-Netzwerks (Kaskade_Klasse._network);
+Stufenparameter (V, A, mdot, U*A, T_amb) werden dort abgelesen.
+
+    stage = QSSStage(net, energy=True)
+    u = stage.solve(u_in, P)    # u = [Y..., T]
+"""
+import time
+
+import numpy as np
+from scipy.linalg import lu_factor, lu_solve
+
+
+class DeadlineExceeded(RuntimeError):
+    """CascadeNewton ran past its deadline (wall-time budget of the caller)."""
+
+
+def _check(deadline):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise DeadlineExceeded("cascade Newton exceeded the wall-time budget")
+
+
+class QSSStage:
+    """
+    Gas-only steady-state residual of one CSTR stage with quasi-steady coverages.
+
+    Parameters
+    ----------
+    net:
+        Cantera network dict of CSTRCascadeModel (gas_r, surf, r, rsurf, mfc, wall, gas_amb).
+    energy:
+        Energy equation on (otherwise T = T_in).
+    tol:
+        Convergence tolerance on max |R| (mass fractions; T residual divided by 1000 K).
+    """
+
+    def __init__(self, net, energy: bool, tol: float = 1e-12, max_iter: int = 30, fd_rel: float = 1e-7):
+        self.net = net
+        self.gas, self.surf = net["gas_r"], net["surf"]
+        self.K = self.gas.n_species
+        self.W = self.gas.molecular_weights
+        self.energy = bool(energy)
+        self.tol = float(tol)
+        self.max_iter = int(max_iter)
+        self.fd_rel = float(fd_rel)
+        self.cov = np.array(self.surf.coverages)
+        self._lu = None
+        self._last_du = None     # Änderung über die vorherige Stufe (Startwert)
+        self.n_residuals = 0
+        self.n_jacobians = 0
+        self.n_iter = 0
+        self.n_failed = 0
+
+    def reset(self, coverages=None):
+        """Forget Jacobian and extrapolation (new simulate() call)."""
+        self._lu = None
+        self._last_du = None
+        if coverages is not None:
+            self.cov = np.array(coverages)
+
+    def state(self) -> tuple:
+        """Warm-start state (coverages, LU, last step) for restore()."""
+        return self.cov.copy(), self._lu, self._last_du
+
+    def restore(self, state):
+        cov, self._lu, self._last_du = state
+        self.cov = np.array(cov)
+
+    # --- Residuum ----------------------------------------------------
+    def params(self) -> tuple:
+        net = self.net
+        wall = net["wall"]
+        return (net["r"].volume, net["rsurf"].area, net["mfc"].mass_flow_rate,
+                wall.heat_transfer_coeff * wall.area, net["gas_amb"].T)
+
+    def coverages(self, T, P, Y) -> np.ndarray:
+        """Quasi-steady coverages at gas state (T, P, Y), warm-started from the last solution."""
+        self.gas.TPY = T, P, Y
+        self.surf.TP = T, P
+        self.surf.coverages = self.cov
+        self.surf.advance_coverages_to_steady_state()
+        self.cov = np.array(self.surf.coverages)
+        return self.cov
+
+    def inlet(self, u_in, P):
+        """(u_in, P, h_in, cp_in) of the inlet state."""
+        self.gas.TPY = u_in[-1], P, u_in[:-1]
+        return np.asarray(u_in, dtype=float), P, self.gas.enthalpy_mass, self.gas.cp_mass
+
+    def residual(self, u, inlet, params=None) -> np.ndarray:
+        u_in, P, h_in, cp_in = inlet
+        V, A, mdot, UA, T_amb = self.params() if params is None else params
+        Y, T = np.clip(u[:-1], 0.0, None), u[-1]
+        self.coverages(T, P, Y)     # setzt auch gas auf (T, P, Y)
+        self.n_residuals += 1
+        wdot = self.gas.net_production_rates * V + self.surf.get_net_production_rates(self.gas) * A
+        R = np.empty(self.K + 1)
+        R[:-1] = u_in[:-1] - Y + wdot * self.W / mdot
+        if self.energy:
+            R[-1] = (h_in - self.gas.enthalpy_mass - UA * (T - T_amb) / mdot) / cp_in / 1000.0
+        else:
+            R[-1] = (u_in[-1] - T) / 1000.0
+        return R
+
+    def jacobian(self, u, R, inlet, params=None) -> np.ndarray:
+        """Forward-difference dR/du (the coverages are re-solved for every column)."""
+        J = np.empty((self.K + 1, self.K + 1))
+        cov = self.cov.copy()
+        for j in range(self.K + 1):
+            h = self.fd_rel * max(abs(u[j]), 1e-6 if j < self.K else 1.0)
+            uj = u.copy()
+            uj[j] += h
+            self.cov = cov.copy()
+            J[:, j] = (self.residual(uj, inlet, params) - R) / h
+        self.cov = cov
+        self.n_jacobians += 1
+        return J
+
+    # --- Newton ------------------------------------------------------
+    def newton(self, u0, inlet, params=None):
+        """Damped simplified Newton from u0; returns (u, converged)."""
+        u = np.array(u0, dtype=float)
+        u[:-1] = np.clip(u[:-1], 0.0, None)
+        R = self.residual(u, inlet, params)
+        norm = np.max(np.abs(R))
+        fresh = False
+        for _ in range(self.max_iter):
+            if norm <= self.tol:
+                return u, True
+            if self._lu is None:
+                self._lu = lu_factor(self.jacobian(u, R, inlet, params))
+                fresh = True
+            du = -lu_solve(self._lu, R)
+            # Dämpfung: Schritt halbieren, bis das Residuum sinkt
+            lam, ok = 1.0, False
+            while lam >= 1.0 / 64:
+                un = u + lam * du
+                un[:-1] = np.clip(un[:-1], 0.0, None)
+                Rn = self.residual(un, inlet, params)
+                nn = np.max(np.abs(Rn))
+                if nn < norm:
+                    ok = True
+                    break
+                lam *= 0.5
+            self.n_iter += 1
+            if not ok:
+                # auch mit frischer Jacobi-Matrix kein Abstieg -> aufgeben
+                if fresh:
+                    return u, False
+                self._lu = None
+                continue
+            if nn > 0.5 * norm and not fresh:
+                self._lu = None     # langsame Kontraktion -> nächste Iteration neue Jacobi-Matrix
+            fresh = False
+            u, R, norm = un, Rn, nn
+        return u, norm <= self.tol
+
+    def solve(self, u_in, P, params=None):
+        """Stage outlet u = [Y..., T] for inlet u_in at pressure P, or None if Newton fails."""
+        inlet = self.inlet(u_in, P)
+        guess = inlet[0] + (self._last_du if self._last_du is not None else 0.0)
+        u, ok = self.newton(guess, inlet, params)
+        if not ok:
+            # zweiter Versuch vom Eintritt aus, mit frischer Jacobi-Matrix
+            self._lu = None
+            u, ok = self.newton(inlet[0], inlet, params)
+        if not ok:
+            self.n_failed += 1
+            self._lu = self._last_du = None
+            return None
+        self._last_du = u - inlet[0]
+        return u
+
+    def stats(self) -> dict:
+        return {"residuals": self.n_residuals, "jacobians": self.n_jacobians,
+                "newton_iter": self.n_iter, "failed_stages": self.n_failed}
+
+
+class CascadeNewton:
+    """
+    All N stage balances as one nonlinear system R(U) = 0, U = [u_1, ..., u_N]
+    (QSSStage residual). Stage i depends only on u_i and its inlet u_{i-1}, so the
+    Jacobian is block lower-bidiagonal:
+
+        D_i du_i + L_i du_{i-1} = -R_i      (D_i = dR_i/du_i by FD, L_i = dR_i/du_{i-1} analytic)
+
+    -> Newton step by forward substitution, one LU per diagonal block. The LUs are kept
+    over iterations (simplified Newton) and only refactorized when convergence slows.
+
+    Initial guess: the last converged profile (nearby design, interpolated onto N), else
+    coarse-to-fine: march with coarse_n stages (QSSStage.solve) and interpolate onto the
+    fine grid over the normalized position z = i / N.
+    """
+
+    def __init__(self, stage: QSSStage, tol: float = 1e-10, max_iter: int = 20, coarse_n: int = 25):
+        self.stage = stage
+        self.tol = float(tol)
+        self.max_iter = int(max_iter)
+        self.coarse_n = int(coarse_n)
+        self.last = None            # letztes konvergiertes Profil (N, K+1) -> Startwert
+        self.covs = None            # QSS-Bedeckungen je Stufe (Startwerte)
+        self.n_iter = 0
+        self.n_factorizations = 0   # LU-Zerlegungen von Diagonalblöcken
+        self.n_solves = 0
+        self.n_failed = 0
+
+    def reset(self):
+        self.last = None
+
+    # --- Bausteine ---------------------------------------------------
+    def _inlet_jacobian(self, u_in, P) -> np.ndarray:
+        # R_Y = Y_in - ...                  -> dR_Y/dY_in = I
+        # R_T = (h_in - ...) / cp_in / 1000 -> dR_T/dT_in = 1/1000, dR_T/dY_in,k = h_k / cp_in / 1000
+        st = self.stage
+        K = st.K
+        L = np.zeros((K + 1, K + 1))
+        L[:K, :K] = np.eye(K)
+        L[-1, -1] = 1.0 / 1000.0
+        if st.energy:
+            st.gas.TPY = u_in[-1], P, np.clip(u_in[:-1], 0.0, None)
+            L[-1, :K] = st.gas.partial_molar_enthalpies / st.W / st.gas.cp_mass / 1000.0
+        return L
+
+    def residuals(self, U, u0, P, params):
+        """(R (N, K+1), inlet tuples) for all stages; updates the per-stage coverages."""
+        st = self.stage
+        R = np.empty_like(U)
+        inlets = []
+        for i in range(len(U)):
+            inlet = st.inlet(u0 if i == 0 else U[i - 1], P)
+            st.cov = self.covs[i]
+            R[i] = st.residual(U[i], inlet, params)
+            self.covs[i] = st.cov
+            inlets.append(inlet)
+        return R, inlets
+
+    def factorize(self, U, R, inlets, params) -> list:
+        st = self.stage
+        lus = []
+        for i in range(len(U)):
+            st.cov = self.covs[i]
+            lus.append(lu_factor(st.jacobian(U[i], R[i], inlets[i], params)))
+        self.n_factorizations += len(U)
+        return lus
+
+    @staticmethod
+    def forward_substitution(lus, Ls, R) -> np.ndarray:
+        dU = np.empty_like(R)
+        for i in range(len(R)):
+            rhs = -R[i] if i == 0 else -R[i] - Ls[i] @ dU[i - 1]
+            dU[i] = lu_solve(lus[i], rhs)
+        return dU
+
+    @staticmethod
+    def interpolate(U, u0, n: int) -> np.ndarray:
+        """Profile U (stage outlets at z = 1..N_c / N_c, inlet u0 at z = 0) on n stages."""
+        Nc = len(U)
+        zc = np.arange(Nc + 1) / Nc
+        zf = np.arange(1, n + 1) / n
+        Uc = np.vstack([u0, U])
+        return np.column_stack([np.interp(zf, zc, Uc[:, j]) for j in range(Uc.shape[1])])
+
+    def march(self, u0, P, params, n: int, deadline=None):
+        """Stage by stage with QSSStage.solve (coarse grid); None if a stage fails."""
+        st = self.stage
+        st.reset()
+        U = np.empty((n, len(u0)))
+        covs = []
+        u = u0
+        for i in range(n):
+            _check(deadline)
+            u = st.solve(u, P, params)
+            if u is None:
+                return None
+            U[i] = u
+            covs.append(st.cov.copy())
+        self.covs = covs
+        return U
+
+    @staticmethod
+    def _map_covs(covs, n: int) -> list:
+        """Per-stage coverages of another grid onto n stages (nearest stage by position)."""
+        m = len(covs)
+        return [covs[min(i * m // n, m - 1)].copy() for i in range(n)]
+
+    # --- Newton ------------------------------------------------------
+    def newton(self, U, u0, P, params, deadline=None):
+        """
+        Damped simplified Newton on the whole cascade; returns (U, converged).
+        DeadlineExceeded once time.perf_counter() passes `deadline`.
+        """
+        U = np.array(U, dtype=float)
+        if self.covs is None:
+            self.covs = [self.stage.cov.copy() for _ in range(len(U))]
+        elif len(self.covs) != len(U):
+            self.covs = self._map_covs(self.covs, len(U))
+        R, inlets = self.residuals(U, u0, P, params)
+        norm = np.max(np.abs(R))
+        lus, Ls, fresh = None, None, False
+        for _ in range(self.max_iter):
+            if norm <= self.tol:
+                return U, True
+            _check(deadline)
+            if lus is None:
+                lus = self.factorize(U, R, inlets, params)
+                Ls = [None] + [self._inlet_jacobian(U[i - 1], P) for i in range(1, len(U))]
+                fresh = True
+            dU = self.forward_substitution(lus, Ls, R)
+            lam, ok = 1.0, False
+            while lam >= 1.0 / 64:
+                _check(deadline)
+                Un = U + lam * dU
+                Un[:, :-1] = np.clip(Un[:, :-1], 0.0, None)
+                Rn, inl = self.residuals(Un, u0, P, params)
+                nn = np.max(np.abs(Rn))
+                if nn < norm:
+                    ok = True
+                    break
+                lam *= 0.5
+            self.n_iter += 1
+            if not ok:
+                if fresh:
+                    return U, False
+                lus = None
+                continue
+            if nn > 0.5 * norm and not fresh:
+                lus = None          # langsame Kontraktion -> Blöcke neu zerlegen
+            fresh = False
+            U, R, inlets, norm = Un, Rn, inl, nn
+        return U, norm <= self.tol
+
+    def solve(self, u0, P, params_for, n: int, deadline=None):
+        """
+        Stage outlets U (n, K+1) for inlet u0; params_for(n) -> (V, A, mdot, U*A, T_amb)
+        per stage for an n-stage cascade. None if Newton does not converge,
+        DeadlineExceeded past `deadline` (time.perf_counter() value).
+        """
+        u0 = np.asarray(u0, dtype=float)
+        self.n_solves += 1
+        params = params_for(n)
+        U, ok = None, False
+        if self.last is not None:
+            U, ok = self.newton(self.interpolate(self.last, u0, n), u0, P, params, deadline)
+        if not ok:
+            nc = min(self.coarse_n, n)
+            Uc = self.march(u0, P, params_for(nc), nc, deadline)
+            if Uc is not None:
+                U, ok = self.newton(self.interpolate(Uc, u0, n), u0, P, params, deadline)
+        if not ok:
+            self.n_failed += 1
+            self.last = None
+            return None
+        self.last = U
+        return U
+
+    def stats(self) -> dict:
+        return {"solves": self.n_solves, "newton_iter": self.n_iter,
+                "block_factorizations": self.n_factorizations, "failed": self.n_failed,
+                **{f"stage_{k}": v for k, v in self.stage.stats().items()}}
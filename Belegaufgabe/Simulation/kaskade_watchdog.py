@@ -0,0 +1,353 @@
+# kaskade_watchdog.py
+"""
+Überwachter Prozess-Pool für Kaskaden-Auswertungen.
+
+objective_CH4 fängt jede Exception ab und gibt 1e3 zurück, ein hängender Lauf
+(z.B. eine Stufe, die bis max_steps integriert) blockiert aber einen Worker beliebig
+lange. SupervisedPool begrenzt das:
+
+  - pro Task ein Wall-Clock-Limit (timeout_s); wird es überschritten, wird der
+    Worker-Prozess hart beendet und durch einen neuen ersetzt
+  - die Uhr läuft erst, wenn der Worker "bereit" gemeldet hat: Start des Prozesses,
+    Import und initializer (preload_model) zählen nicht gegen timeout_s; Tasks gehen
+    nur an bereite Worker. Scheitert der initializer max_init_failures-mal in Folge,
+    wird der Platz aufgegeben; sind alle Plätze weg, enden offene Tasks mit EvaluationFailed
+  - Fehler werden als strukturierte Records gesammelt (self.failures, optional als
+    JSON-Lines-Datei): Grund, Stufe, Exception, Integrator-Statistik, Laufzeit, x
+  - map() liefert für fehlgeschlagene Punkte den Strafwert (penalty) -> passt als
+    `workers=` in differential_evolution; submit() liefert ein Future, das mit
+    EvaluationFailed endet (-> CatMultiObjectiveProblem setzt seine Strafwerte)
+
+Zusammen mit simulate(max_wall_s=..., max_steps_total=...) (sauberer Abbruch zwischen
+den Stufen) ist die Zeit, die pathologische Punkte kosten, nach oben beschränkt:
+
+    budget = {"max_wall_s": 20.0, "max_steps_total": 2_000_000}
+    with SupervisedPool(8, timeout_s=30.0, initializer=preload_model,
+                        initargs=(model.config, budget), failure_log="failures.jsonl") as pool:
+        optimize.differential_evolution(ch4_point, bounds, workers=pool.map, ...)
+
+make_pool() baut für die Optimierer-Treiber entweder einen ProcessPoolExecutor (wie
+bisher) oder, mit timeout_s, einen SupervisedPool mit vorgeladenem Modell.
+"""
+import hashlib
+import json
+import multiprocessing as mp
+import pickle
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+
+class EvaluationFailed(RuntimeError):
+    """Evaluation failed or timed out; .record holds the structured failure record."""
+
+    def __init__(self, record: dict):
+        self.record = record
+        super().__init__(f"{record.get('reason')} (stage {record.get('stage')}): "
+                         f"{record.get('message', '')}")
+
+
+def _failure_record(exc) -> dict:
+    record = getattr(exc, "record", None)
+    if isinstance(record, dict):
+        return dict(record)
+    return {
+        "reason": "exception",
+        "stage": None,
+        "exception": type(exc).__name__,
+        "message": str(exc),
+        "solver_stats": {},
+        "elapsed_s": None,
+    }
+
+
+def _worker_main(conn, stage, initializer, initargs):
+    """Worker loop: run tasks, report value or failure record, publish current stage."""
+    try:
+        from Kaskade_Klasse import CSTRCascadeModel
+
+        def hook(i):
+            stage.value = i
+
+        CSTRCascadeModel.progress_hook = staticmethod(hook)
+    except ImportError:
+        pass
+    if initializer is not None:
+        try:
+            initializer(*initargs)
+        except Exception as e:
+            conn.send(("init_failed", _failure_record(e)))
+            return
+    conn.send(("ready", None))
+
+    funcs = {}
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        func_id, payload, args = msg
+        if payload is not None:
+            funcs[func_id] = pickle.loads(payload)
+        stage.value = 0
+        t0 = time.perf_counter()
+        try:
+            conn.send(("ok", funcs[func_id](*args)))
+        except Exception as e:
+            rec = _failure_record(e)
+            if rec.get("elapsed_s") is None:
+                rec["elapsed_s"] = time.perf_counter() - t0
+            conn.send(("fail", rec))
+
+
+class _Slot:
+    """One worker process plus the task it is currently running."""
+
+    def __init__(self, ctx, initializer, initargs, init_failures: int = 0):
+        self.conn, child = ctx.Pipe()
+        self.stage = ctx.Value("i", 0, lock=False)
+        self.proc = ctx.Process(target=_worker_main, args=(child, self.stage, initializer, initargs),
+                                daemon=True)
+        self.proc.start()
+        child.close()
+        self.known = set()
+        self.task = None
+        self.t_start = None
+        self.state = "starting"     # -> "ready" nach dem initializer, "dead" nach zu vielen Fehlstarts
+        self.init_failures = init_failures
+
+
+class SupervisedPool:
+    """
+    Process pool with a per-task wall-clock limit and worker recycling.
+
+    Parameters
+    ----------
+    n_workers:
+        Number of worker processes.
+    timeout_s:
+        Wall-clock limit per task. Stuck workers are killed and replaced.
+    penalty:
+        Value returned by map() for failed/timed-out points (objective_CH4: 1e3).
+    initializer, initargs:
+        Run once per (re)started worker, e.g. kaskade_worker.preload_model.
+    failure_log:
+        Optional path; every failure record is appended as one JSON line.
+    max_init_failures:
+        Consecutive initializer failures after which a worker slot is given up.
+    """
+
+    def __init__(self, n_workers: int, timeout_s: float = 120.0, penalty: float = 1e3,
+                 initializer=None, initargs=(), failure_log: str | None = None,
+                 mp_context: str = "spawn", max_init_failures: int = 3):
+        self.timeout_s = float(timeout_s)
+        self.max_init_failures = int(max_init_failures)
+        self.penalty = penalty
+        self.failure_log = failure_log
+        self.failures = []
+        self.n_recycled = 0
+
+        self._ctx = mp.get_context(mp_context)
+        self._init = (initializer, initargs)
+        self._slots = [_Slot(self._ctx, initializer, initargs) for _ in range(int(n_workers))]
+        self._tasks = queue.Queue()
+        self._funcs = {}
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._supervise, daemon=True)
+        self._thread.start()
+
+    # --- public API --------------------------------------------------
+    def submit(self, func, *args) -> Future:
+        if self._closed:
+            raise RuntimeError("pool is closed")
+        data = pickle.dumps(func)
+        func_id = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            self._funcs.setdefault(func_id, data)
+        fut = Future()
+        self._tasks.put((func_id, args, fut))
+        return fut
+
+    def map(self, func, iterable):
+        """Order-preserving map; failed points get self.penalty."""
+        futures = [self.submit(func, x) for x in iterable]
+        out = []
+        for f in futures:
+            try:
+                out.append(f.result())
+            except EvaluationFailed:
+                out.append(self.penalty)
+        return out
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._thread.join()
+        for slot in self._slots:
+            if slot.state == "dead":
+                continue
+            try:
+                slot.conn.send(None)
+            except (OSError, ValueError):
+                pass
+            slot.proc.join(timeout=5.0)
+            if slot.proc.is_alive():
+                slot.proc.kill()
+
+    def shutdown(self, wait: bool = True):
+        """Executor-style alias of close() (drivers call pool.shutdown())."""
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- internals ---------------------------------------------------
+    def _record_failure(self, rec: dict, args):
+        rec = dict(rec)
+        try:
+            rec["x"] = [float(v) for v in args[0]]
+        except (TypeError, ValueError, IndexError):
+            rec["x"] = repr(args)
+        self.failures.append(rec)
+        if self.failure_log:
+            with open(self.failure_log, "a") as f:
+                f.write(json.dumps(rec) + "\n")
+
+    def _recycle(self, i: int, replace: bool = True):
+        slot = self._slots[i]
+        if slot.proc.is_alive():
+            slot.proc.kill()
+        slot.proc.join()
+        slot.conn.close()
+        if replace:
+            self._slots[i] = _Slot(self._ctx, *self._init, init_failures=slot.init_failures)
+            self.n_recycled += 1
+        else:
+            slot.state = "dead"
+
+    def _startup(self, i: int):
+        """Handle the first message of a starting worker ("ready" or initializer failure)."""
+        slot = self._slots[i]
+        try:
+            status, value = slot.conn.recv()
+        except (EOFError, OSError):
+            slot.proc.join(timeout=1.0)
+            status, value = "init_failed", {"reason": "worker_died", "stage": None, "exception": None,
+                                            "message": f"exitcode {slot.proc.exitcode}",
+                                            "solver_stats": {}, "elapsed_s": None}
+        if status == "ready":
+            slot.state = "ready"
+            slot.init_failures = 0
+            return
+        rec = {**value, "reason": "init_failed"}
+        self._record_failure(rec, None)
+        slot.init_failures += 1
+        self._recycle(i, replace=slot.init_failures < self.max_init_failures)
+
+    def _fail_queued(self):
+        # kein Worker mehr startfähig -> wartende Tasks nicht ewig hängen lassen
+        rec = {"reason": "no_workers", "stage": None, "exception": None,
+               "message": f"all workers failed to start {self.max_init_failures} times",
+               "solver_stats": {}, "elapsed_s": None}
+        while True:
+            try:
+                _, _, fut = self._tasks.get_nowait()
+            except queue.Empty:
+                return
+            if fut.set_running_or_notify_cancel():
+                fut.set_exception(EvaluationFailed(rec))
+
+    def _supervise(self):
+        while not (self._closed and self._tasks.empty() and all(s.task is None for s in self._slots)):
+            if all(s.state == "dead" for s in self._slots):
+                self._fail_queued()
+            # freie, bereite Worker mit Tasks versorgen
+            for slot in self._slots:
+                if slot.task is not None or slot.state != "ready":
+                    continue
+                try:
+                    func_id, args, fut = self._tasks.get_nowait()
+                except queue.Empty:
+                    break
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                payload = None if func_id in slot.known else self._funcs[func_id]
+                slot.known.add(func_id)
+                slot.conn.send((func_id, payload, args))
+                slot.task = (args, fut)
+                slot.t_start = time.monotonic()     # Worker ist bereit -> nur die Auswertung zählt
+
+            busy = [s for s in self._slots if s.task is not None]
+            starting = [s for s in self._slots if s.state == "starting"]
+            if not busy and not starting:
+                time.sleep(0.02)
+                continue
+
+            timeout = 0.1
+            if busy:
+                next_deadline = min(s.t_start + self.timeout_s for s in busy)
+                timeout = max(0.0, min(timeout, next_deadline - time.monotonic()))
+            ready = wait([s.conn for s in busy + starting], timeout=timeout)
+
+            for i, slot in enumerate(self._slots):
+                if slot.state == "starting":
+                    if slot.conn in ready:
+                        self._startup(i)
+                    continue
+                if slot.task is None:
+                    continue
+                args, fut = slot.task
+                if slot.conn in ready:
+                    try:
+                        status, value = slot.conn.recv()
+                    except (EOFError, OSError):
+                        # Worker-Prozess gestorben (Segfault, OOM, ...)
+                        slot.proc.join(timeout=1.0)
+                        rec = {"reason": "worker_died", "stage": slot.stage.value or None,
+                               "exception": None, "message": f"exitcode {slot.proc.exitcode}",
+                               "solver_stats": {}, "elapsed_s": time.monotonic() - slot.t_start}
+                        self._record_failure(rec, args)
+                        fut.set_exception(EvaluationFailed(rec))
+                        slot.task = None
+                        self._recycle(i)
+                        continue
+                    slot.task = None
+                    if status == "ok":
+                        fut.set_result(value)
+                    else:
+                        self._record_failure(value, args)
+                        fut.set_exception(EvaluationFailed(value))
+                elif time.monotonic() - slot.t_start > self.timeout_s:
+                    rec = {"reason": "timeout", "stage": slot.stage.value or None,
+                           "exception": None, "message": f"killed after {self.timeout_s:.1f} s",
+                           "solver_stats": {}, "elapsed_s": time.monotonic() - slot.t_start}
+                    self._record_failure(rec, args)
+                    fut.set_exception(EvaluationFailed(rec))
+                    slot.task = None
+                    self._recycle(i)
+
+
+def make_pool(model_config: dict, n_workers: int | None = None, timeout_s: float | None = None,
+              budget: dict | None = None, failure_log: str | None = None):
+    """
+    Evaluator for the optimizer drivers, workers preloaded with model_config:
+    ProcessPoolExecutor without timeout_s, else SupervisedPool (per-task limit, recycling).
+    """
+    import os
+    from kaskade_worker import preload_model
+
+    n_workers = n_workers or os.cpu_count()
+    if timeout_s is None:
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(n_workers, initializer=preload_model, initargs=(model_config, budget))
+    return SupervisedPool(n_workers, timeout_s=timeout_s, initializer=preload_model,
+                          initargs=(model_config, budget), failure_log=failure_log)
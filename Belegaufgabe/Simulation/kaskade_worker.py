@@ -0,0 +1,107 @@
+# kaskade_worker.py
+"""
+Schlanker Einstieg für Worker-Prozesse (ProcessPoolExecutor, SupervisedPool, Cluster).
+
+Mit spawn (Windows, macOS, SupervisedPool) importiert jeder Worker das Modul der
+übergebenen Funktion neu. Lagen preload_model / simulate_point in einem Modul, das
+matplotlib, scipy oder pymoo importiert, zahlte jeder Worker diese Imports mit.
+Dieses Modul:
+
+  - importiert beim Laden nur die Standardbibliothek, keine Seiteneffekte (kein chdir, print)
+  - Kaskade_Klasse (cantera, numpy) wird erst in preload_model() geladen
+  - hält das prozesslokale Modell und die simulate()-Budgets
+
+    ProcessPoolExecutor(n, initializer=preload_model, initargs=(model.config,))
+    pool.submit(simulate_point, x)
+
+kaskade_cluster re-exportiert die Funktionen (bestehende Imports bleiben gültig).
+"""
+import os
+import sys
+import time
+
+# Modell im Worker-Prozess (wird von preload_model gesetzt)
+_MODEL = None
+# Budgets für simulate() (max_wall_s / max_steps_total), siehe kaskade_watchdog
+_SIM_KWARGS = {}
+# skalare simulate()-Ausgaben für outputs_point (Sensitivitätsanalyse)
+SCALAR_OUTPUTS = ("CH4", "T_out", "T_max", "P_out")
+# Zeitstempel für Runtime_Startup (time.time(), prozessübergreifend vergleichbar)
+_T_READY = None
+
+
+def preload_model(model_kwargs: dict | None, budget: dict | None = None):
+    """Build the process-local CSTRCascadeModel once (None -> no model)."""
+    global _MODEL, _SIM_KWARGS, _T_READY
+    _SIM_KWARGS = dict(budget or {})
+    if model_kwargs is None:
+        _MODEL = None
+    else:
+        from Kaskade_Klasse import CSTRCascadeModel
+        _MODEL = CSTRCascadeModel(**model_kwargs)
+    _T_READY = time.time()
+
+
+def simulate_point(x, return_profile: bool = False, operating_vars=()) -> dict:
+    """
+    simulate() result for x = [A/V, d_cm, porosity, *operating values] on the
+    preloaded model (operating_vars names the extra entries, see Kaskade_Klasse.OPERATING_VARS).
+    """
+    av, d_cm, eps, overrides = _MODEL.split_x(x, operating_vars)
+    return _MODEL.simulate(av, d_cm, eps, return_profile=return_profile, **overrides, **_SIM_KWARGS)
+
+
+def ch4_point(x, operating_vars=()) -> float:
+    """CH4_out like objective_CH4, but failures raise (SimulationError) instead of -> 1e3."""
+    return float(simulate_point(x, False, operating_vars)["CH4"])
+
+
+def ch4_tmax_point(x, operating_vars=()) -> tuple:
+    """(CH4_out, T_max) for x; (nan, nan) if the simulation fails (batched map() stays intact)."""
+    try:
+        res = simulate_point(x, False, operating_vars)
+    except Exception:
+        return float("nan"), float("nan")
+    return float(res["CH4"]), float(res["T_max"])
+
+
+def objectives_point(x, operating_vars=()) -> tuple:
+    """(CH4_out, T_max) for x; failures raise (async_nsga2 marks failed + penalty)."""
+    res = simulate_point(x, False, operating_vars)
+    return float(res["CH4"]), float(res["T_max"])
+
+
+def outputs_point(x, operating_vars=()) -> tuple:
+    """All SCALAR_OUTPUTS for x; NaNs if the simulation fails."""
+    try:
+        res = simulate_point(x, False, operating_vars)
+    except Exception:
+        return tuple(float("nan") for _ in SCALAR_OUTPUTS)
+    return tuple(float(res[k]) for k in SCALAR_OUTPUTS)
+
+
+def objective_point(x, operating_vars=()) -> float:
+    """objective_CH4 on the preloaded model (DE: workers=coordinator.map)."""
+    return _MODEL.objective_CH4(x, operating_vars)
+
+
+def startup_probe(x, barrier=None) -> dict:
+    """
+    One evaluation plus timing info of this worker (Runtime_Startup):
+    pid, time the initializer finished, time the evaluation finished, heavy modules loaded.
+    barrier (e.g. Manager().Barrier(n)) keeps the worker busy until every worker has
+    taken one probe, so each worker reports its own first evaluation.
+    """
+    t0 = time.time()
+    objective_point(x)
+    t1 = time.time()
+    if barrier is not None:
+        barrier.wait()
+    return {
+        "pid": os.getpid(),
+        "t_ready": _T_READY,
+        "t_eval_start": t0,
+        "t_first_eval": t1,
+        "heavy_modules": sorted(m for m in ("matplotlib", "scipy", "pymoo", "pyarrow", "pandas")
+                                if m in sys.modules),
+    }
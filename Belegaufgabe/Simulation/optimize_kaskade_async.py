@@ -0,0 +1,368 @@
+# optimize_kaskade_async.py
+"""
+Asynchrone (steady-state) Evolution für die CSTR-Kaskade.
+
+Generationsweise Verfahren (scipy-DE mit updating="deferred", pymoo-NSGA-II) warten
+pro Generation auf die langsamste Simulation. Hier wird stattdessen:
+
+    1) sobald irgendein Worker frei wird, sofort ein neuer Nachkomme erzeugt und abgeschickt
+    2) jedes eintreffende Ergebnis einzeln in die Population/Archiv einsortiert
+
+`evaluator` ist alles mit submit() -> Future (ProcessPoolExecutor, kaskade_cluster.LocalCluster).
+
+  - async_de:    steady-state DE/rand/1/bin für objective_CH4
+  - async_nsga2: steady-state NSGA-II (Rang + Crowding) für CatMultiObjectiveProblem
+
+Beide liefern eine History [(t_wall_s, n_evals, best_CH4), ...] für Durchsatz
+(evals/s) und time-to-target (siehe Runtimes/Runtime_Async.py).
+"""
+import functools
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+
+from kaskade_worker import ch4_point, objectives_point
+
+
+# ----------------------------------------------------------------------
+# Auswertefunktionen (modul-level -> picklebar für Prozess-Pools)
+# ----------------------------------------------------------------------
+def _objective_ch4(model, x) -> float:
+    return model.objective_CH4(x)
+
+
+def _simulate_ch4_tmax(model, x, operating_vars=()):
+    # Fehler nicht abfangen: landen im Future, der Verbraucher markiert failed + Strafwert
+    av, d_cm, eps, overrides = model.split_x(x, operating_vars)
+    res = model.simulate(av, d_cm, eps, return_profile=False, **overrides)
+    return float(res["CH4"]), float(res["T_max"])
+
+
+def time_to_target(history, target: float):
+    """First wall time at which best_CH4 <= target (None if never reached)."""
+    for t, _, best in history:
+        if best <= target:
+            return t
+    return None
+
+
+def throughput(history) -> float:
+    """Evaluations per second over the whole run."""
+    if not history:
+        return 0.0
+    t, n, _ = history[-1]
+    return n / t if t > 0 else float("inf")
+
+
+def _lhs(rng, n, lo, hi):
+    dim = len(lo)
+    u = (np.argsort(rng.random((n, dim)), axis=0) + rng.random((n, dim))) / n
+    return lo + u * (hi - lo)
+
+
+def _reflect(x, lo, hi):
+    # an den Grenzen spiegeln statt clippen (keine Häufung auf dem Rand)
+    x = np.where(x < lo, 2 * lo - x, x)
+    x = np.where(x > hi, 2 * hi - x, x)
+    return np.clip(x, lo, hi)
+
+
+# ----------------------------------------------------------------------
+# Einkriteriell: steady-state DE
+# ----------------------------------------------------------------------
+def async_de(
+    model,
+    bounds,
+    evaluator,
+    n_workers: int,
+    pop_size: int = 15,
+    max_evals: int = 1500,
+    F: float = 0.7,
+    CR: float = 0.9,
+    seed=None,
+    target: float | None = None,
+    func=None,
+    penalty: float = 1e3,
+    preloaded: bool = False,
+):
+    """
+    Steady-state DE/rand/1/bin on objective_CH4.
+
+    Each offspring is created from the *current* population when a worker becomes
+    free and replaces its target vector as soon as its result arrives (if better).
+    At most n_workers evaluations are in flight. Stops after max_evals results or
+    when best <= target. preloaded=True (evaluator started with
+    initializer=preload_model) evaluates on the worker's model via ch4_point instead
+    of pickling `model` with every submit.
+    """
+    rng = np.random.default_rng(seed)
+    bounds = np.asarray(bounds, dtype=float)
+    lo, hi = bounds[:, 0], bounds[:, 1]
+    dim = len(lo)
+    if func is None:
+        func = ch4_point if preloaded else functools.partial(_objective_ch4, model)
+
+    init = list(_lhs(rng, pop_size, lo, hi))
+    pop = np.empty((0, dim))
+    fit = np.empty(0)
+
+    def propose():
+        if init:
+            return init.pop(), None
+        if len(pop) < 4:
+            # Population noch nicht voll ausgewertet -> zufälliger Punkt
+            return lo + rng.random(dim) * (hi - lo), None
+        i = int(rng.integers(len(pop)))
+        others = [j for j in range(len(pop)) if j != i]
+        a, b, c = rng.choice(others, 3, replace=False)
+        mutant = _reflect(pop[a] + F * (pop[b] - pop[c]), lo, hi)
+        cross = rng.random(dim) < CR
+        cross[rng.integers(dim)] = True
+        return np.where(cross, mutant, pop[i]), i
+
+    pending = {}
+    history = []
+    best_f, best_x = np.inf, None
+    n_sub = n_done = 0
+    t0 = time.perf_counter()
+
+    while n_done < max_evals:
+        while len(pending) < n_workers and n_sub < max_evals:
+            x, i = propose()
+            pending[evaluator.submit(func, x)] = (x, i)
+            n_sub += 1
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            x, i = pending.pop(fut)
+            try:
+                f = float(fut.result())
+            except Exception:
+                f = penalty
+            n_done += 1
+
+            # --- Population inkrementell aktualisieren ---
+            if len(pop) < pop_size:
+                pop = np.vstack([pop, x])
+                fit = np.append(fit, f)
+            elif i is not None:
+                if f <= fit[i]:
+                    pop[i], fit[i] = x, f
+            else:
+                worst = int(np.argmax(fit))
+                if f < fit[worst]:
+                    pop[worst], fit[worst] = x, f
+
+            if f < best_f:
+                best_f, best_x = f, np.array(x)
+            history.append((time.perf_counter() - t0, n_done, best_f))
+
+        if target is not None and best_f <= target:
+            break
+
+    for fut in pending:
+        fut.cancel()
+
+    wall = time.perf_counter() - t0
+    return {
+        "x": best_x,
+        "fun": best_f,
+        "population": pop,
+        "population_f": fit,
+        "n_evals": n_done,
+        "wall_s": wall,
+        "evals_per_s": n_done / wall if wall > 0 else float("inf"),
+        "history": history,
+    }
+
+
+# ----------------------------------------------------------------------
+# Mehrkriteriell: steady-state NSGA-II
+# ----------------------------------------------------------------------
+def _rank_crowding(F, CV):
+    """Constrained non-dominated rank (feasible first) and crowding distance."""
+    n = len(F)
+    rank = np.empty(n, dtype=int)
+    feas = CV <= 0.0
+    idx = np.flatnonzero(feas)
+    r = 0
+    remaining = idx
+    while remaining.size:
+        Fi = F[remaining]
+        # i dominiert von j?
+        dominated = np.any(
+            np.all(Fi[None, :, :] <= Fi[:, None, :], axis=2)
+            & np.any(Fi[None, :, :] < Fi[:, None, :], axis=2),
+            axis=1,
+        )
+        rank[remaining[~dominated]] = r
+        remaining = remaining[dominated]
+        r += 1
+    # unzulässige Punkte hinter alle zulässigen, sortiert nach Verletzung
+    infeas = np.flatnonzero(~feas)
+    order = infeas[np.argsort(CV[infeas])]
+    rank[order] = r + np.arange(order.size)
+
+    crowd = np.zeros(n)
+    for k in np.unique(rank):
+        members = np.flatnonzero(rank == k)
+        if members.size <= 2:
+            crowd[members] = np.inf
+            continue
+        for m in range(F.shape[1]):
+            o = members[np.argsort(F[members, m])]
+            span = F[o[-1], m] - F[o[0], m]
+            crowd[o[0]] = crowd[o[-1]] = np.inf
+            if span > 0:
+                crowd[o[1:-1]] += (F[o[2:], m] - F[o[:-2], m]) / span
+    return rank, crowd
+
+
+def _sbx(rng, p1, p2, lo, hi, eta):
+    u = rng.random(len(p1))
+    beta = np.where(u <= 0.5, (2 * u) ** (1 / (eta + 1)), (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+    c = 0.5 * ((1 + beta) * p1 + (1 - beta) * p2)
+    return np.clip(c, lo, hi)
+
+
+def _pm(rng, x, lo, hi, eta, prob):
+    x = x.copy()
+    for k in np.flatnonzero(rng.random(len(x)) < prob):
+        u = rng.random()
+        delta = (2 * u) ** (1 / (eta + 1)) - 1 if u < 0.5 else 1 - (2 * (1 - u)) ** (1 / (eta + 1))
+        x[k] += delta * (hi[k] - lo[k])
+    return np.clip(x, lo, hi)
+
+
+def async_nsga2(
+    problem,
+    evaluator,
+    n_workers: int,
+    pop_size: int = 50,
+    max_evals: int = 2500,
+    eta_c: float = 8.0,
+    eta_m: float = 10.0,
+    p_c: float = 0.9,
+    seed=None,
+    func=None,
+    preloaded: bool = False,
+):
+    """
+    Steady-state NSGA-II on a CatMultiObjectiveProblem.
+
+    Parents are picked by binary tournament on (rank, crowding) from the current
+    population; each arriving result is inserted and the worst member (last rank,
+    smallest crowding distance) is removed. Evaluations are written into
+    problem.cache and problem.record() like the generational run (every pop_size
+    results count as one generation for the ε-archive snapshots). Proposals already
+    in problem.cache are inserted without a submit; failed simulations are recorded
+    with failed=True and the penalty (1e3, 1e9) but not cached. preloaded=True
+    (evaluator started with initializer=preload_model) evaluates via
+    kaskade_worker.objectives_point instead of pickling problem.model per submit.
+    """
+    rng = np.random.default_rng(seed)
+    lo, hi = np.asarray(problem.xl, float), np.asarray(problem.xu, float)
+    dim = len(lo)
+    model = problem.model
+    operating_vars = getattr(problem, "operating_vars", ())
+    if func is None:
+        func = (functools.partial(objectives_point, operating_vars=operating_vars) if preloaded
+                else functools.partial(_simulate_ch4_tmax, model, operating_vars=operating_vars))
+    Tmax_allowed = problem.Tmax_allowed
+
+    init = list(_lhs(rng, pop_size, lo, hi))
+    X = np.empty((0, dim))
+    F = np.empty((0, 2))
+    CV = np.empty(0)
+    rank = crowd = None
+
+    def tournament():
+        a, b = rng.integers(len(X), size=2)
+        if (rank[a], -crowd[a]) <= (rank[b], -crowd[b]):
+            return X[a]
+        return X[b]
+
+    def propose():
+        if init:
+            return init.pop()
+        if len(X) < 2:
+            return lo + rng.random(dim) * (hi - lo)
+        p1, p2 = tournament(), tournament()
+        child = _sbx(rng, p1, p2, lo, hi, eta_c) if rng.random() < p_c else p1.copy()
+        return _pm(rng, child, lo, hi, eta_m, prob=1.0 / dim)
+
+    pending = {}
+    history = []
+    best_ch4 = np.inf
+    n_sub = n_done = 0
+    t0 = time.perf_counter()
+
+    def insert(x, ch4, tmax, failure=None):
+        nonlocal X, F, CV, rank, crowd, best_ch4, n_done
+        n_done += 1
+        vcat = model.Vcat(x[1], x[2])
+        cv = max(0.0, tmax - Tmax_allowed) if Tmax_allowed is not None else 0.0
+
+        if failure is None:
+            problem.cache[tuple(float(v) for v in x)] = (ch4, tmax)
+        problem.record(x, ch4, tmax, vcat, failure=failure)
+        if n_done % pop_size == 0:
+            problem._n_calls += 1
+            problem.end_generation()
+
+        # --- Archiv inkrementell: einfügen, schlechtestes Mitglied entfernen ---
+        X = np.vstack([X, x])
+        F = np.vstack([F, [ch4, vcat]])
+        CV = np.append(CV, cv)
+        rank, crowd = _rank_crowding(F, CV)
+        if len(X) > pop_size:
+            worst = max(range(len(X)), key=lambda j: (rank[j], -crowd[j]))
+            keep = np.arange(len(X)) != worst
+            X, F, CV = X[keep], F[keep], CV[keep]
+            rank, crowd = _rank_crowding(F, CV)
+
+        if cv <= 0.0 and ch4 < best_ch4:
+            best_ch4 = ch4
+        history.append((time.perf_counter() - t0, n_done, best_ch4))
+
+    while n_done < max_evals:
+        while len(pending) < n_workers and n_sub < max_evals:
+            x = propose()
+            n_sub += 1
+            key = tuple(float(v) for v in x)
+            if key in problem.cache:
+                # schon gerechnet (Toleranz-Cache) -> kein Worker nötig
+                insert(x, *problem.cache[key])
+                continue
+            pending[evaluator.submit(func, x)] = x
+        if not pending:
+            if n_sub >= max_evals:
+                break
+            continue
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for fut in done:
+            x = pending.pop(fut)
+            try:
+                ch4, tmax = fut.result()
+            except Exception as e:
+                insert(x, 1e3, 1e9, failure=(getattr(e, "record", {}).get("reason", type(e).__name__), None))
+            else:
+                insert(x, float(ch4), float(tmax))
+
+    for fut in pending:
+        fut.cancel()
+
+    front = (rank == 0) & (CV <= 0.0)
+    wall = time.perf_counter() - t0
+    return {
+        "X": X[front],
+        "F": F[front],
+        "population_X": X,
+        "population_F": F,
+        "n_evals": n_done,
+        "wall_s": wall,
+        "evals_per_s": n_done / wall if wall > 0 else float("inf"),
+        "history": history,
+    }
@@ -0,0 +1,371 @@
+# optimize_kaskade_bo.py
+"""
+Bayes'sche Optimierung (GP-Surrogat + Batch-Akquisition) für die CSTR-Kaskade.
+
+differential_evolution in optimize_kaskade_einkriteriell braucht 100 Generationen x
+popsize x 3 Simulationen, jede davon 0.1 - 1 s. Hier stattdessen:
+
+  - Gauß-Prozess (Matérn 5/2, ARD) in NumPy/SciPy auf log10(CH4), Eingänge auf [0, 1]
+    skaliert; Hyperparameter per Marginal Likelihood (L-BFGS-B, mehrere Starts)
+  - Batch-Akquisition mit Local Penalization (González et al. 2016): Expected Improvement,
+    um bereits gewählte Batch-Punkte herum über eine Lipschitz-Schranke abgesenkt
+    -> q = n_workers Punkte pro Runde, ein submit() je Punkt, der Pool ist voll ausgelastet
+  - Akquisition auf einer gescrambelten Sobol-Kandidatenmenge plus Störungen um die
+    besten Punkte (3 - 5 Dimensionen: ausreichend und robust)
+  - ε-Nebenbedingung Vcat <= Vcat_max: V_cat ist rein geometrisch bekannt, deshalb werden
+    nur zulässige Kandidaten vorgeschlagen (statt Straf-Term wie objective_eps_constraint_Vcat)
+  - Fehlgeschlagene Simulationen: für den GP mit dem schlechtesten beobachteten Wert ersetzt
+  - Warmstart aus dem Ergebnis-Speicher (history / evaluations früherer Läufe mit gleichem
+    model_hash)
+
+History-Format wie optimize_kaskade_async: [(t_wall_s, n_evals, best_CH4), ...]
+(Vergleich mit DE: Runtimes/Runtime_BO.py).
+"""
+import math
+import time
+
+import numpy as np
+from scipy.linalg import cho_solve, cholesky
+from scipy.optimize import minimize
+from scipy.special import ndtr
+from scipy.stats import qmc
+
+from kaskade_worker import ch4_point
+
+
+# ----------------------------------------------------------------------
+# Gauß-Prozess
+# ----------------------------------------------------------------------
+def _matern52(A, B, ls, s2):
+    d = (A[:, None, :] - B[None, :, :]) / ls
+    r = np.sqrt(np.maximum((d ** 2).sum(axis=2), 0.0)) * math.sqrt(5.0)
+    return s2 * (1.0 + r + r ** 2 / 3.0) * np.exp(-r)
+
+
+class GaussianProcess:
+    """Zero-mean GP on standardized targets, Matérn 5/2 with one length scale per input."""
+
+    def __init__(self, n_restarts: int = 3, seed=None):
+        self.n_restarts = int(n_restarts)
+        self.rng = np.random.default_rng(seed)
+        self.theta = None       # [log ls_1..d, log s2, log noise]
+
+    def _nll(self, theta, U, y):
+        d = U.shape[1]
+        ls, s2, noise = np.exp(theta[:d]), np.exp(theta[d]), np.exp(theta[d + 1])
+        K = _matern52(U, U, ls, s2) + (noise + 1e-10) * np.eye(len(U))
+        try:
+            L = cholesky(K, lower=True)
+        except np.linalg.LinAlgError:
+            return 1e10
+        alpha = cho_solve((L, True), y)
+        return 0.5 * y @ alpha + np.log(np.diag(L)).sum() + 0.5 * len(y) * math.log(2 * math.pi)
+
+    def fit(self, U, y):
+        U = np.asarray(U, float)
+        y = np.asarray(y, float)
+        self._mean, self._std = y.mean(), y.std() or 1.0
+        ys = (y - self._mean) / self._std
+        d = U.shape[1]
+        bounds = [(math.log(1e-2), math.log(10.0))] * d + [(math.log(1e-2), math.log(1e2)),
+                                                           (math.log(1e-8), math.log(1e-1))]
+        starts = [] if self.theta is None else [self.theta]
+        starts += [np.array([self.rng.uniform(lo, hi) for lo, hi in bounds]) for _ in range(self.n_restarts)]
+        best = None
+        for th0 in starts:
+            res = minimize(self._nll, th0, args=(U, ys), method="L-BFGS-B", bounds=bounds)
+            if best is None or res.fun < best.fun:
+                best = res
+        self.theta = best.x
+        ls, s2, noise = np.exp(self.theta[:d]), np.exp(self.theta[d]), np.exp(self.theta[d + 1])
+        self._ls, self._s2 = ls, s2
+        self._U = U
+        K = _matern52(U, U, ls, s2) + (noise + 1e-10) * np.eye(len(U))
+        self._L = cholesky(K, lower=True)
+        self._alpha = cho_solve((self._L, True), ys)
+        return self
+
+    def predict(self, U, return_std: bool = True):
+        """Mean (and std) in the original target units."""
+        Ks = _matern52(np.asarray(U, float), self._U, self._ls, self._s2)
+        mu = Ks @ self._alpha * self._std + self._mean
+        if not return_std:
+            return mu
+        v = cho_solve((self._L, True), Ks.T)
+        var = np.maximum(self._s2 - np.sum(Ks * v.T, axis=1), 1e-12)
+        return mu, np.sqrt(var) * self._std
+
+
+# ----------------------------------------------------------------------
+# Akquisition
+# ----------------------------------------------------------------------
+def expected_improvement(mu, sd, best):
+    """EI for minimization."""
+    z = (best - mu) / sd
+    return (best - mu) * ndtr(z) + sd * np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+
+
+def lipschitz_constant(gp, U, h: float = 1e-4) -> float:
+    """max |grad mu| over U (central differences), lower bound 1e-7."""
+    grads = np.empty_like(U)
+    for j in range(U.shape[1]):
+        e = np.zeros(U.shape[1])
+        e[j] = h
+        grads[:, j] = (gp.predict(U + e, False) - gp.predict(U - e, False)) / (2 * h)
+    return max(float(np.sqrt((grads ** 2).sum(axis=1)).max()), 1e-7)
+
+
+def select_batch(gp, cand, q: int, best: float, y_min: float) -> np.ndarray:
+    """
+    q indices into cand by local penalization: after each pick x_j the acquisition
+    is multiplied by Phi((L |x - x_j| - (mu_j - y_min)) / sd_j).
+    """
+    mu, sd = gp.predict(cand)
+    acq = expected_improvement(mu, sd, best)
+    L = lipschitz_constant(gp, cand[np.argsort(mu)[:min(500, len(cand))]])
+    penal = np.ones(len(cand))
+    chosen = []
+    for _ in range(min(q, len(cand))):
+        score = acq * penal
+        score[chosen] = -np.inf
+        j = int(np.argmax(score))
+        chosen.append(j)
+        r = np.sqrt(((cand - cand[j]) ** 2).sum(axis=1))
+        penal *= ndtr((L * r - (mu[j] - y_min)) / sd[j])
+    return np.array(chosen, dtype=int)
+
+
+# ----------------------------------------------------------------------
+# Treiber
+# ----------------------------------------------------------------------
+def _evaluate_batch(model, X, evaluator, operating_vars) -> list:
+    """CH4 per row, None for failed simulations."""
+    if evaluator is not None:
+        futs = [evaluator.submit(ch4_point, x, operating_vars) for x in X]
+        out = []
+        for f in futs:
+            try:
+                out.append(float(f.result()))
+            except Exception:
+                out.append(None)
+        return out
+    out = []
+    for x in X:
+        av, d_cm, eps, overrides = model.split_x(x, operating_vars)
+        try:
+            out.append(float(model.simulate(av, d_cm, eps, return_profile=False, **overrides)["CH4"]))
+        except Exception:
+            out.append(None)
+    return out
+
+
+def bayes_opt(model, bounds, evaluator=None, n_workers: int = 1, max_evals: int = 200,
+              n_init: int | None = None, Vcat_max: float | None = None, X_init=None, y_init=None,
+              operating_vars=(), n_candidates: int = 4096, seed=None, callback=None) -> dict:
+    """
+    Minimize CH4_out over `bounds` (list of (lo, hi); x = [A/V, d, porosity, *operating_vars]).
+
+    Vcat_max: only designs with model.Vcat(d, eps) <= Vcat_max are proposed; ValueError if
+    no Sobol draw satisfies it (Vcat_max below the smallest feasible catalyst volume).
+    X_init, y_init: warm start (not counted in max_evals).
+    callback(X_batch, y_batch) is called after every batch.
+    Returns {"x", "fun", "X", "y", "history", "n_evals"}.
+    """
+    rng = np.random.default_rng(seed)
+    lo = np.array([b[0] for b in bounds], dtype=float)
+    hi = np.array([b[1] for b in bounds], dtype=float)
+    dim = len(lo)
+    q = max(1, int(n_workers))
+    n_init = n_init if n_init is not None else max(2 * dim + 2, q)
+    sobol = qmc.Sobol(dim, scramble=True, seed=rng.integers(2 ** 31))
+
+    def feasible(X):
+        if Vcat_max is None:
+            return np.ones(len(X), bool)
+        return np.array([model.Vcat(x[1], x[2]) <= Vcat_max for x in X])
+
+    def candidates(n, max_draws: int = 8):
+        # bei enger Vcat-Schranke nachziehen; ohne jeden zulässigen Punkt abbrechen statt endlos
+        # leere Batches zu erzeugen
+        out = []
+        for _ in range(max_draws):
+            U = sobol.random(2 ** math.ceil(math.log2(n)))     # 2er-Potenz -> balancierte Sobol-Blöcke
+            X = lo + U * (hi - lo)
+            out.append(X[feasible(X)])
+            if sum(len(c) for c in out) >= n:
+                break
+        X = np.vstack(out)
+        if not len(X):
+            raise ValueError(f"no design with Vcat <= {Vcat_max} in the bounds "
+                             f"({max_draws} Sobol draws of {2 ** math.ceil(math.log2(n))} points)")
+        return X
+
+    X_obs = [] if X_init is None else [np.asarray(x, float) for x in X_init]
+    y_obs = [] if y_init is None else [None if y is None or not np.isfinite(y) else float(y) for y in y_init]
+    history = []
+    n_evals = 0
+    best = min([y for y, x in zip(y_obs, X_obs) if y is not None and feasible([x])[0]], default=np.inf)
+    t0 = time.perf_counter()
+
+    def run(X):
+        nonlocal n_evals, best
+        if not len(X):
+            raise RuntimeError("bayes_opt: empty batch")
+        ys = _evaluate_batch(model, X, evaluator, operating_vars)
+        X_obs.extend(X)
+        y_obs.extend(ys)
+        n_evals += len(X)
+        ok = [y for y in ys if y is not None]
+        if ok:
+            best = min(best, min(ok))
+        history.append((time.perf_counter() - t0, n_evals, best))
+        if callback is not None:
+            callback(np.asarray(X), ys)
+
+    # Startdesign (Sobol, nur zulässige Punkte), falls der Warmstart nicht reicht
+    n_first = max(0, n_init - sum(y is not None for y in y_obs))
+    if n_first:
+        X0 = candidates(max(64, 8 * n_first))[:min(n_first, max_evals)]
+        run(list(X0))
+
+    gp = GaussianProcess(seed=rng.integers(2 ** 31))
+    while n_evals < max_evals:
+        X = np.array(X_obs)
+        y = np.array([np.nan if v is None else v for v in y_obs])
+        good = np.isfinite(y) & (y > 0)
+        if good.sum() < 2:
+            run(list(candidates(8 * q)[:min(q, max_evals - n_evals)]))
+            continue
+        ly = np.log10(np.where(good, y, np.nan))
+        ly[~good] = np.nanmax(ly)          # Fehlschläge -> schlechtester Wert
+        U = (X - lo) / (hi - lo)
+        gp.fit(U, ly)
+
+        # Kandidaten: Sobol + Gauß-Störungen um die 5 besten Punkte
+        cand = candidates(n_candidates)
+        top = X[good][np.argsort(y[good])[:5]]
+        local = np.clip(np.repeat(top, 200, axis=0) + rng.normal(0.0, 0.05, (len(top) * 200, dim)) * (hi - lo),
+                        lo, hi)
+        cand = np.vstack([cand, local[feasible(local)]])
+        Uc = (cand - lo) / (hi - lo)
+        feas_obs = feasible(X) & good
+        y_best = float(ly[feas_obs].min()) if feas_obs.any() else float(ly.min())
+        idx = select_batch(gp, Uc, min(q, max_evals - n_evals), y_best, float(ly.min()))
+        run(list(cand[idx]))
+
+    y = np.array([np.inf if v is None else v for v in y_obs])
+    y[~feasible(np.array(X_obs))] = np.inf
+    i = int(np.argmin(y))
+    return {"x": np.array(X_obs[i]), "fun": float(y[i]), "X": np.array(X_obs),
+            "y": [None if v is None else float(v) for v in y_obs], "history": history, "n_evals": n_evals}
+
+
+# ----------------------------------------------------------------------
+# Warmstart aus dem Ergebnis-Speicher
+# ----------------------------------------------------------------------
+def warm_start_data(store, model_hash: str, bounds, operating_vars=()) -> tuple:
+    """
+    (X, y) from history and evaluations of earlier runs with the same model_hash,
+    restricted to `bounds`; rows of runs that varied other operating variables are skipped.
+    """
+    from results_store import DECISION_COLUMNS, OPERATING_COLUMNS
+
+    if not store.has("runs"):
+        return np.empty((0, len(bounds))), np.empty(0)
+    runs = store.read_arrow("runs", columns=["run_id"], filters=[("model_hash", "==", model_hash)])
+    ids = runs.column("run_id").to_pylist()
+    if not ids:
+        return np.empty((0, len(bounds))), np.empty(0)
+
+    cols = list(DECISION_COLUMNS) + list(operating_vars)
+    other = [c for c in OPERATING_COLUMNS if c not in operating_vars]
+    parts = []
+    for table, ycol in (("history", "CH4"), ("evaluations", "CH4_out")):
+        if not store.has(table):
+            continue
+        df = store.read(table, columns=cols + other + [ycol], filters=[("run_id", "in", ids)])
+        df = df[df[other].isna().all(axis=1)] if other else df
+        parts.append((df[cols].to_numpy(float), df[ycol].to_numpy(float)))
+    if not parts:
+        return np.empty((0, len(bounds))), np.empty(0)
+    X = np.vstack([p[0] for p in parts])
+    y = np.concatenate([p[1] for p in parts])
+    lo = np.array([b[0] for b in bounds])
+    hi = np.array([b[1] for b in bounds])
+    keep = np.isfinite(X).all(axis=1) & np.all((X >= lo) & (X <= hi), axis=1) & np.isfinite(y) & (y < 1e3)
+    X, idx = np.unique(X[keep], axis=0, return_index=True)
+    return X, y[keep][idx]
+
+
+def main(evaluator=None, n_workers=None, max_evals=200, Vcat_max=None, warm_start=True, seed=1,
+         timeout_s: float | None = None):
+    """
+    BO counterpart of optimize_kaskade_einkriteriell.main (same model and bounds).
+    timeout_s: own pool as kaskade_watchdog.SupervisedPool with this per-point limit.
+    """
+    import os
+
+    import cantera as ct
+    from Kaskade_Klasse import CSTRCascadeModel, cm
+    from kaskade_watchdog import make_pool
+    from results_store import ResultsStore, new_run_id
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    model = CSTRCascadeModel(
+        yaml_file="methane_pox_on_pt.yaml",
+        tc_C=800.0,
+        p_Pa=1 * ct.one_atm,
+        length_m=0.3 * cm,
+        mass_flow_rate_kg_s=1e-6,
+        n_cstr=201,
+        gas_comp="CH4:1, O2:1.5, AR:0.1",
+        energy_enabled=False,
+        surface_name="Pt_surf",
+        gas_name="gas",
+    )
+    bounds = [(1000.0, 2000.0), (1.0, 3.0), (0.2, 0.5)]
+
+    store = ResultsStore("../Ergebnisse")
+    X0, y0 = warm_start_data(store, model.config_hash, bounds) if warm_start else (None, None)
+    if X0 is not None:
+        print(f"Warmstart: {len(X0)} Punkte aus früheren Läufen")
+
+    own_pool = None
+    if evaluator is None:
+        own_pool = evaluator = make_pool(model.config, n_workers, timeout_s)
+    n_workers = n_workers or getattr(evaluator, "_max_workers", None) or os.cpu_count()
+    rows = []
+
+    def log(Xb, yb):
+        for x, v in zip(Xb, yb):
+            rows.append((len(rows) + 1, v, *x))
+
+    try:
+        res = bayes_opt(model, bounds, evaluator, n_workers, max_evals=max_evals, Vcat_max=Vcat_max,
+                        X_init=X0, y_init=y0, seed=seed, callback=log)
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown()
+
+    run_id = new_run_id("bo")
+    store.write_run(run_id, optimizer="bayes_opt", model_hash=model.config_hash, config_json=model.config,
+                    seed=seed, note=f"Vcat_max={Vcat_max}" if Vcat_max is not None else None)
+    if rows:
+        store.write("history", {
+            "iteration": [r[0] for r in rows],
+            "CH4": [r[1] for r in rows],
+            "A_over_V_1_per_cm": [r[2] for r in rows],
+            "diameter_cm": [r[3] for r in rows],
+            "porosity": [r[4] for r in rows],
+        }, run_id)
+
+    print("Optimum solution (BO):")
+    print(f"CH4 = {res['fun']:.6f}  ({res['n_evals']} Simulationen)")
+    print(f"A/V = {res['x'][0]:.1f} 1/cm")
+    print(f"d = {res['x'][1]:.3f} cm")
+    print(f"Porosity = {res['x'][2]:.4f}")
+    return res
+
+
+if __name__ == "__main__":
+    main()
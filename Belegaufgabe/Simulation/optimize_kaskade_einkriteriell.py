@@ -1,21 +1,38 @@
 # optimize_cstr_cascade.py
+# Import ohne Seiteneffekte: kein print/chdir beim Laden, scipy/cantera/pyarrow erst in main()
+# (DE-Worker mit spawn importieren dieses Modul als __mp_main__ neu).
 import os
-import numpy as np
-import matplotlib.pyplot as plt
-from scipy import optimize
-import cantera as ct
 from multiprocessing import freeze_support
 import csv
+import time
 
-print(os.getcwd())
 
-# scirpt location 
-os.chdir(os.path.dirname(__file__))
+def main(workers=-1, operating_bounds: dict | None = None, uncertainty: dict | None = None,
+         n_workers: int | None = None, budget=None, timeout_s: float | None = None,
+         sim_budget: dict | None = None):
+    """
+    workers: int (lokaler Pool wie bisher) oder map-callable, z.B. LocalCluster(...).map
+    operating_bounds: z.B. {"tc_C": (700.0, 900.0)} -> Betriebsbedingungen als zusätzliche
+    Entscheidungsvariablen (Kaskade_Klasse.OPERATING_VARS), gleiches Modell für alle Punkte
+    uncertainty: z.B. {"porosity": ("normal", 0.01)} -> robuster Mittelwert von CH4 statt
+    Nennpunkt (robust_design.RobustEvaluator, eigener Pool mit n_workers Prozessen)
+    budget: budget.BudgetManager (Wandzeit, Auswertungen, Stagnation), opt-in; Standard: keine
+    zusätzlichen Abbruchkriterien, DE läuft wie bisher bis tol/maxiter. Stagnations-Abbruch
+    z.B. mit BudgetManager(window=20, best_rtol=1e-4)
+    timeout_s: eigener Pool als kaskade_watchdog.SupervisedPool (Zeitlimit pro Punkt, hängende
+    Worker werden ersetzt) statt des scipy-Pools bzw. ProcessPoolExecutor; bei workers als int
+    mit workers Prozessen (-1: os.cpu_count()). Die Worker laden das Modell vor und rechnen
+    kaskade_worker.ch4_point -> Solver-/Budget-Fehler landen als Record in failures.jsonl
+    sim_budget: Budgets für simulate() in den Pool-Workern, z.B. {"max_wall_s": 20.0,
+    "max_steps_total": 2_000_000} (siehe kaskade_watchdog)
+    """
+    from budget import BudgetManager, write_checkpoint
+    import cantera as ct
+    from Kaskade_Klasse import CSTRCascadeModel, cm
+    from scipy import optimize
+    from results_store import ResultsStore, new_run_id
 
-from Kaskade_Klasse import CSTRCascadeModel, cm
-
-def main():
-    os.chdir(os.path.dirname(__file__))
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
 
     tc = 800.0
     p = 1 * ct.one_atm
@@ -30,6 +47,9 @@ def main():
         (1.0, 3.0),        # d [cm]
         (0.2, 0.5),        # porosity [-]
     ]
+    operating_bounds = dict(operating_bounds or {})
+    operating_vars = tuple(operating_bounds)
+    bounds += list(operating_bounds.values())
 
     model = CSTRCascadeModel(
         yaml_file=yaml_file,
@@ -44,11 +64,41 @@ def main():
         gas_name="gas",
     )
 
+    objective, robust, pool = model.objective_CH4, None, None
+    failure_log = "../Auswertung_einkriteriell/failures.jsonl"
+    if uncertainty:
+        from kaskade_watchdog import make_pool
+        from robust_design import RobustEvaluator
+        pool = make_pool(model.config, n_workers, timeout_s, budget=sim_budget, failure_log=failure_log)
+        robust = RobustEvaluator(model, uncertainty, stat={"CH4": "mean"}, evaluator=pool,
+                                 operating_vars=operating_vars)
+        workers = robust.map_population
+        objective = lambda x, _ops: robust(x)  # noqa: E731 (nur Signatur für DE, läuft im Hauptprozess)
+    elif timeout_s is not None and not callable(workers):
+        from kaskade_watchdog import make_pool
+        from kaskade_worker import ch4_point
+        # ch4_point wirft bei Fehlern -> der Pool schreibt den Record und map() setzt den
+        # Strafwert 1e3 wie in objective_CH4 (objective_CH4 selbst würde den Fehler verschlucken)
+        pool = make_pool(model.config, workers if workers > 0 else os.cpu_count(), timeout_s,
+                         budget=sim_budget, failure_log=failure_log)
+        objective, workers = ch4_point, pool.map
+
     history = []
+    history_wall = []
+    history_ops = []
     max_iter = 100
+    de_tol = 0.01
+    popsize = 15
+    n_pop = popsize * len(bounds)
+    budget = budget if budget is not None else BudgetManager()    # alle Kriterien aus
+    budget.start()
+    t_start = time.perf_counter()
 
     def callback(xk, convergence=None):
-        fx = model.objective_CH4(xk)  # besser: aus Cache holen, falls vorhanden
+        history_wall.append(time.perf_counter() - t_start)
+        # besser: aus Cache holen, falls vorhanden (robust: Schätzer der Nennpunkt-Stichproben)
+        fx = robust(xk) if robust is not None else model.objective_CH4(xk, operating_vars)
+        history_ops.append(model.split_x(xk, operating_vars)[3])
         history.append([
             len(history) + 1,  # iteration
             fx,  # CH4
@@ -56,16 +106,35 @@ def main():
             xk[1],  # d
             xk[2],  # porosity
         ])
+        # scipy liefert convergence = tol / (std(E) / |mean(E)|) -> relative Streuung der Zielwerte
+        spread = de_tol / convergence if convergence else None
+        return budget.update(n_evals=n_pop * (len(history) + 1), best=fx, spread=spread) is not None
 
     solution = optimize.differential_evolution(
-        model.objective_CH4,
+        objective,
         bounds=bounds,
+        args=(operating_vars,),
         disp=True,
         maxiter=max_iter,
+        popsize=popsize,
+        tol=de_tol,
         callback=callback,
-        workers=-1,
+        workers=workers,
         updating="deferred",
     )
+    if pool is not None:
+        pool.shutdown()
+    if robust is not None:
+        print(f"robust: {robust.n_sims} Simulationen, davon {robust.n_failed} fehlgeschlagen")
+
+    # Abbruchgrund: Budget/Stagnation, sonst scipy (Konvergenz nach tol oder maxiter)
+    if budget.stop_reason is not None:
+        stop_reason = budget.stop_reason
+    elif solution.nit >= max_iter:
+        stop_reason = "maxiter"
+    else:
+        stop_reason = "converged" if solution.success else "failed"
+    print(f"Abbruch: {stop_reason} nach {solution.nit} Generationen, {budget.elapsed:.1f} s")
 
     with open("../Auswertung_einkriteriell/optimization_history_einkriteriell.csv", "w", newline="") as f:
         writer = csv.writer(f)
@@ -75,8 +144,29 @@ def main():
             "cat_area_per_vol_1_per_cm",
             "diameter_cm",
             "porosity",
+            "stop_reason",
         ])
-        writer.writerows(history)
+        # Abbruchgrund steht in der letzten Zeile
+        writer.writerows([row + [stop_reason if i == len(history) - 1 else ""]
+                          for i, row in enumerate(history)])
+
+    # Ergebnis-Speicher (Parquet)
+    store = ResultsStore("../Ergebnisse")
+    run_id = new_run_id("de")
+    store.write_run(run_id, optimizer="differential_evolution", model_hash=model.config_hash,
+                    config_json=model.config, stop_reason=stop_reason)
+    write_checkpoint(f"../Ergebnisse/checkpoints/{run_id}.npz", x=solution.x, fun=solution.fun,
+                     population=getattr(solution, "population", []), stop_reason=stop_reason)
+    if history:
+        store.write("history", {
+            "iteration": [h[0] for h in history],
+            "CH4": [h[1] for h in history],
+            "A_over_V_1_per_cm": [h[2] for h in history],
+            "diameter_cm": [h[3] for h in history],
+            "porosity": [h[4] for h in history],
+            "wall_s": history_wall,
+            **{name: [ops[name] for ops in history_ops] for name in operating_vars},
+        }, run_id)
 
     print(solution)
     print("Optimum solution:")
@@ -84,6 +174,8 @@ def main():
     print(f"A/V = {solution.x[0]:.1f} 1/cm")
     print(f"d = {solution.x[1]:.3f} cm")
     print(f"Porosity = {solution.x[2]:.4f}")
+    for name, value in model.split_x(solution.x, operating_vars)[3].items():
+        print(f"{name} = {value:.6g}")
     print(f"n_CSTR = {n_cstr}")
 
 if __name__ == "__main__":
@@ -0,0 +1,296 @@
+# optimize_kaskade_eps.py
+"""
+ε-Constraint-Sweep CH4 vs. V_cat (Gegenstück zu optimize_kaskade_multikriteriell).
+
+CSTRCascadeModel.objective_eps_constraint_Vcat gab es schon, aber keinen Treiber dafür.
+Hier: für eine Liste von Vcat_max-Werten je eine einkriterielle Optimierung
+
+    min CH4   s.t.  Vcat <= Vcat_max  (und T_max <= Tmax_allowed)
+
+  - alle Stufen teilen EINEN Worker-Pool und EINEN (CH4, T_max)-Cache (ToleranceCache):
+    ein Punkt, den eine Stufe simuliert hat, kostet die anderen nichts; gleichzeitig
+    angefragte Punkte werden nur einmal abgeschickt
+  - V_cat ist rein geometrisch: Kandidaten mit Vcat > Vcat_max werden nicht simuliert,
+    sie bekommen direkt 1 + Verletzung (jede zulässige Lösung, CH4 <= 1, ist besser)
+  - Wellen: zuerst die äußeren Stufen (kleinstes / größtes Vcat_max) aus LHS, dann
+    fortgesetzt halbierend die mittleren; jede Stufe einer Welle läuft in einem eigenen
+    Thread (DE mit workers=Map über den gemeinsamen Pool) und startet mit den besten
+    Punkten ihrer fertigen Nachbarstufen (auf Vcat_max repariert) + LHS, mit kleinerem
+    Generationsbudget
+  - Ergebnis: nicht-dominierte Menge über ALLE simulierten Punkte (pareto.pareto_front mit
+    T_max-Nebenbedingung), gleiche CSV-Spalten wie pareto_CH4_vs_Vcat.csv von NSGA-II
+
+    res = eps_sweep(model, levels, pool, bounds, Tmax_allowed=2800.0)
+"""
+import csv
+import math
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import numpy as np
+
+from kaskade_cache import ToleranceCache
+from kaskade_worker import ch4_tmax_point
+from pareto import pareto_front, tmax_constraint
+
+
+def eps_objective(ch4: float, tmax: float, vcat: float, Vcat_max: float, Tmax_allowed=None) -> float:
+    """CH4 if feasible, otherwise 1 + relative violation; 100 for failed simulations."""
+    viol = max(vcat - Vcat_max, 0.0) / Vcat_max
+    if not math.isfinite(ch4):
+        return 100.0
+    if Tmax_allowed is not None:
+        viol += max(tmax - Tmax_allowed, 0.0) / Tmax_allowed
+    return ch4 if viol <= 0.0 else 1.0 + viol
+
+
+def repair_vcat(model, x, Vcat_max: float, bounds):
+    """Shrink d, then raise porosity until Vcat(x) <= Vcat_max (within bounds)."""
+    av, d, eps = (float(v) for v in x)
+    vcat = model.Vcat(d, eps)
+    if vcat > Vcat_max:
+        d = min(max(d * math.sqrt(Vcat_max / vcat), bounds[1][0]), bounds[1][1])
+        eps = min(max(eps, 1.0 - Vcat_max / model.Vcat(d, 0.0)), bounds[2][1])
+    return np.array([av, d, eps])
+
+
+def wave_order(n: int) -> list:
+    """Level indices per wave: both ends first, then repeated midpoints."""
+    if n <= 2:
+        return [list(range(n))]
+    waves, segs = [[0, n - 1]], [(0, n - 1)]
+    while segs:
+        wave, new = [], []
+        for a, b in segs:
+            if b - a > 1:
+                m = (a + b) // 2
+                wave.append(m)
+                new += [(a, m), (m, b)]
+        if wave:
+            waves.append(wave)
+        segs = new
+    return waves
+
+
+class SharedEvaluator:
+    """
+    (CH4, T_max) per point through one pool, shared by all levels (thread-safe).
+    Failed simulations are cached as (nan, nan) and not retried.
+    """
+
+    def __init__(self, pool, xl, xu):
+        self.pool = pool
+        self.cache = ToleranceCache.from_bounds(xl, xu)
+        self.points = []            # (x, CH4, T_max) aller Simulationen
+        self._pending = {}          # tuple(x) -> Future
+        # RLock: add_done_callback ruft _done sofort (unter dem Lock), wenn der Future schon fertig ist
+        self._lock = threading.RLock()
+
+    @property
+    def n_sims(self) -> int:
+        return len(self.points)
+
+    def _done(self, key, fut):
+        try:
+            ch4, tmax = fut.result()
+        except Exception:
+            ch4, tmax = float("nan"), float("nan")
+        with self._lock:
+            self.cache[key] = (ch4, tmax)
+            self._pending.pop(key, None)
+            self.points.append((np.array(key), ch4, tmax))
+
+    def get(self, X) -> list:
+        out = []
+        with self._lock:
+            for x in X:
+                key = tuple(float(v) for v in x)
+                v = self.cache.lookup(key)
+                if v is not None:
+                    out.append((float(v[0]), float(v[1])))
+                elif key in self._pending:
+                    out.append(self._pending[key])
+                else:
+                    fut = self.pool.submit(ch4_tmax_point, key)
+                    fut.add_done_callback(lambda f, k=key: self._done(k, f))
+                    self._pending[key] = fut
+                    out.append(fut)
+        res = []
+        for v in out:
+            if isinstance(v, Future):
+                try:
+                    v = v.result()
+                except Exception:
+                    v = (float("nan"), float("nan"))
+            res.append(v)
+        return res
+
+
+def run_level(model, ev, bounds, Vcat_max: float, Tmax_allowed=None, init="latinhypercube",
+              popsize: int = 10, maxiter: int = 40, tol: float = 0.01, seed=None) -> dict:
+    """One ε-level: scipy DE, evaluated through the shared evaluator."""
+    from scipy import optimize
+
+    evaluated = []  # (x, f) dieser Stufe -> Seeds für die Nachbarn
+
+    def level_map(_func, X):
+        X = np.asarray(list(X), dtype=float)
+        vcat = np.array([model.Vcat(x[1], x[2]) for x in X])
+        f = 1.0 + np.maximum(vcat - Vcat_max, 0.0) / Vcat_max
+        ok = np.flatnonzero(vcat <= Vcat_max)
+        for i, (ch4, tmax) in zip(ok, ev.get(X[ok])):
+            f[i] = eps_objective(ch4, tmax, vcat[i], Vcat_max, Tmax_allowed)
+        evaluated.extend(zip(X, f))
+        return list(f)
+
+    # die Zielfunktion selbst wird nicht aufgerufen (level_map wertet über Pool und Cache aus)
+    sol = optimize.differential_evolution(
+        model.objective_eps_constraint_Vcat, bounds=bounds, args=(Vcat_max,),
+        popsize=popsize, maxiter=maxiter, tol=tol, init=init, seed=seed,
+        workers=level_map, updating="deferred", polish=False,
+    )
+    return {"Vcat_max": Vcat_max, "x": sol.x, "fun": float(sol.fun), "nit": sol.nit,
+            "feasible": sol.fun <= 1.0, "evaluated": evaluated}
+
+
+def neighbour_seeds(model, results: dict, i: int, Vcat_max: float, bounds, n: int, rng):
+    """Initial population for level i: best points of the finished neighbours (repaired) + LHS."""
+    from optimize_kaskade_async import _lhs
+
+    lo, hi = np.array(bounds).T
+    pts = []
+    for j in sorted(results, key=lambda j: abs(j - i))[:2]:
+        pts += [xf for xf in results[j]["evaluated"] if xf[1] <= 1.0]
+    seeds = []
+    for x, _ in sorted(pts, key=lambda xf: xf[1]):
+        if len(seeds) >= n // 2:
+            break
+        x = repair_vcat(model, x, Vcat_max, bounds)
+        if not any(np.allclose(x, s) for s in seeds):
+            seeds.append(x)
+    return np.vstack(seeds + [_lhs(rng, n - len(seeds), lo, hi)])
+
+
+def eps_sweep(model, levels, pool, bounds, Tmax_allowed=None, popsize: int = 10, maxiter: int = 40,
+              seeded_maxiter: int = 20, seed: int = 1) -> dict:
+    """
+    ε-constraint sweep over `levels` (Vcat_max values), waves of concurrent levels.
+    Returns level results (sorted by Vcat_max), the front mask over all simulated points
+    and the evaluator.
+    """
+    levels = sorted(float(v) for v in levels)
+    lo, hi = np.array(bounds).T
+    ev = SharedEvaluator(pool, lo, hi)
+    rng = np.random.default_rng(seed)
+    n_pop = popsize * len(bounds)
+    results = {}
+
+    for w, wave in enumerate(wave_order(len(levels))):
+        with ThreadPoolExecutor(len(wave)) as threads:
+            futs = {}
+            for i in wave:
+                init = ("latinhypercube" if not results
+                        else neighbour_seeds(model, results, i, levels[i], bounds, n_pop, rng))
+                futs[i] = threads.submit(run_level, model, ev, bounds, levels[i], Tmax_allowed, init,
+                                         popsize, maxiter if not results else seeded_maxiter, 0.01,
+                                         int(rng.integers(2 ** 31)))
+            for i, fut in futs.items():
+                results[i] = fut.result()
+        print(f"  Welle {w}: Stufen {wave}, {ev.n_sims} Simulationen bisher")
+
+    X = np.array([p[0] for p in ev.points]).reshape(-1, len(bounds))
+    ch4 = np.array([p[1] for p in ev.points])
+    tmax = np.array([p[2] for p in ev.points])
+    vcat = np.array([model.Vcat(x[1], x[2]) for x in X])
+    ok = np.isfinite(ch4)
+    F = np.column_stack([ch4, vcat])
+    G = tmax_constraint(tmax, Tmax_allowed) if Tmax_allowed is not None else None
+    front = np.zeros(len(X), dtype=bool)
+    if ok.any():
+        front[ok] = pareto_front(F[ok], G[ok] if G is not None else None)
+    return {"levels": [results[i] for i in range(len(levels))], "X": X, "CH4": ch4, "T_max": tmax,
+            "Vcat": vcat, "front": front, "n_sims": ev.n_sims, "evaluator": ev}
+
+
+def main(evaluator=None, n_workers=None, levels=None, n_levels: int = 9, timeout_s: float | None = None):
+    """
+    Same model, bounds and Tmax_allowed as optimize_kaskade_multikriteriell.main, so the
+    front CSV is directly comparable with the NSGA-II one.
+    timeout_s: own pool as kaskade_watchdog.SupervisedPool with this per-point limit.
+    """
+
+    import cantera as ct
+    from Kaskade_Klasse import CSTRCascadeModel, cm
+    from kaskade_watchdog import make_pool
+    from results_store import ResultsStore, new_run_id
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    out_dir = "../Auswertung"
+    os.makedirs(out_dir, exist_ok=True)
+
+    model = CSTRCascadeModel(
+        yaml_file="methane_pox_on_pt.yaml",
+        tc_C=800.0,
+        p_Pa=1 * ct.one_atm,
+        length_m=0.3 * cm,
+        mass_flow_rate_kg_s=1e-6,
+        n_cstr=200,
+        gas_comp="CH4:1, O2:0.6, AR:0.1",
+        energy_enabled=True,
+        surface_name="Pt_surf",
+        gas_name="gas",
+    )
+    bounds = [(1000.0, 2000.0), (1.0, 3.0), (0.2, 0.5)]
+    Tmax_allowed = 2800.0
+    if levels is None:
+        # V_cat-Bereich der Bounds: kleinstes d / größte Porosität .. größtes d / kleinste Porosität
+        v_lo, v_hi = model.Vcat(bounds[1][0], bounds[2][1]), model.Vcat(bounds[1][1], bounds[2][0])
+        levels = np.geomspace(1.05 * v_lo, v_hi, n_levels)
+
+    own_pool = None
+    if evaluator is None:
+        own_pool = evaluator = make_pool(model.config, n_workers, timeout_s)
+    try:
+        res = eps_sweep(model, levels, evaluator, bounds, Tmax_allowed=Tmax_allowed)
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown()
+
+    # Ergebnis-Speicher: alle Simulationen mit Pareto-Flag (wie NSGA-II), Stufen in der Notiz
+    store = ResultsStore("../Ergebnisse")
+    run_id = new_run_id("eps")
+    if res["n_sims"]:
+        store.write("evaluations", {
+            "eval_id": list(range(res["n_sims"])),
+            "A_over_V_1_per_cm": res["X"][:, 0], "diameter_cm": res["X"][:, 1], "porosity": res["X"][:, 2],
+            "CH4_out": res["CH4"], "Vcat_m3": res["Vcat"], "T_max_K": res["T_max"],
+            "g_Tmax_K": res["T_max"] - Tmax_allowed,
+            "failed": ~np.isfinite(res["CH4"]),
+            "is_pareto": res["front"],
+        }, run_id)
+    store.write_run(run_id, optimizer="eps_constraint", model_hash=model.config_hash,
+                    config_json=model.config, seed=1, Tmax_allowed_K=Tmax_allowed,
+                    note=f"Vcat_max={[float(f'{v:.4g}') for v in levels]}")
+
+    print(f"{'Vcat_max [m^3]':>15} {'CH4':>12} {'Vcat [m^3]':>12} {'Gen.':>5}")
+    for lv in res["levels"]:
+        x = lv["x"]
+        ch4 = f"{lv['fun']:.4e}" if lv["feasible"] else "unzulässig"
+        print(f"{lv['Vcat_max']:15.4e} {ch4:>12} {model.Vcat(x[1], x[2]):12.4e} {lv['nit']:5d}")
+    print(f"{res['n_sims']} Simulationen, {int(res['front'].sum())} Punkte auf der Front")
+
+    csv_front = os.path.join(out_dir, "pareto_eps_CH4_vs_Vcat.csv")
+    idx = np.flatnonzero(res["front"])
+    idx = idx[np.argsort(res["Vcat"][idx])]
+    with open(csv_front, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["CH4_out", "Vcat_m3", "A_over_V_1_per_cm", "diameter_cm", "porosity"])
+        for i in idx:
+            w.writerow([res["CH4"][i], res["Vcat"][i], *res["X"][i]])
+    print("Saved:", csv_front)
+    return res
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,20 @@
 
 import os
 import csv
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
-import cantera as ct
 
 from pymoo.core.problem import Problem
-from pymoo.algorithms.moo.nsga2 import NSGA2
-from pymoo.optimize import minimize
-from pymoo.termination import get_termination
-from pymoo.operators.crossover.sbx import SBX
-from pymoo.operators.mutation.pm import PM
 
 from Kaskade_Klasse import CSTRCascadeModel, cm
+from kaskade_worker import simulate_point, preload_model
+from kaskade_cache import ToleranceCache
+from profile_store import ProfileStore
+from results_store import EvaluationWriter, ResultsStore, new_run_id
+from pareto import EpsArchive
 
-ct.make_deprecation_warnings_fatal()  # nur falls du solche Meldungen hast        # 0 = möglichst leise
+# matplotlib, cantera und die pymoo-Algorithmen erst in main(): Worker (spawn) bekommen
+# nur kaskade_worker, dieses Modul wird dort nicht mehr gebraucht.
 
 class CatMultiObjectiveProblem(Problem):
     """
@@ -25,55 +25,136 @@ class CatMultiObjectiveProblem(Problem):
       f2 = V_cat
     Optional constraint:
       T_max <= Tmax_allowed  ->  G = T_max - Tmax_allowed <= 0
+
+    x = [A/V, d, porosity, *operating_vars]: with operating_vars (names from
+    Kaskade_Klasse.OPERATING_VARS, bounds appended to xl/xu) design and operating
+    conditions are optimized together; cache keys, profiles and logs include them.
+
+    robust (robust_design.RobustEvaluator): CH4 / T_max become mean or quantile under
+    parameter scatter instead of the nominal values (profiles are not recorded then).
     """
 
-    def __init__(self, model: CSTRCascadeModel, xl, xu, Tmax_allowed=None):
+    def __init__(self, model: CSTRCascadeModel, xl, xu, Tmax_allowed=None, evaluator=None,
+                 failure_classifier=None, cache_rel_tol=1e-4, cache_max_entries=200_000,
+                 cache_interp_tol=None, profile_store: ProfileStore | None = None,
+                 results_store: ResultsStore | None = None, run_id: str | None = None,
+                 archive: EpsArchive | None = None, operating_vars=(), robust=None):
         self.model = model
+        self.robust = robust
+        self.operating_vars = tuple(operating_vars)
         self.Tmax_allowed = Tmax_allowed
-
-        self.cache = {}
-
-        # <<< NEU: Logs für ALLE Auswertungen >>>
-        self.log_X = []       # [av, d_cm, eps]
-        self.log_CH4 = []
-        self.log_Tmax = []
-        self.log_Vcat = []
+        # optional: Pool/Cluster mit submit() (z.B. kaskade_cluster.LocalCluster);
+        # dessen Worker müssen mit model.config vorgeladen sein
+        self.evaluator = evaluator
+        # optional: FailureClassifier -> wahrscheinliche Abstürze nicht voll simulieren
+        self.failure_classifier = failure_classifier
+
+        # Ergebnis-Cache: Treffer, wenn |dx_i| <= cache_rel_tol * (xu_i - xl_i) für alle i
+        self.cache = ToleranceCache.from_bounds(xl, xu, rel_tol=cache_rel_tol,
+                                                max_entries=cache_max_entries)
+        # optional: (err_CH4, err_Tmax) -> lokal interpolierte Werte akzeptieren, wenn
+        # die Fehlerschätzung darunter liegt (statt zu simulieren)
+        self.cache_interp_tol = None if cache_interp_tol is None else np.asarray(cache_interp_tol, float)
+
+        # optional: Profile der Archivmitglieder auf Platte (persist_profiles pro Generation);
+        # Profile der letzten Generation bleiben bis dahin im Speicher
+        self.profile_store = profile_store
+        self._recent_profiles = {}
+
+        # Log ALLER Auswertungen: wird blockweise in den Ergebnis-Speicher geschrieben
+        # (ohne Speicher bleibt er im RAM, z.B. für kurze Benchmarks)
+        self.run_id = run_id or new_run_id("nsga2")
+        self.log = EvaluationWriter(results_store, self.run_id)
+        # nicht-dominierte Menge (ε-Boxen, beschränkt) schon während des Laufs
+        self.archive = archive if archive is not None else EpsArchive(eps=0.005, log=True)
+        self._info = {}         # key -> (wall_s, failure)
+        self._n_calls = 0       # Nummer des _evaluate-Aufrufs (= Generation)
 
         n_ieq = 1 if Tmax_allowed is not None else 0
 
         super().__init__(
-            n_var=3,
+            n_var=3 + len(self.operating_vars),
             n_obj=2,
             n_ieq_constr=n_ieq,
             xl=np.array(xl, dtype=float),
             xu=np.array(xu, dtype=float),
         )
 
-        # optional cache
-        self.cache = {}
-
     def _evaluate(self, X, out, *args, **kwargs):
         n = X.shape[0]
         F = np.empty((n, 2), dtype=float)
         G = np.empty((n, 1), dtype=float) if self.Tmax_allowed is not None else None
 
+        keys = [tuple(float(v) for v in X[i, :]) for i in range(n)]
+
+        # Simulationen für alle noch unbekannten Punkte (seriell oder über den Pool)
+        todo = {}
+        approx = {}
+        for i, key in enumerate(keys):
+            if key in self.cache or key in todo or key in approx:
+                continue
+            if self.cache_interp_tol is not None:
+                val, err = self.cache.interpolate(key)
+                if val is not None and np.all(err <= self.cache_interp_tol):
+                    approx[key] = (float(val[0]), float(val[1]))
+                    continue
+            todo[key] = X[i, :]
+
+        clf = self.failure_classifier
+        all_todo = []
+        if clf is not None and todo:
+            X_todo = np.array(list(todo.values()))
+            run, p_fail, audited = clf.decide(X_todo)
+            blocked = p_fail >= clf.threshold
+            all_todo = list(todo)
+            todo = {key: x for key, x, r in zip(all_todo, X_todo, run) if r}
+            for key, r in zip(all_todo, run):
+                if not r:
+                    self._info[key] = (np.nan, ("classifier", None))
+
+        with_profile = self.profile_store is not None
+        if self.robust is not None and todo:
+            # alle Stichproben aller offenen Punkte gebündelt (adaptiv, gemeinsame Sobol-Folge)
+            Y = self.robust.evaluate(np.array(list(todo.values())))
+            for key, (ch4, tmax) in zip(todo, Y):
+                self.cache[key] = (float(ch4), float(tmax))
+                self._info[key] = (np.nan, None)
+        elif self.evaluator is not None:
+            futures = {key: self.evaluator.submit(simulate_point, x, with_profile, self.operating_vars)
+                       for key, x in todo.items()}
+            for key, fut in futures.items():
+                try:
+                    self._store_result(key, fut.result())
+                except Exception as e:
+                    self._store_failure(key, e)
+        else:
+            for key, x in todo.items():
+                av, d_cm, eps, overrides = self.model.split_x(x, self.operating_vars)
+                try:
+                    self._store_result(key, self.model.simulate(av, d_cm, eps, return_profile=with_profile,
+                                                                **overrides))
+                except Exception as e:
+                    self._store_failure(key, e)
+
+        if clf is not None and all_todo:
+            # Absturz, Strafwert (robust verworfen) oder über der T_max-Grenze -> kein zulässiger Punkt
+            failed = np.array([key not in self.cache or self.cache[key][0] >= 1e3
+                               or (self.Tmax_allowed is not None and self.cache[key][1] > self.Tmax_allowed)
+                               for key in all_todo])
+            clf.record(X_todo, p_fail, failed, audited, blocked)
+
         for i in range(n):
-            av, d_cm, eps = X[i, :]
+            d_cm, eps = X[i, 1], X[i, 2]
 
             # Objective 2: Vcat purely geometric
             vcat = self.model.Vcat(d_cm, eps)
 
             # Objective 1 + optional constraint needs simulation
-            key = (round(av, 6), round(d_cm, 6), round(eps, 6))
-            try:
-                if key in self.cache:
-                    ch4, tmax = self.cache[key]
-                else:
-                    res = self.model.simulate(av, d_cm, eps, return_profile=False)
-                    ch4 = float(res["CH4"])
-                    tmax = float(res["T_max"])
-                    self.cache[key] = (ch4, tmax)
-            except Exception:
+            if keys[i] in approx:
+                ch4, tmax = approx[keys[i]]
+            elif keys[i] in self.cache:
+                ch4, tmax = self.cache[keys[i]]
+            else:
                 ch4 = 1e3
                 tmax = 1e9
 
@@ -84,18 +165,131 @@ class CatMultiObjectiveProblem(Problem):
                 G[i, 0] = tmax - float(self.Tmax_allowed)
 
             # --- LOG ALL EVALUATED POINTS ---
-            self.log_X.append([av, d_cm, eps])
-            self.log_CH4.append(ch4)
-            self.log_Tmax.append(tmax)
-            self.log_Vcat.append(vcat)
+            wall, failure = self._info.pop(keys[i], (np.nan, None))
+            self.record(X[i, :], ch4, tmax, vcat, wall, failure)
 
+        self._n_calls += 1
         out["F"] = F
         if G is not None:
             out["G"] = G
 
-
-def main():
-    os.chdir(os.path.dirname(__file__))
+    def record(self, x, ch4, tmax, vcat, wall=np.nan, failure=None):
+        """Log one evaluation and offer it to the ε-archive (only feasible, successful points)."""
+        self.log.append(
+            generation=self._n_calls,
+            A_over_V_1_per_cm=float(x[0]), diameter_cm=float(x[1]), porosity=float(x[2]),
+            **self._operating_columns(x),
+            CH4_out=float(ch4), Vcat_m3=float(vcat), T_max_K=float(tmax),
+            g_Tmax_K=float(tmax) - self.Tmax_allowed if self.Tmax_allowed is not None else None,
+            wall_s=float(wall),
+            failed=failure is not None,
+            failure_reason=failure[0] if failure else None,
+            failure_stage=failure[1] if failure else None,
+        )
+        feasible = self.Tmax_allowed is None or tmax <= self.Tmax_allowed
+        if failure is None and feasible and ch4 < 1e3:
+            # Archiv-Item: (A/V, d, eps, T_max, *Betriebsgrößen)
+            self.archive.add((ch4, vcat), (float(x[0]), float(x[1]), float(x[2]), float(tmax),
+                                           *(float(v) for v in x[3:])))
+
+    def _operating_columns(self, x) -> dict:
+        return dict(zip(self.operating_vars, self.model.split_x(x, self.operating_vars)[3].values()))
+
+    def end_generation(self) -> dict:
+        """Snapshot of the ε-archive (size, hypervolume), also written to the store."""
+        snap = self.archive.snapshot(self._n_calls - 1)
+        if self.log.store is not None and len(self.archive):
+            F = self.archive.F()
+            X = np.array(self.archive.items(), dtype=float)
+            self.log.store.write("archive", {
+                "generation": [snap["generation"]] * len(F),
+                "A_over_V_1_per_cm": X[:, 0], "diameter_cm": X[:, 1], "porosity": X[:, 2],
+                **{name: X[:, 4 + j] for j, name in enumerate(self.operating_vars)},
+                "CH4_out": F[:, 0], "Vcat_m3": F[:, 1], "T_max_K": X[:, 3],
+                "hypervolume": [snap["hypervolume"]] * len(F),
+            }, self.run_id)
+        return snap
+
+    def _store_result(self, key, res: dict):
+        self.cache[key] = (float(res["CH4"]), float(res["T_max"]))
+        self._info[key] = (float(res.get("wall_s", np.nan)), None)
+        if "profile" in res:
+            self._recent_profiles[key] = res["profile"]
+
+    def _store_failure(self, key, exc):
+        rec = getattr(exc, "record", None) or {}
+        self._info[key] = (rec.get("elapsed_s") or np.nan,
+                           (rec.get("reason", type(exc).__name__), rec.get("stage")))
+
+    def persist_profiles(self, X_archive):
+        """Write profiles of the archive members to the store, drop all other profiles."""
+        if self.profile_store is None:
+            return
+        for x in X_archive:
+            key = tuple(float(v) for v in x)
+            prof = self._recent_profiles.get(key)
+            if prof is not None and not self.profile_store.has(x):
+                self.profile_store.put(x, prof)
+        self._recent_profiles.clear()
+
+    def load_profiles(self, X, n_workers=None) -> list:
+        """
+        Profiles for all rows of X from the store; missing ones are recomputed in
+        parallel (self.evaluator or a local process pool) and stored.
+        Requires a profile_store (ValueError otherwise).
+        """
+        if self.profile_store is None:
+            raise ValueError("load_profiles needs a profile_store (CatMultiObjectiveProblem(profile_store=...))")
+        missing = [x for x in X if not self.profile_store.has(x)]
+        if missing:
+            pool = self.evaluator
+            own_pool = None
+            if pool is None:
+                own_pool = pool = ProcessPoolExecutor(n_workers, initializer=preload_model,
+                                                      initargs=(self.model.config,))
+            try:
+                futures = [pool.submit(simulate_point, x, True, self.operating_vars) for x in missing]
+                results = []
+                for f in futures:
+                    try:
+                        results.append(f.result())
+                    except Exception:
+                        results.append(None)
+            finally:
+                if own_pool is not None:
+                    own_pool.shutdown()
+            for x, res in zip(missing, results):
+                if res is not None:
+                    self.profile_store.put(x, res["profile"])
+                    self.cache[x] = (float(res["CH4"]), float(res["T_max"]))
+        return [self.profile_store.get(x) for x in X]
+
+
+def main(evaluator=None, failure_classifier=None, operating_bounds: dict | None = None, budget=None,
+         warm_start: bool = False, hv_ref=None, timeout_s: float | None = None, n_workers: int | None = None):
+    """
+    operating_bounds: e.g. {"tc_C": (700.0, 900.0), "ch4_o2": (1.2, 2.5)} -> extra decision variables.
+    budget: budget.BudgetManager, opt-in; default: no extra stop criteria, the run goes the
+    full n_gen=50 as before. Stagnation stopping e.g. with
+    BudgetManager(window=10, hv_rtol=1e-3, min_spread=1e-3)
+    warm_start: seed the initial population from earlier runs / CSVs and preload the
+    cache with evaluations of the same model (see warm_start.py).
+    hv_ref: fixed hypervolume reference (CH4_out, Vcat_m3); default: from the first archive,
+    grown (and the history recomputed) when the front leaves it.
+    timeout_s: without an evaluator, evaluate on a kaskade_watchdog.SupervisedPool with
+    n_workers processes and this per-point limit (stuck simulations are killed).
+    """
+    from budget import BudgetManager, population_spread, write_checkpoint
+    import cantera as ct
+    import matplotlib.pyplot as plt
+    from pymoo.algorithms.moo.nsga2 import NSGA2
+    from pymoo.optimize import minimize
+    from pymoo.termination import get_termination
+    from pymoo.operators.crossover.sbx import SBX
+    from pymoo.operators.mutation.pm import PM
+
+    ct.make_deprecation_warnings_fatal()  # nur falls du solche Meldungen hast
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
     out_dir = "../Auswertung"
     os.makedirs(out_dir, exist_ok=True)
 
@@ -125,39 +319,96 @@ def main():
     # bounds: [A/V (1/cm), d (cm), porosity (-)]
     xl = [1000.0, 1.0, 0.2]
     xu = [2000.0, 3.0, 0.5]
+    operating_bounds = dict(operating_bounds or {})
+    xl += [lo for lo, _ in operating_bounds.values()]
+    xu += [hi for _, hi in operating_bounds.values()]
 
     Tmax_allowed = 2800.0  # z.B. als harte Grenze; oder None
 
-    problem = CatMultiObjectiveProblem(model, xl=xl, xu=xu, Tmax_allowed=Tmax_allowed)
+    own_pool = None
+    if evaluator is None and timeout_s is not None:
+        from kaskade_watchdog import make_pool
+        own_pool = evaluator = make_pool(model.config, n_workers, timeout_s,
+                                         failure_log=os.path.join(out_dir, "failures.jsonl"))
+
+    profile_store = ProfileStore(os.path.join(out_dir, "profiles"))
+    store = ResultsStore("../Ergebnisse")
+    run_id = new_run_id("nsga2")
+    problem = CatMultiObjectiveProblem(model, xl=xl, xu=xu, Tmax_allowed=Tmax_allowed,
+                                       evaluator=evaluator, failure_classifier=failure_classifier,
+                                       profile_store=profile_store, results_store=store, run_id=run_id,
+                                       operating_vars=tuple(operating_bounds),
+                                       archive=EpsArchive(eps=0.005, log=True, hv_ref=hv_ref))
+
+    pop_size = 50
+    sampling = None
+    if warm_start:
+        from warm_start import warm_start as seed_from_archives
+        sampling, info = seed_from_archives(
+            problem, store, pop_size, rng=1,
+            legacy_csv=[os.path.join(out_dir, "all_evaluated_points.csv"),
+                        os.path.join(out_dir, "pareto_CH4_vs_Vcat.csv")])
+        print(f"Warmstart: {info['n_seeds']} Seeds aus {info['n_archived']} archivierten Punkten, "
+              f"{info['n_cached']} im Cache")
 
     algo = NSGA2(
-        pop_size=50,
+        pop_size=pop_size,
+        **({"sampling": sampling} if sampling is not None else {}),
         crossover=SBX(prob=0.9, eta=8),
         mutation=PM(eta=10),
         eliminate_duplicates=True,
     )
     termination = get_termination("n_gen", 50)
 
-    res = minimize(problem, algo, termination, seed=1, verbose=True)
+    stop_reason = "n_gen"
+    budget = budget if budget is not None else BudgetManager()    # alle Kriterien aus
+    budget.start()
+
+    def on_generation(algorithm):
+        nonlocal stop_reason
+        # Profile der aktuellen nicht-dominierten Menge sichern, Rest verwerfen
+        problem.persist_profiles(algorithm.opt.get("X"))
+        # ε-Archiv: Hypervolumen live; Budget / Stagnation -> sauber beenden
+        snap = problem.end_generation()
+        print(f"  archive: {snap['size']} points, HV = {snap['hypervolume']:.4e}")
+        best = float(problem.archive.F()[:, 0].min()) if len(problem.archive) else None
+        if snap["ref_changed"]:
+            # Referenz gewachsen: Stagnations-Test mit den neu gerechneten Hypervolumen
+            budget.rescale_hv([h[3] for h in problem.archive.history[:-1]])
+        reason = budget.update(n_evals=algorithm.evaluator.n_eval, best=best, hv=snap["hypervolume"],
+                               spread=population_spread(algorithm.pop.get("X"), xl, xu))
+        if reason is not None:
+            stop_reason = reason
+            algorithm.termination.terminate()
+
+    try:
+        res = minimize(problem, algo, termination, seed=1, verbose=True, callback=on_generation)
+    finally:
+        if own_pool is not None:
+            own_pool.shutdown()
+    problem.log.close()
+    write_checkpoint(f"../Ergebnisse/checkpoints/{run_id}.npz", X=res.pop.get("X"), F=res.pop.get("F"),
+                     archive_F=problem.archive.F(), archive_X=np.array(problem.archive.items(), dtype=float),
+                     stop_reason=stop_reason)
+    print(f"Abbruch: {stop_reason} nach {budget.elapsed:.1f} s")
 
     X = res.X            # decision variables
-    F_scaled = res.F     # scaled objectives
+    F = res.F            # unskalierte Zielwerte [CH4_out, Vcat]
 
     # -----------------------------
-    # Recompute TRUE objectives for export/plot
-    # (because res.F is scaled!)
+    # TRUE-Werte aus den gespeicherten Auswertungen (keine erneute Simulation);
+    # Profile der Front aus dem ProfileStore, fehlende werden parallel nachgerechnet
     # -----------------------------
+    profiles = problem.load_profiles(X)
     CH4_true = np.empty(X.shape[0], dtype=float)
     Tmax_true = np.empty(X.shape[0], dtype=float)
-
-    for i, (av, d_cm, eps) in enumerate(X):
-        try:
-            r = model.simulate(av, d_cm, eps, return_profile=True)
-            CH4_true[i] = float(r["CH4"])
-            Tmax_true[i] = float(r["T_max"])
-        except Exception:
+    for i, x in enumerate(X):
+        if x in problem.cache:
+            CH4_true[i], Tmax_true[i] = problem.cache[x]
+        else:
             CH4_true[i] = np.nan
             Tmax_true[i] = np.nan
+    print("  profiles available:", sum(p is not None for p in profiles), "/", len(X))
 
     print("\nDiagnostics (TRUE):")
     #print("  fails:", fail, "/", len(X))
@@ -188,9 +439,6 @@ def main():
     print("  CSV :", csv_path)
     print("  PNG :", os.path.join(out_dir, "pareto_front_pymoo_TRUE.png"))
 
-    X = res.X
-    F = res.F  # jetzt TRUE: [CH4_out, Vcat]
-
     csv_path = os.path.join(out_dir, "pareto_CH4_vs_Vcat.csv")
     with open(csv_path, "w", newline="") as f:
         w = csv.writer(f)
@@ -198,30 +446,24 @@ def main():
         for i in range(len(X)):
             w.writerow([F[i, 0], F[i, 1], X[i, 0], X[i, 1], X[i, 2]])
 
-    csv_all = os.path.join(out_dir, "all_evaluated_points.csv")
-
-    with open(csv_all, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow([
-            "CH4_out",
-            "T_max_K",
-            "Vcat_m3",
-            "A_over_V_1_per_cm",
-            "diameter_cm",
-            "porosity"
-        ])
-
-        for i in range(len(problem.log_CH4)):
-            w.writerow([
-                problem.log_CH4[i],
-                problem.log_Tmax[i],
-                problem.log_Vcat[i],
-                problem.log_X[i][0],
-                problem.log_X[i][1],
-                problem.log_X[i][2],
-            ])
+    # -----------------------------
+    # Ergebnis-Speicher (Parquet): die Auswertungen wurden während des Laufs
+    # gestreamt, hier nur noch die Lauf-Metadaten
+    # -----------------------------
+    store.write_run(run_id, optimizer="nsga2", model_hash=model.config_hash,
+                    config_json=model.config, seed=1, Tmax_allowed_K=Tmax_allowed,
+                    stop_reason=stop_reason)
+    print("Saved run", run_id, "to results store", f"({problem.log.n_rows} evaluations)")
 
+    # CSV aller Punkte (Kompatibilität), aus dem Speicher gelesen statt aus dem RAM
+    csv_all = os.path.join(out_dir, "all_evaluated_points.csv")
+    cols = ["CH4_out", "T_max_K", "Vcat_m3", "A_over_V_1_per_cm", "diameter_cm", "porosity"]
+    df_all = store.read("evaluations", columns=["eval_id", *cols], filters=[("run_id", "==", run_id)])
+    df_all.sort_values("eval_id")[cols].to_csv(csv_all, index=False)
     print("Saved ALL evaluated points to:", csv_all)
 
+    if failure_classifier is not None:
+        print("Failure classifier:", failure_classifier.summary())
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,612 @@
+# pareto.py
+"""
+Pareto-Werkzeuge für große Auswertungsarchive (NumPy, vektorisiert).
+
+Bisher gibt es die Front nur aus pymoo (res.X / res.F), und die Auswertung plottet
+nur, was exportiert wurde. Hier unabhängig davon, direkt auf Zielwerten
+(alle Ziele werden minimiert, nicht-endliche Zeilen zählen nie zur Front):
+
+  nondominated(F)         Maske der nicht-dominierten Zeilen
+                            2 Ziele:   Sortierung + kumulatives Minimum, O(n log n)
+                            >=3 Ziele: Kung (Blöcke, paarweises Mergen, vektorisiert)
+  nondominated_rank(F)    Front-Nummer je Zeile (0 = Pareto-Front)
+                            2 Ziele:   Sortierung + bisect über die Front-Enden, O(n log n)
+  constrained_rank(F, G)  unzulässige Zeilen (G > 0) hinter allen zulässigen, nach Verletzung
+  pareto_front(F, G)      Front der zulässigen Zeilen (T_max-Grenze: G = T_max - Tmax_allowed)
+  eps_filter(F, eps)      ε-Dominanz-Boxfilter, ein Vertreter je nicht-dominierter Box
+  hypervolume(F, ref)     2-D exakt, 3-D Sweep über f3 mit Staircase2D
+  Staircase2D             inkrementelle 2-D-Front mit laufendem Hypervolumen (bisect)
+  EpsArchive              Online-ε-Archiv während des Laufs (beschränkter Speicher, HV je Generation)
+
+Auf dem Ergebnis-Speicher (results_store, pyarrow wird erst dort importiert):
+
+  archive_front(store, ...)           Front über einen, mehrere oder alle Läufe
+  hypervolume_over_time(store, ...)   HV der Präfix-Fronten je Generation und Lauf
+"""
+import bisect
+
+import numpy as np
+
+OBJECTIVES = ("CH4_out", "Vcat_m3")
+
+_BLOCK = 256              # Blockgröße für die Blätter von Kung
+_MAX_CELLS = 4_000_000    # max. Elemente pro Broadcast-Vergleich (Speichergrenze)
+
+
+def _as_2d(F) -> np.ndarray:
+    F = np.asarray(F, dtype=float)
+    if F.ndim != 2:
+        raise ValueError("F must have shape (n_points, n_objectives)")
+    return F
+
+
+# ----------------------------------------------------------------------
+# Nicht-dominierte Sortierung
+# ----------------------------------------------------------------------
+def _dominated_by(Q, P) -> np.ndarray:
+    """Mask over rows of Q: dominated by at least one row of P."""
+    out = np.zeros(len(Q), dtype=bool)
+    if len(P) == 0 or len(Q) == 0:
+        return out
+    step = max(1, _MAX_CELLS // (len(P) * Q.shape[1]))
+    for s in range(0, len(Q), step):
+        q = Q[s:s + step, None, :]
+        le = np.all(P[None, :, :] <= q, axis=2)
+        lt = np.any(P[None, :, :] < q, axis=2)
+        out[s:s + step] = np.any(le & lt, axis=1)
+    return out
+
+
+def _nd_block(B) -> np.ndarray:
+    """Non-dominated mask inside one small block (all pairs)."""
+    le = np.all(B[:, None, :] <= B[None, :, :], axis=2)     # le[j, i]: B[j] <= B[i]
+    lt = np.any(B[:, None, :] < B[None, :, :], axis=2)
+    return ~np.any(le & lt, axis=0)
+
+
+def _nd_2d_sorted(U) -> np.ndarray:
+    # U eindeutig und nach (f1, f2) sortiert: nicht dominiert <=> f2 unter allen f2 davor
+    keep = np.ones(len(U), dtype=bool)
+    keep[1:] = U[1:, 1] < np.minimum.accumulate(U[:, 1])[:-1]
+    return keep
+
+
+def _kung(U) -> np.ndarray:
+    """
+    Indices of the non-dominated rows of U (unique rows, lexicographically sorted).
+
+    Kung's divide and conquer, bottom-up: blocks are filtered brute force, then
+    neighbouring fronts are merged. A later row can never dominate an earlier one,
+    so only the right half has to be checked against the left half.
+    """
+    fronts = []
+    for s in range(0, len(U), _BLOCK):
+        idx = np.arange(s, min(s + _BLOCK, len(U)))
+        fronts.append(idx[_nd_block(U[idx])])
+    while len(fronts) > 1:
+        merged = [np.concatenate([a, b[~_dominated_by(U[b], U[a])]])
+                  for a, b in zip(fronts[0::2], fronts[1::2])]
+        if len(fronts) % 2:
+            merged.append(fronts[-1])
+        fronts = merged
+    return fronts[0]
+
+
+def _nd_sorted(U) -> np.ndarray:
+    """Non-dominated mask of unique, lexicographically sorted rows."""
+    keep = np.zeros(len(U), dtype=bool)
+    if len(U) == 0:
+        return keep
+    if U.shape[1] == 1:
+        keep[0] = True
+        return keep
+    if U.shape[1] == 2:
+        return _nd_2d_sorted(U)
+
+    cand = np.arange(len(U))
+    if len(U) > 4 * _BLOCK:
+        # billiger Vorfilter: alles raus, was von ein paar guten Punkten dominiert wird
+        lo, hi = U.min(axis=0), U.max(axis=0)
+        s = ((U - lo) / np.where(hi > lo, hi - lo, 1.0)).sum(axis=1)
+        pivots = U[np.argpartition(s, 32)[:32]]
+        cand = cand[~_dominated_by(U, pivots)]
+    keep[cand[_kung(U[cand])]] = True
+    return keep
+
+
+def _unique_rows(F):
+    U, inv = np.unique(F, axis=0, return_inverse=True)
+    return U, inv.reshape(-1)
+
+
+def nondominated(F) -> np.ndarray:
+    """Boolean mask of the non-dominated rows of F (minimization; duplicates are all kept)."""
+    F = _as_2d(F)
+    mask = np.zeros(len(F), dtype=bool)
+    ok = np.flatnonzero(np.all(np.isfinite(F), axis=1))
+    if ok.size:
+        U, inv = _unique_rows(F[ok])
+        mask[ok] = _nd_sorted(U)[inv]
+    return mask
+
+
+def nondominated_rank(F, max_rank: int | None = None) -> np.ndarray:
+    """
+    Front index per row (0 = Pareto front). Rows beyond `max_rank` fronts share
+    rank max_rank; non-finite rows get the rank after the last front.
+    """
+    F = _as_2d(F)
+    rank = np.empty(len(F), dtype=np.int64)
+    ok = np.flatnonzero(np.all(np.isfinite(F), axis=1))
+    if ok.size == 0:
+        rank[:] = 0
+        return rank
+    U, inv = _unique_rows(F[ok])
+    rank_u = np.empty(len(U), dtype=np.int64)
+
+    if U.shape[1] == 2:
+        # Front k bekommt den Punkt, wenn ihr letztes f2 größer ist; die Front-Enden
+        # sind monoton, also reicht bisect
+        ends = []
+        for i, f2 in enumerate(U[:, 1].tolist()):
+            k = bisect.bisect_right(ends, f2)
+            if k == len(ends):
+                ends.append(f2)
+            else:
+                ends[k] = f2
+            rank_u[i] = k
+        if max_rank is not None:
+            np.minimum(rank_u, max_rank, out=rank_u)
+    else:
+        remaining = np.arange(len(U))
+        r = 0
+        while remaining.size:
+            if max_rank is not None and r >= max_rank:
+                rank_u[remaining] = r
+                break
+            m = _nd_sorted(U[remaining])
+            rank_u[remaining[m]] = r
+            remaining = remaining[~m]
+            r += 1
+
+    rank[:] = rank_u.max() + 1
+    rank[ok] = rank_u[inv]
+    return rank
+
+
+# ----------------------------------------------------------------------
+# Nebenbedingungen (T_max)
+# ----------------------------------------------------------------------
+def violation(G) -> np.ndarray:
+    """Total constraint violation per row, G <= 0 is feasible (G: (n,) or (n, k))."""
+    G = np.asarray(G, dtype=float)
+    if G.ndim == 1:
+        G = G[:, None]
+    cv = np.maximum(G, 0.0).sum(axis=1)
+    cv[~np.isfinite(cv)] = np.inf
+    return cv
+
+
+def tmax_constraint(T_max, Tmax_allowed) -> np.ndarray:
+    """G = T_max - Tmax_allowed (same convention as CatMultiObjectiveProblem)."""
+    return np.asarray(T_max, dtype=float) - float(Tmax_allowed)
+
+
+def constrained_rank(F, G=None) -> np.ndarray:
+    """
+    Deb's constrained ranking: feasible rows by front, infeasible rows behind
+    them, ordered by total violation.
+    """
+    F = _as_2d(F)
+    if G is None:
+        return nondominated_rank(F)
+    cv = violation(G)
+    feas = cv <= 0.0
+    rank = np.empty(len(F), dtype=np.int64)
+    n_fronts = 0
+    if feas.any():
+        rank[feas] = nondominated_rank(F[feas])
+        n_fronts = int(rank[feas].max()) + 1
+    if (~feas).any():
+        _, dense = np.unique(cv[~feas], return_inverse=True)
+        rank[~feas] = n_fronts + dense.reshape(-1)
+    return rank
+
+
+def pareto_front(F, G=None) -> np.ndarray:
+    """
+    Mask of the constrained Pareto front: non-dominated feasible rows; if nothing
+    is feasible, the rows with the smallest violation.
+    """
+    F = _as_2d(F)
+    if G is None:
+        return nondominated(F)
+    cv = violation(G)
+    feas = cv <= 0.0
+    mask = np.zeros(len(F), dtype=bool)
+    if feas.any():
+        mask[feas] = nondominated(F[feas])
+    elif np.isfinite(cv).any():
+        mask = cv == cv.min()
+    return mask
+
+
+# ----------------------------------------------------------------------
+# ε-Dominanz
+# ----------------------------------------------------------------------
+def eps_boxes(F, eps, ref=None, log: bool = False) -> np.ndarray:
+    """
+    Continuous box coordinates: (F - ref) / eps, or log(F) / log(1 + eps) with
+    log=True (relative boxes, for objectives spanning decades like CH4_out).
+    The integer box is floor() of it.
+    """
+    F = _as_2d(F)
+    eps = np.broadcast_to(np.asarray(eps, dtype=float), (F.shape[1],))
+    if log:
+        if np.any(F <= 0.0):
+            raise ValueError("log boxes need positive objective values")
+        return np.log(F) / np.log1p(eps)
+    ref = np.zeros(F.shape[1]) if ref is None else np.asarray(ref, dtype=float)
+    return (F - ref) / eps
+
+
+def eps_filter(F, eps, ref=None, log: bool = False) -> np.ndarray:
+    """
+    Mask of an ε-Pareto subset: per non-dominated box the point closest to the
+    box corner is kept. Thins dense fronts to a size bounded by the box grid.
+    """
+    F = _as_2d(F)
+    mask = np.zeros(len(F), dtype=bool)
+    idx = np.flatnonzero(nondominated(F))
+    if idx.size == 0:
+        return mask
+    Z = eps_boxes(F[idx], eps, ref, log)
+    B = np.floor(Z)
+    dist = np.linalg.norm(Z - B, axis=1)
+    _, inv = _unique_rows(B)
+    order = np.lexsort((dist, inv))
+    first = order[np.r_[True, inv[order][1:] != inv[order][:-1]]]
+    keep = first[nondominated(B[first])]
+    mask[idx[keep]] = True
+    return mask
+
+
+# ----------------------------------------------------------------------
+# Hypervolumen
+# ----------------------------------------------------------------------
+class Staircase2D:
+    """
+    Incremental 2-D non-dominated set (minimization) with running hypervolume.
+
+    Points are kept sorted by f1 with f2 strictly decreasing. add() finds the
+    position by bisect and removes the points the newcomer dominates; every point
+    is removed at most once, so updates are O(log n) amortized (plus list moves).
+    `items` holds an optional payload per point (e.g. decision variables).
+    """
+
+    def __init__(self, ref):
+        self.ref = (float(ref[0]), float(ref[1]))
+        self.f1 = []
+        self.f2 = []
+        self.items = []
+        self.hv = 0.0
+
+    def __len__(self) -> int:
+        return len(self.f1)
+
+    def dominated(self, a: float, b: float) -> bool:
+        """True if (a, b) is weakly dominated by a stored point."""
+        k = bisect.bisect_right(self.f1, a)
+        return k > 0 and self.f2[k - 1] <= b
+
+    def add(self, a: float, b: float, item=None) -> bool:
+        """Insert (a, b); returns False if it is dominated (nothing changes)."""
+        if self.dominated(a, b):
+            return False
+        k = bisect.bisect_left(self.f1, a)
+        j = k
+        while j < len(self.f1) and self.f2[j] >= b:
+            j += 1
+
+        # HV-Zuwachs: Fläche über (a, b) bis ref, die noch nicht überdeckt war
+        r1, r2 = self.ref
+        if a < r1 and b < r2:
+            h = min(self.f2[k - 1], r2) if k > 0 else r2
+            x, gain = a, 0.0
+            for m in range(k, j):
+                xm = min(self.f1[m], r1)
+                gain += (xm - x) * max(h - b, 0.0)
+                x, h = xm, min(self.f2[m], r2)
+            xe = min(self.f1[j], r1) if j < len(self.f1) else r1
+            gain += (xe - x) * max(h - b, 0.0)
+            self.hv += gain
+
+        self.f1[k:j] = [a]
+        self.f2[k:j] = [b]
+        self.items[k:j] = [item]
+        return True
+
+    def points(self) -> np.ndarray:
+        return np.column_stack([self.f1, self.f2]) if self.f1 else np.empty((0, 2))
+
+
+def _hv2d(F, ref) -> float:
+    F = np.unique(F, axis=0)                    # f1 aufsteigend, f2 absteigend (Front)
+    x_next = np.append(F[1:, 0], ref[0])
+    return float(np.sum((x_next - F[:, 0]) * (ref[1] - F[:, 1])))
+
+
+def _hv3d(F, ref) -> float:
+    # Sweep über f3: Fläche der 2-D-Front aller Punkte bis f3, mal Schichtdicke
+    order = np.argsort(F[:, 2], kind="stable")
+    z = F[order, 2]
+    dz = np.append(z[1:], ref[2]) - z
+    st = Staircase2D(ref[:2])
+    hv = 0.0
+    for i, w in zip(order.tolist(), dz.tolist()):
+        st.add(F[i, 0], F[i, 1])
+        hv += st.hv * w
+    return float(hv)
+
+
+def hypervolume(F, ref) -> float:
+    """Hypervolume dominated by F and bounded by the reference point (2 or 3 objectives)."""
+    F = _as_2d(F)
+    ref = np.asarray(ref, dtype=float)
+    F = F[np.all(F < ref, axis=1)]
+    if len(F) == 0:
+        return 0.0
+    F = F[nondominated(F)]
+    if F.shape[1] == 2:
+        return _hv2d(F, ref)
+    if F.shape[1] == 3:
+        return _hv3d(F, ref)
+    raise NotImplementedError("hypervolume is implemented for 2 and 3 objectives")
+
+
+def reference_point(F, margin: float = 0.1) -> np.ndarray:
+    """Nadir of the finite rows plus `margin` of the range (common ref for comparisons)."""
+    F = _as_2d(F)
+    F = F[np.all(np.isfinite(F), axis=1)]
+    lo, hi = F.min(axis=0), F.max(axis=0)
+    span = np.where(hi > lo, hi - lo, np.abs(hi) + 1e-12)
+    return hi + margin * span
+
+
+def hypervolume_history(F, groups, ref, G=None):
+    """
+    Hypervolume of the prefix fronts: rows are processed group by group (groups
+    sorted ascending, e.g. generation), after each group the front of everything
+    seen so far is measured. Returns (group values, n_rows, front size, hv).
+    """
+    F = _as_2d(F)
+    groups = np.asarray(groups)
+    ok = np.all(np.isfinite(F), axis=1)
+    if G is not None:
+        ok &= violation(G) <= 0.0
+    order = np.argsort(groups, kind="stable")
+    keys, start = np.unique(groups[order], return_index=True)
+    stop = np.append(start[1:], len(order))
+
+    front = np.empty((0, F.shape[1]))
+    n_rows = np.empty(len(keys), dtype=np.int64)
+    size = np.empty(len(keys), dtype=np.int64)
+    hv = np.empty(len(keys))
+    for g, (s, e) in enumerate(zip(start, stop)):
+        rows = order[s:e]
+        cand = np.vstack([front, F[rows[ok[rows]]]])
+        front = cand[nondominated(cand)] if len(cand) else cand
+        n_rows[g] = e
+        size[g] = len(front)
+        hv[g] = hypervolume(front, ref) if len(front) else 0.0
+    return keys, n_rows, size, hv
+
+
+# ----------------------------------------------------------------------
+# Online-Archiv (ε-Dominanz, beschränkter Speicher)
+# ----------------------------------------------------------------------
+def _dominates(a, b) -> bool:
+    return a[0] <= b[0] and a[1] <= b[1] and (a[0] < b[0] or a[1] < b[1])
+
+
+class EpsArchive:
+    """
+    Online ε-dominance archive for two objectives (Laumanns et al.).
+
+    The objective space is cut into boxes (log=True: factor 1+eps per box, else
+    eps per box). One point per non-dominated box is kept; the boxes form a
+    staircase sorted by the first box index, so add() is a bisect plus removal
+    of the boxes the newcomer dominates, O(log n) amortized. If more than
+    max_size boxes survive, the boxes are merged pairwise (eps doubled) and the
+    archive is rebuilt, so memory stays bounded.
+
+    snapshot() records size and hypervolume per generation (self.history);
+    stalled() tells whether the hypervolume stopped improving. Without a fixed
+    hv_ref the reference is taken from the first snapshot and grown as soon as an
+    archive point reaches it; the history is then recomputed with the new
+    reference (fronts of all snapshots are kept for that), so a front that moves
+    outside the first reference box does not look stalled.
+    """
+
+    def __init__(self, eps=0.01, log: bool = True, max_size: int = 1000, hv_ref=None):
+        self.eps = np.broadcast_to(np.asarray(eps, dtype=float), (2,)).copy()
+        self.log = bool(log)
+        self.max_size = int(max_size)
+        self.hv_ref = None if hv_ref is None else np.asarray(hv_ref, dtype=float)
+        self._ref_fixed = hv_ref is not None
+        self.n_seen = 0
+        self.history = []       # (generation, n_seen, size, hypervolume)
+        self._fronts = []       # Front je Snapshot (nur ohne festen Referenzpunkt)
+        self._rebuilding = False
+        self._clear()
+
+    def _clear(self):
+        self._b1, self._b2 = [], []     # Box-Indizes, b1 steigend, b2 fallend
+        self._f = []                    # Zielwerte des Vertreters
+        self._d = []                    # Abstand des Vertreters zur Box-Ecke
+        self._items = []
+
+    def __len__(self) -> int:
+        return len(self._f)
+
+    def _box(self, f):
+        if self.log:
+            z = np.log(np.maximum(f, 1e-300)) / np.log1p(self.eps)
+        else:
+            z = np.asarray(f, dtype=float) / self.eps
+        b = np.floor(z)
+        return int(b[0]), int(b[1]), float(np.hypot(*(z - b)))
+
+    def add(self, f, item=None) -> bool:
+        """Offer one point (f1, f2); returns True if it entered the archive."""
+        self.n_seen += 1
+        f = (float(f[0]), float(f[1]))
+        if not (np.isfinite(f[0]) and np.isfinite(f[1])):
+            return False
+        b1, b2, d = self._box(f)
+
+        k = bisect.bisect_right(self._b1, b1)
+        if k > 0 and self._b2[k - 1] <= b2:
+            if (self._b1[k - 1], self._b2[k - 1]) != (b1, b2):
+                return False
+            # gleiche Box: neuer Vertreter, wenn er dominiert oder näher an der Ecke liegt
+            old = self._f[k - 1]
+            if _dominates(f, old) or (not _dominates(old, f) and d < self._d[k - 1]):
+                self._f[k - 1], self._d[k - 1], self._items[k - 1] = f, d, item
+                return True
+            return False
+
+        k = bisect.bisect_left(self._b1, b1)
+        j = k
+        while j < len(self._b1) and self._b2[j] >= b2:
+            j += 1
+        self._b1[k:j] = [b1]
+        self._b2[k:j] = [b2]
+        self._f[k:j] = [f]
+        self._d[k:j] = [d]
+        self._items[k:j] = [item]
+
+        if len(self) > self.max_size and not self._rebuilding:
+            self._coarsen()
+        return True
+
+    def _coarsen(self):
+        # Boxen paarweise zusammenlegen (eps verdoppeln), Vertreter neu einsortieren
+        while len(self) > self.max_size:
+            old = list(zip(self._f, self._items))
+            self.eps = np.expm1(2.0 * np.log1p(self.eps)) if self.log else 2.0 * self.eps
+            self._clear()
+            n_seen, self._rebuilding = self.n_seen, True
+            for f, item in old:
+                self.add(f, item)
+            self.n_seen, self._rebuilding = n_seen, False
+
+    def F(self) -> np.ndarray:
+        return np.asarray(self._f, dtype=float).reshape(-1, 2)
+
+    def items(self) -> list:
+        return list(self._items)
+
+    def hypervolume(self, ref=None) -> float:
+        ref = self.hv_ref if ref is None else np.asarray(ref, dtype=float)
+        if ref is None or len(self) == 0:
+            return 0.0
+        return hypervolume(self.F(), ref)
+
+    def snapshot(self, generation: int) -> dict:
+        """
+        Record size and hypervolume. snap["ref_changed"] is True if the reference
+        point had to grow; self.history then holds the recomputed hypervolumes.
+        """
+        F = self.F()
+        ref_changed = False
+        if not self._ref_fixed and len(F) and self.hv_ref is None:
+            self.hv_ref = reference_point(F)
+        elif not self._ref_fixed and len(F) and np.any(F.max(axis=0) >= self.hv_ref):
+            # Punkt auf/außerhalb der Referenz trägt nichts bei -> Referenz vergrößern,
+            # Verlauf mit derselben Referenz neu rechnen (sonst Sprung im Hypervolumen)
+            self.hv_ref = np.maximum(self.hv_ref, reference_point(F))
+            self.history = [(g, n, size, hypervolume(Fg, self.hv_ref) if len(Fg) else 0.0)
+                            for (g, n, size, _), Fg in zip(self.history, self._fronts)]
+            ref_changed = True
+        if not self._ref_fixed:
+            self._fronts.append(F)
+        snap = {"generation": int(generation), "n_seen": self.n_seen, "size": len(self),
+                "hypervolume": self.hypervolume(), "ref_changed": ref_changed}
+        self.history.append((snap["generation"], snap["n_seen"], snap["size"], snap["hypervolume"]))
+        return snap
+
+    def stalled(self, window: int = 10, rtol: float = 1e-3) -> bool:
+        """True if the hypervolume grew by less than rtol (relative) over the last `window` snapshots."""
+        if len(self.history) <= window:
+            return False
+        hv_now, hv_then = self.history[-1][3], self.history[-1 - window][3]
+        return hv_now > 0.0 and hv_now - hv_then <= rtol * hv_now
+
+
+# ----------------------------------------------------------------------
+# Ergebnis-Speicher
+# ----------------------------------------------------------------------
+def _read_evaluations(store, run_ids, objectives, extra=()):
+    from results_store import DECISION_COLUMNS
+
+    cols = list(dict.fromkeys(["run_id", "eval_id", "generation", *objectives, "T_max_K", "failed",
+                               *DECISION_COLUMNS, *extra]))
+    filters = [("run_id", "in", list(run_ids))] if run_ids else None
+    tbl = store.read_arrow("evaluations", columns=cols, filters=filters)
+
+    def col(name, fill):
+        return tbl.column(name).fill_null(fill).to_numpy()
+
+    F = np.column_stack([col(c, np.nan) for c in objectives]).astype(float)
+    F[col("failed", False)] = np.inf           # Strafwerte nie auf die Front
+    return tbl, F, col
+
+
+def archive_front(store, run_ids=None, Tmax_allowed=None, objectives=OBJECTIVES, eps=None,
+                  eps_log: bool = True, columns=()):
+    """
+    Pareto front over the archived evaluations of `run_ids` (None: all runs), with
+    optional T_max limit and ε-thinning. Returns a DataFrame sorted by the first objective.
+    """
+    tbl, F, col = _read_evaluations(store, run_ids, objectives, columns)
+    G = tmax_constraint(col("T_max_K", np.nan), Tmax_allowed) if Tmax_allowed is not None else None
+    mask = pareto_front(F, G)
+    if eps is not None and mask.any():
+        idx = np.flatnonzero(mask)
+        mask[:] = False
+        mask[idx[eps_filter(F[idx], eps, log=eps_log)]] = True
+    df = tbl.take(np.flatnonzero(mask)).to_pandas()
+    return df.sort_values(list(objectives)).reset_index(drop=True)
+
+
+def hypervolume_over_time(store, run_ids=None, ref=None, Tmax_allowed=None,
+                          objectives=OBJECTIVES, step: int = 100):
+    """
+    Hypervolume of the prefix front per generation for each run (one common
+    reference point, so runs are comparable). Runs without generation numbers
+    (e.g. imported CSVs) are grouped into blocks of `step` evaluations.
+    """
+    import pandas as pd
+
+    tbl, F, col = _read_evaluations(store, run_ids, objectives)
+    G = tmax_constraint(col("T_max_K", np.nan), Tmax_allowed) if Tmax_allowed is not None else None
+    if ref is None:
+        feas = np.all(np.isfinite(F), axis=1) & (violation(G) <= 0.0 if G is not None else True)
+        ref = reference_point(F[feas])
+    run = tbl.column("run_id").to_numpy()
+    eval_id = col("eval_id", -1)
+    gen = col("generation", -1)
+
+    parts = []
+    for rid in np.unique(run):
+        m = np.flatnonzero(run == rid)
+        m = m[np.argsort(eval_id[m], kind="stable")]
+        groups = gen[m] if np.all(gen[m] >= 0) else np.arange(len(m)) // step
+        keys, n_rows, size, hv = hypervolume_history(F[m], groups, ref, None if G is None else G[m])
+        parts.append(pd.DataFrame({"run_id": rid, "generation": keys, "n_evals": n_rows,
+                                   "front_size": size, "hypervolume": hv}))
+    df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+        columns=["run_id", "generation", "n_evals", "front_size", "hypervolume"])
+    df.attrs["ref"] = ref
+    return df
@@ -0,0 +1,41 @@
+# profile_store.py
+"""
+Plattenablage für Axialprofile (T, P, Spezies, ...) einzelner Designs.
+
+Ein .npz pro Design, Dateiname = Hash des exakten Parametervektors. Damit kann die
+Nachbearbeitung (Pareto-Export/-Plots) die Profile der Archivmitglieder lesen, statt
+jeden Punkt der Front seriell nachzusimulieren. Gelesen wird erst bei Bedarf (lazy).
+"""
+import hashlib
+import os
+
+import numpy as np
+
+
+class ProfileStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(x) -> str:
+        return hashlib.sha1(np.asarray(x, dtype=float).tobytes()).hexdigest()[:20]
+
+    def path(self, x) -> str:
+        return os.path.join(self.directory, self.key(x) + ".npz")
+
+    def has(self, x) -> bool:
+        return os.path.exists(self.path(x))
+
+    def put(self, x, profile: dict):
+        arrays = {k: np.asarray(v) for k, v in profile.items()}
+        arrays["x"] = np.asarray(x, dtype=float)
+        tmp = self.path(x) + ".tmp.npz"
+        np.savez_compressed(tmp, **arrays)
+        os.replace(tmp, self.path(x))   # atomar, falls mehrere Prozesse schreiben
+
+    def get(self, x) -> dict | None:
+        if not self.has(x):
+            return None
+        with np.load(self.path(x)) as data:
+            return {k: data[k] for k in data.files if k != "x"}
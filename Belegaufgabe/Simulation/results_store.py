@@ -0,0 +1,293 @@
+# results_store.py
+"""
+Spaltenorientierter Ergebnis-Speicher (Parquet / Arrow) für Optimierer- und Simulationsausgaben.
+
+Bisher: lose CSVs mit jeweils eigenen Spaltennamen (all_evaluated_points.csv,
+pareto_*.csv, optimization_history_einkriteriell.csv, ...), die die Auswertung jedes
+Mal komplett mit pandas einliest. Hier stattdessen ein Dataset pro Tabelle:
+
+    <root>/<table>/run_id=<run>/part-<n>.parquet     (Hive-Partitionierung nach Lauf)
+
+Tabellen (feste Schemas, siehe SCHEMAS):
+  runs         Metadaten eines Laufs (Optimierer, Modell-Hash, Konfiguration, Seed, ...)
+  evaluations  jede Auswertung: Entscheidungsvariablen, Ziele, Nebenbedingung,
+               Zeiten, Fehlschläge, Pareto-Flag
+  history      Iterationsverlauf einkriterieller Läufe
+  archive      Schnappschüsse des ε-Archivs je Generation (pareto.EpsArchive)
+
+Lesen über pyarrow.dataset mit Filter-Pushdown (Partitionen + Row-Group-Statistiken)
+und memory-mapped Dateien; Spalten werden nur geladen, wenn sie angefragt sind. Damit
+bleiben auch Millionen Punkte über viele Läufe schnell.
+
+    store = ResultsStore("../Ergebnisse")
+    df = store.read("evaluations", columns=["CH4_out", "Vcat_m3"],
+                    filters=[("is_pareto", "==", True)])
+"""
+import datetime as _dt
+import json
+import os
+import uuid
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+
+DECISION_COLUMNS = ("A_over_V_1_per_cm", "diameter_cm", "porosity")
+# optionale Betriebsbedingungen als Entscheidungsvariablen (Kaskade_Klasse.OPERATING_VARS);
+# null, wenn ein Lauf sie nicht variiert
+OPERATING_COLUMNS = ("tc_C", "p_Pa", "mass_flow_rate_kg_s", "n_cstr", "ch4_o2")
+_OPERATING_FIELDS = [(c, pa.int32() if c == "n_cstr" else pa.float64()) for c in OPERATING_COLUMNS]
+
+SCHEMAS = {
+    "runs": pa.schema([
+        ("run_id", pa.string()),
+        ("started_at", pa.timestamp("s")),
+        ("optimizer", pa.string()),
+        ("model_hash", pa.string()),
+        ("config_json", pa.string()),
+        ("seed", pa.int64()),
+        ("Tmax_allowed_K", pa.float64()),
+        ("stop_reason", pa.string()),
+        ("note", pa.string()),
+    ]),
+    "evaluations": pa.schema([
+        ("run_id", pa.string()),
+        ("eval_id", pa.int64()),
+        ("generation", pa.int32()),
+        ("A_over_V_1_per_cm", pa.float64()),
+        ("diameter_cm", pa.float64()),
+        ("porosity", pa.float64()),
+        *_OPERATING_FIELDS,
+        ("CH4_out", pa.float64()),
+        ("Vcat_m3", pa.float64()),
+        ("T_max_K", pa.float64()),
+        ("g_Tmax_K", pa.float64()),
+        ("wall_s", pa.float64()),
+        ("failed", pa.bool_()),
+        ("failure_reason", pa.string()),
+        ("failure_stage", pa.int32()),
+        ("is_pareto", pa.bool_()),
+    ]),
+    "history": pa.schema([
+        ("run_id", pa.string()),
+        ("iteration", pa.int32()),
+        ("CH4", pa.float64()),
+        ("A_over_V_1_per_cm", pa.float64()),
+        ("diameter_cm", pa.float64()),
+        ("porosity", pa.float64()),
+        *_OPERATING_FIELDS,
+        ("wall_s", pa.float64()),
+    ]),
+    "archive": pa.schema([
+        ("run_id", pa.string()),
+        ("generation", pa.int32()),
+        ("A_over_V_1_per_cm", pa.float64()),
+        ("diameter_cm", pa.float64()),
+        ("porosity", pa.float64()),
+        *_OPERATING_FIELDS,
+        ("CH4_out", pa.float64()),
+        ("Vcat_m3", pa.float64()),
+        ("T_max_K", pa.float64()),
+        ("hypervolume", pa.float64()),
+    ]),
+}
+
+
+def new_run_id(prefix: str = "run") -> str:
+    return f"{prefix}-{_dt.datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+class ResultsStore:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._fs = fs.LocalFileSystem(use_mmap=True)
+
+    # --- Schreiben ---------------------------------------------------
+    def write(self, table: str, columns: dict, run_id: str):
+        """
+        Append one batch (dict column -> sequence) to `table` for `run_id`.
+        Missing (or None) schema columns are filled with nulls, unknown columns are rejected.
+        """
+        schema = SCHEMAS[table]
+        unknown = set(columns) - set(schema.names)
+        if unknown:
+            raise KeyError(f"unknown columns for {table!r}: {sorted(unknown)}")
+        n = len(next(v for k, v in columns.items() if k != "run_id" and v is not None))
+        arrays = []
+        for field in schema:
+            if field.name == "run_id":
+                arrays.append(pa.array([run_id] * n, type=field.type))
+            elif columns.get(field.name) is not None:
+                arrays.append(pa.array(columns[field.name], type=field.type))
+            else:
+                arrays.append(pa.nulls(n, type=field.type))
+        tbl = pa.Table.from_arrays(arrays, schema=schema)
+
+        part_dir = os.path.join(self.root, table, f"run_id={run_id}")
+        os.makedirs(part_dir, exist_ok=True)
+        n_parts = sum(1 for f in os.listdir(part_dir) if f.endswith(".parquet"))
+        # run_id steckt im Pfad (Hive) -> nicht zusätzlich in der Datei speichern
+        pq.write_table(tbl.drop(["run_id"]), os.path.join(part_dir, f"part-{n_parts:05d}.parquet"),
+                       compression="zstd", row_group_size=256_000)
+
+    def write_run(self, run_id: str, **meta):
+        meta = dict(meta)
+        if isinstance(meta.get("config_json"), dict):
+            meta["config_json"] = json.dumps(meta["config_json"], sort_keys=True, default=str)
+        meta.setdefault("started_at", _dt.datetime.now().replace(microsecond=0))
+        self.write("runs", {k: [v] for k, v in meta.items()}, run_id)
+
+    # --- Lesen -------------------------------------------------------
+    def dataset(self, table: str) -> ds.Dataset:
+        path = os.path.join(self.root, table)
+        schema = SCHEMAS[table]
+        return ds.dataset(path, format="parquet", filesystem=self._fs, schema=schema,
+                          partitioning=ds.partitioning(pa.schema([("run_id", pa.string())]),
+                                                       flavor="hive"))
+
+    def has(self, table: str) -> bool:
+        path = os.path.join(self.root, table)
+        return os.path.isdir(path) and any(os.scandir(path))
+
+    def read_arrow(self, table: str, columns=None, filters=None) -> pa.Table:
+        """filters: pyarrow expression or DNF list like [("run_id", "==", "x"), ...]."""
+        if filters is not None and not isinstance(filters, ds.Expression):
+            filters = pq.filters_to_expression(filters)
+        return self.dataset(table).to_table(columns=list(columns) if columns else None, filter=filters)
+
+    def read(self, table: str, columns=None, filters=None):
+        """Same as read_arrow, as pandas DataFrame."""
+        return self.read_arrow(table, columns, filters).to_pandas()
+
+    def run_ids(self, table: str = "evaluations") -> list:
+        path = os.path.join(self.root, table)
+        if not os.path.isdir(path):
+            return []
+        return sorted(d.name.split("=", 1)[1] for d in os.scandir(path) if d.name.startswith("run_id="))
+
+
+class EvaluationWriter:
+    """
+    Streams rows of one table into the store: rows are buffered and written as
+    one Parquet part per `flush_rows`, so only the current batch is in memory.
+    Without a store (store=None) all rows are kept in memory instead.
+    """
+
+    def __init__(self, store: ResultsStore | None, run_id: str, table: str = "evaluations",
+                 flush_rows: int = 5000):
+        self.store = store
+        self.run_id = run_id
+        self.table = table
+        self.flush_rows = int(flush_rows)
+        self._names = [n for n in SCHEMAS[table].names if n != "run_id"]
+        self._cols = {n: [] for n in self._names}
+        self.n_rows = 0
+
+    def append(self, **row):
+        if "eval_id" in self._cols:
+            row.setdefault("eval_id", self.n_rows)
+        for name, col in self._cols.items():
+            col.append(row.get(name))
+        self.n_rows += 1
+        if self.store is not None and len(self._cols[self._names[0]]) >= self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        if self.store is None or not self._cols[self._names[0]]:
+            return
+        self.store.write(self.table, self._cols, self.run_id)
+        self._cols = {n: [] for n in self._names}
+
+    def close(self):
+        self.flush()
+
+    def columns(self) -> dict:
+        """Rows not yet written (all rows when there is no store)."""
+        return self._cols
+
+
+# ----------------------------------------------------------------------
+# Loader für die Auswertungsskripte (ersetzen die pd.read_csv-Aufrufe)
+# ----------------------------------------------------------------------
+def load_evaluations(store: ResultsStore, run_id=None, columns=None, filters=None):
+    flt = list(filters or [])
+    if run_id is not None:
+        flt.append(("run_id", "==", run_id))
+    return store.read("evaluations", columns=columns, filters=flt or None)
+
+
+def load_archive(store: ResultsStore, run_id, generation=None, columns=None):
+    """ε-archive snapshot of `run_id` (last generation if generation is None)."""
+    flt = [("run_id", "==", run_id)]
+    if generation is None:
+        gens = store.read_arrow("archive", columns=["generation"], filters=flt).column("generation")
+        generation = max(gens.to_pylist()) if len(gens) else -1
+    return store.read("archive", columns=columns, filters=flt + [("generation", "==", generation)])
+
+
+def load_pareto(store: ResultsStore, run_id=None, columns=None):
+    """Final ε-archive of the run if it was streamed, otherwise the is_pareto rows."""
+    if run_id is not None and store.has("archive") and run_id in store.run_ids("archive"):
+        return load_archive(store, run_id, columns=columns)
+    return load_evaluations(store, run_id, columns, filters=[("is_pareto", "==", True)])
+
+
+def load_history(store: ResultsStore, run_id=None, columns=None):
+    flt = [("run_id", "==", run_id)] if run_id is not None else None
+    return store.read("history", columns=columns, filters=flt).sort_values("iteration")
+
+
+def latest_run(store: ResultsStore, table: str = "evaluations"):
+    """run_id with data in `table` and the latest started_at in the runs table."""
+    ids = store.run_ids(table)
+    if not ids or not store.has("runs"):
+        return ids[-1] if ids else None
+    runs = store.read_arrow("runs", columns=["run_id", "started_at"],
+                            filters=[("run_id", "in", ids)]).to_pylist()
+    if not runs:
+        return ids[-1]
+    return max(runs, key=lambda r: r["started_at"])["run_id"]
+
+
+# ----------------------------------------------------------------------
+# Altbestand: vorhandene CSVs einmalig übernehmen
+# ----------------------------------------------------------------------
+def import_legacy_csv(store: ResultsStore, all_points_csv=None, pareto_csv=None, history_csv=None,
+                      run_id: str = "legacy"):
+    """Convert the old CSV exports into the store (one run `run_id`)."""
+    import csv
+
+    def read_rows(path):
+        with open(path, newline="") as f:
+            return list(csv.DictReader(f))
+
+    if all_points_csv and os.path.exists(all_points_csv):
+        rows = read_rows(all_points_csv)
+        pareto = set()
+        if pareto_csv and os.path.exists(pareto_csv):
+            pareto = {tuple(float(r[c]) for c in DECISION_COLUMNS) for r in read_rows(pareto_csv)}
+        cols = {c: [float(r[c]) for r in rows] for c in DECISION_COLUMNS}
+        cols["CH4_out"] = [float(r["CH4_out"]) for r in rows]
+        cols["Vcat_m3"] = [float(r["Vcat_m3"]) for r in rows]
+        cols["T_max_K"] = [float(r["T_max_K"]) for r in rows]
+        cols["eval_id"] = list(range(len(rows)))
+        cols["failed"] = [c >= 1e3 for c in cols["CH4_out"]]
+        cols["failure_reason"] = ["penalty" if f else None for f in cols["failed"]]
+        cols["is_pareto"] = [tuple(cols[c][i] for c in DECISION_COLUMNS) in pareto for i in range(len(rows))]
+        store.write("evaluations", cols, run_id)
+        store.write_run(run_id, optimizer="nsga2", note=f"imported from {os.path.basename(all_points_csv)}")
+
+    if history_csv and os.path.exists(history_csv):
+        rows = read_rows(history_csv)
+        cols = {
+            "iteration": [int(r["iteration"]) for r in rows],
+            "CH4": [float(r["CH4"]) for r in rows],
+            "A_over_V_1_per_cm": [float(r["cat_area_per_vol_1_per_cm"]) for r in rows],
+            "diameter_cm": [float(r["diameter_cm"]) for r in rows],
+            "porosity": [float(r["porosity"]) for r in rows],
+        }
+        store.write("history", cols, run_id + "-de")
+        store.write_run(run_id + "-de", optimizer="differential_evolution",
+                        note=f"imported from {os.path.basename(history_csv)}")
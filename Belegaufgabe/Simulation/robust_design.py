@@ -0,0 +1,230 @@
+# robust_design.py
+"""
+Robuste Bewertung eines Designs unter Fertigungsstreuung (Quasi-Monte-Carlo).
+
+objective_CH4 / CatMultiObjectiveProblem bewerten nur den Nennpunkt. Porosität und
+Katalysator-A/V streuen in der Fertigung aber um ihre Nennwerte. RobustEvaluator bewertet
+stattdessen Mittelwert oder Quantil von CH4_out und T_max unter vorgegebenen Verteilungen:
+
+  - Verteilungen je Variable (additiv oder relativ zum Nennwert):
+        {"porosity": ("normal", 0.01), "A_over_V_1_per_cm": ("normal_rel", 0.05)}
+    Arten: normal, normal_rel, uniform, uniform_rel (Halbbreite); Werte werden auf
+    physikalische Grenzen geklemmt (Porosität in (0, 1), sonst > 0)
+  - gescrambelte Sobol-Folge (scipy.stats.qmc), EINMAL erzeugt und für alle Kandidaten
+    geteilt (common random numbers): Unterschiede zwischen Kandidaten kommen aus dem
+    Design, nicht aus dem Stichprobenrauschen
+  - adaptiv: n_min Proben, dann Verdopplung (2er-Potenzen -> balancierte Sobol-Präfixe),
+    bis der Standardfehler der angefragten Schätzer (stat, z.B. nur CH4 bei DE)
+    <= atol + rtol*|Schätzwert| ist oder n_max
+  - alle Proben aller noch offenen Kandidaten einer Runde gehen in EINEN evaluator.map()
+    (ProcessPoolExecutor, LocalCluster, SupervisedPool)
+  - Proben je Nennpunkt bleiben gespeichert: erneute Bewertung (Überlebende in NSGA-II)
+    setzt dort fort statt neu zu rechnen
+  - fehlgeschlagene Simulationen gehen NICHT in Mittelwert/Quantil ein, sondern werden
+    getrennt gezählt (Ausfallrate); liegt sie nach mindestens n_min Proben über
+    max_fail_rate, wird der Kandidat sofort mit den Strafwerten (1e3, 1e9) verworfen
+
+    robust = RobustEvaluator(model, {"porosity": ("normal", 0.01)}, evaluator=pool)
+    differential_evolution(robust, bounds, workers=robust.map_population, updating="deferred")
+    CatMultiObjectiveProblem(model, xl, xu, ..., robust=robust)
+"""
+import functools
+import math
+
+import numpy as np
+from scipy.special import ndtri
+from scipy.stats import qmc
+
+from kaskade_worker import ch4_tmax_point
+from results_store import DECISION_COLUMNS
+
+DISTRIBUTIONS = ("normal", "normal_rel", "uniform", "uniform_rel")
+# Schätzer je Ausgabe: "mean" oder ("quantile", q)
+DEFAULT_STAT = {"CH4": "mean", "T_max": ("quantile", 0.95)}
+OUTPUTS = ("CH4", "T_max")
+
+
+def estimate(y, stat) -> tuple:
+    """(estimate, standard error) of mean or quantile of the samples y."""
+    n = len(y)
+    if stat == "mean":
+        se = float(np.std(y, ddof=1) / math.sqrt(n)) if n > 1 else math.inf
+        return float(np.mean(y)), se
+    kind, q = stat
+    if kind != "quantile":
+        raise ValueError(f"unknown statistic {stat!r}")
+    ys = np.sort(y)
+    est = float(np.quantile(ys, q))
+    if n < 2:
+        return est, math.inf
+    # Ordnungsstatistiken bei q +- 1 Standardabweichung der Binomialverteilung
+    half = math.sqrt(n * q * (1.0 - q))
+    lo = int(np.clip(math.floor(n * q - half), 0, n - 1))
+    hi = int(np.clip(math.ceil(n * q + half), 0, n - 1))
+    return est, float(ys[hi] - ys[lo]) / 2.0
+
+
+class RobustEvaluator:
+    """
+    Mean / quantile of (CH4_out, T_max) under parameter scatter, estimated with
+    shared scrambled Sobol samples and adaptive sample sizes.
+
+    Parameters
+    ----------
+    uncertainty:
+        {variable: (distribution, width)}; variables are DECISION_COLUMNS plus operating_vars.
+    stat:
+        {"CH4": ..., "T_max": ...}, each "mean" or ("quantile", q). Only the outputs
+        given here must converge; the others are reported with DEFAULT_STAT.
+    evaluator:
+        Pool with map(); workers preloaded with model.config (kaskade_worker.preload_model).
+        None -> serial on `model`.
+    n_min, n_max:
+        Samples per candidate (rounded up to powers of two).
+    rtol, atol:
+        Stop when the standard error of every requested estimate is <= atol + rtol * |estimate|.
+    max_fail_rate:
+        Candidates whose share of failed samples exceeds this are rejected with `penalty`.
+    """
+
+    def __init__(self, model, uncertainty: dict, stat: dict | None = None, evaluator=None,
+                 operating_vars=(), n_min: int = 16, n_max: int = 256, rtol: float = 0.01,
+                 atol=(0.0, 0.0), seed: int = 0, penalty=(1e3, 1e9), max_fail_rate: float = 0.25):
+        self.model = model
+        self.operating_vars = tuple(operating_vars)
+        names = list(DECISION_COLUMNS) + list(self.operating_vars)
+        self.uncertainty = dict(uncertainty)
+        for name, (dist, _) in self.uncertainty.items():
+            if name not in names:
+                raise ValueError(f"unknown variable {name!r} (allowed: {names})")
+            if dist not in DISTRIBUTIONS:
+                raise ValueError(f"unknown distribution {dist!r} (allowed: {DISTRIBUTIONS})")
+        self._cols = [names.index(n) for n in self.uncertainty]
+        self.stat = {**DEFAULT_STAT, **(stat or {})}
+        self._tracked = [k for k, name in enumerate(OUTPUTS) if name in (stat or DEFAULT_STAT)]
+        self.evaluator = evaluator
+        self.n_min = 2 ** math.ceil(math.log2(max(2, n_min)))
+        self.n_max = 2 ** math.ceil(math.log2(max(self.n_min, n_max)))
+        self.rtol = float(rtol)
+        self.atol = np.broadcast_to(np.asarray(atol, float), (2,))
+        self.penalty = tuple(float(p) for p in penalty)
+        self.max_fail_rate = float(max_fail_rate)
+
+        # gemeinsame Zufallszahlen: eine gescrambelte Sobol-Folge für alle Kandidaten
+        u = qmc.Sobol(len(self._cols), scramble=True, seed=seed).random_base2(int(math.log2(self.n_max)))
+        self._u = np.clip(u, 1e-12, 1.0 - 1e-12)
+        self._samples = {}      # Nennpunkt (tuple) -> (n, 2) Ergebnisse (CH4, T_max), NaN = fehlgeschlagen
+        self.n_sims = 0
+        self.n_failed = 0
+
+    # --- Stichproben -------------------------------------------------
+    def perturb(self, x, start: int, stop: int) -> np.ndarray:
+        """Sample points start..stop-1 of the shared sequence around the nominal x."""
+        x = np.asarray(x, dtype=float)
+        P = np.repeat(x[None, :], stop - start, axis=0)
+        u = self._u[start:stop]
+        for j, (col, (dist, width)) in enumerate(zip(self._cols, self.uncertainty.values())):
+            z = ndtri(u[:, j]) if dist.startswith("normal") else 2.0 * u[:, j] - 1.0
+            if dist.endswith("_rel"):
+                P[:, col] = x[col] * (1.0 + width * z)
+            else:
+                P[:, col] = x[col] + width * z
+        # physikalische Grenzen
+        P[:, 2] = np.clip(P[:, 2], 1e-3, 0.999)
+        P[:, [0, 1]] = np.maximum(P[:, [0, 1]], 1e-12)
+        return P
+
+    def _run(self, P) -> np.ndarray:
+        if self.evaluator is not None:
+            fn = functools.partial(ch4_tmax_point, operating_vars=self.operating_vars)
+            # Pools mit skalarem Strafwert (SupervisedPool) -> auf beide Spalten verteilen
+            Y = np.array([np.broadcast_to(np.asarray(y, dtype=float), (2,))
+                          for y in self.evaluator.map(fn, list(P))]).reshape(-1, 2)
+        else:
+            Y = np.empty((len(P), 2))
+            for i, p in enumerate(P):
+                av, d_cm, eps, overrides = self.model.split_x(p, self.operating_vars)
+                try:
+                    res = self.model.simulate(av, d_cm, eps, return_profile=False, **overrides)
+                    Y[i] = res["CH4"], res["T_max"]
+                except Exception:
+                    Y[i] = np.nan
+        self.n_sims += len(P)
+        bad = ~np.isfinite(Y).all(axis=1) | (Y[:, 0] >= self.penalty[0])
+        Y[bad] = np.nan
+        self.n_failed += int(bad.sum())
+        return Y
+
+    # --- Schätzer ----------------------------------------------------
+    def summary(self, x) -> dict:
+        """Current estimates, standard errors and sample count for the nominal x."""
+        Y = self._samples.get(tuple(float(v) for v in x))
+        if Y is None or not len(Y):
+            return {"n": 0}
+        ok = np.isfinite(Y[:, 0])
+        out = {"n": len(Y), "n_failed": int((~ok).sum()), "fail_rate": float(1.0 - ok.mean()),
+               "rejected": self._rejected(Y)}
+        for k, name in enumerate(OUTPUTS):
+            if out["rejected"] or not ok.any():
+                out[name], out[name + "_se"] = self.penalty[k], math.inf
+            else:
+                out[name], out[name + "_se"] = estimate(Y[ok, k], self.stat[name])
+        return out
+
+    def _rejected(self, Y) -> bool:
+        # zu viele Ausfälle (frühestens nach n_min Proben) oder keine zwei gültigen Proben
+        ok = np.isfinite(Y[:, 0])
+        if len(Y) >= self.n_min and 1.0 - ok.mean() > self.max_fail_rate:
+            return True
+        return len(Y) >= self.n_max and ok.sum() < 2
+
+    def _converged(self, key) -> bool:
+        Y = self._samples.get(key)
+        if Y is None or len(Y) < self.n_min:
+            return False
+        if len(Y) >= self.n_max or self._rejected(Y):
+            return True
+        ok = np.isfinite(Y[:, 0])
+        if ok.sum() < 2:
+            return False
+        for k in self._tracked:
+            est, se = estimate(Y[ok, k], self.stat[OUTPUTS[k]])
+            if se > self.atol[k] + self.rtol * abs(est):
+                return False
+        return True
+
+    def evaluate(self, X) -> np.ndarray:
+        """Robust (CH4, T_max) for every row of X, shape (n, 2)."""
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        keys = [tuple(float(v) for v in x) for x in X]
+        active = [k for k in dict.fromkeys(keys) if not self._converged(k)]
+        while active:
+            batch, owners = [], []
+            for k in active:
+                n_now = len(self._samples.get(k, ()))
+                n_new = self.n_min if n_now == 0 else min(n_now, self.n_max - n_now)
+                batch.append(self.perturb(k, n_now, n_now + n_new))
+                owners.append((k, n_new))
+            Y = self._run(np.vstack(batch))         # eine Pool-Übergabe je Runde
+            pos = 0
+            for k, n_new in owners:
+                prev = self._samples.get(k)
+                new = Y[pos:pos + n_new]
+                self._samples[k] = new if prev is None else np.vstack([prev, new])
+                pos += n_new
+            active = [k for k in active if not self._converged(k)]
+
+        out = np.empty((len(keys), 2))
+        for i, k in enumerate(keys):
+            s = self.summary(k)
+            out[i] = s["CH4"], s["T_max"]
+        return out
+
+    # --- Optimierer-Anbindung ----------------------------------------
+    def __call__(self, x) -> float:
+        """Robust CH4 for one design (DE objective)."""
+        return float(self.evaluate([x])[0, 0])
+
+    def map_population(self, func, iterable) -> list:
+        """DE workers= hook: evaluates the whole population in batched rounds (func is ignored)."""
+        return [float(v) for v in self.evaluate(list(iterable))[:, 0]]
@@ -0,0 +1,321 @@
+# sensitivity.py
+"""
+Globale Sensitivitätsanalyse (Sobol-Indizes) für die CSTR-Kaskade.
+
+Welche der Größen A/V, d, Porosität, Eintrittstemperatur, Massenstrom treiben CH4_out
+und T_max wirklich? Statt alle blind mitzuoptimieren, hier Sobol-Indizes:
+
+  - Saltelli-Design: Matrizen A, B (N x d) aus einer gescrambelten Sobol-Folge der
+    Dimension 2d, dazu AB_i (A mit Spalte i aus B) -> N (d + 2) Auswertungen
+  - Schätzer: erste Ordnung nach Saltelli (2010), Total-Index nach Jansen
+  - Bootstrap-Konfidenzintervalle (Zeilen von A/B/AB gemeinsam ziehen)
+  - Konvergenz: N verdoppeln (Sobol-Präfixe bleiben balanciert, nur neue Zeilen
+    rechnen), bis sich die Indizes zwischen zwei Stufen um weniger als tol ändern
+    und die Intervalle schmal genug sind
+  - Auswertung in Blöcken über evaluator.map() (Worker mit kaskade_worker.preload_model),
+    Ergebnisse landen in einem ToleranceCache (gleiche Punkte werden nie doppelt gerechnet)
+  - pro Punkt werden ALLE skalaren Ausgaben gespeichert (CH4, T_out, T_max, P_out):
+    Indizes für eine andere Zielgröße (oder eine Funktion davon) kosten keine Simulation,
+    das Design inkl. Ergebnissen lässt sich als .npz sichern und wieder laden
+
+    sa = SobolAnalysis({"A_over_V_1_per_cm": (1000, 2000), "porosity": (0.2, 0.5), ...},
+                       nominal={"diameter_cm": 2.0}, evaluator=pool)
+    res = sa.run(metrics=("CH4", "T_max"))
+    sa.indices(lambda y: y["T_max"] - y["T_out"])      # neue Zielgröße, gleiche Daten
+
+    python sensitivity.py --n-max 2048 --workers 8
+    python sensitivity.py --design ../Ergebnisse/sobol_design.npz --metric T_out
+"""
+import argparse
+import csv
+import functools
+import math
+import os
+
+import numpy as np
+from scipy.stats import qmc
+
+from Kaskade_Klasse import OPERATING_VARS
+from kaskade_cache import ToleranceCache
+from kaskade_worker import SCALAR_OUTPUTS, outputs_point
+from results_store import DECISION_COLUMNS
+
+DEFAULT_FACTORS = {
+    "A_over_V_1_per_cm": (1000.0, 2000.0),
+    "diameter_cm": (1.0, 3.0),
+    "porosity": (0.2, 0.5),
+    "tc_C": (700.0, 900.0),
+    "mass_flow_rate_kg_s": (0.5e-6, 2e-6),
+}
+
+
+def sobol_estimates(fA, fB, fAB) -> tuple:
+    """First-order (Saltelli 2010) and total (Jansen) indices; fAB has shape (d, n)."""
+    V = np.var(np.concatenate([fA, fB]), ddof=1)
+    if not V > 0.0:
+        return np.zeros(len(fAB)), np.zeros(len(fAB))
+    S1 = np.mean(fB * (fAB - fA), axis=1) / V
+    ST = 0.5 * np.mean((fA - fAB) ** 2, axis=1) / V
+    return S1, ST
+
+
+class SobolAnalysis:
+    """
+    Saltelli sample design over `factors` ({name: (lo, hi)}) with cached model outputs.
+
+    Factor names are DECISION_COLUMNS and Kaskade_Klasse.OPERATING_VARS; decision
+    variables that are not factors need a value in `nominal`.
+    """
+
+    def __init__(self, factors: dict, nominal: dict | None = None, model=None, evaluator=None,
+                 n_max: int = 4096, seed: int = 0, chunk: int = 256, cache: ToleranceCache | None = None):
+        nominal = dict(nominal or {})
+        unknown = set(factors) | set(nominal)
+        unknown -= set(DECISION_COLUMNS) | set(OPERATING_VARS)
+        if unknown:
+            raise ValueError(f"unknown variables {sorted(unknown)}")
+        missing = [c for c in DECISION_COLUMNS if c not in factors and c not in nominal]
+        if missing:
+            raise ValueError(f"no range and no nominal value for {missing}")
+
+        self.factors = list(factors)
+        self.lo = np.array([factors[f][0] for f in self.factors], dtype=float)
+        self.hi = np.array([factors[f][1] for f in self.factors], dtype=float)
+        self.nominal = nominal
+        self.operating_vars = tuple(v for v in OPERATING_VARS if v in factors or v in nominal)
+        layout = list(DECISION_COLUMNS) + list(self.operating_vars)
+        self._base = np.array([nominal.get(c, np.nan) for c in layout], dtype=float)
+        self._cols = [layout.index(f) for f in self.factors]
+
+        self.model = model
+        self.evaluator = evaluator
+        self.chunk = int(chunk)
+        self.seed = int(seed)
+        d = len(self.factors)
+        self.n_max = 2 ** math.ceil(math.log2(max(2, n_max)))
+        U = qmc.Sobol(2 * d, scramble=True, seed=seed).random_base2(int(math.log2(self.n_max)))
+        self.A = self.lo + U[:, :d] * (self.hi - self.lo)
+        self.B = self.lo + U[:, d:] * (self.hi - self.lo)
+
+        n_out = len(SCALAR_OUTPUTS)
+        self.Y_A = np.full((self.n_max, n_out), np.nan)
+        self.Y_B = np.full((self.n_max, n_out), np.nan)
+        self.Y_AB = np.full((d, self.n_max, n_out), np.nan)
+        self.n = 0              # ausgewertete Zeilen (Präfix von A/B)
+
+        if cache is None:
+            scale = np.maximum(np.abs(self._base), 1.0)
+            scale[self._cols] = self.hi - self.lo
+            cache = ToleranceCache(atol=0.0, rtol=1e-9, scale=scale)
+        self.cache = cache
+        self.n_sims = 0
+        self.history = []
+
+    # --- Auswertung --------------------------------------------------
+    def _x(self, M) -> np.ndarray:
+        X = np.repeat(self._base[None, :], len(M), axis=0)
+        X[:, self._cols] = M
+        return X
+
+    def _simulate(self, X) -> np.ndarray:
+        out = np.empty((len(X), len(SCALAR_OUTPUTS)))
+        fn = functools.partial(outputs_point, operating_vars=self.operating_vars)
+        for s in range(0, len(X), self.chunk):
+            block = X[s:s + self.chunk]
+            if self.evaluator is not None:
+                out[s:s + len(block)] = list(self.evaluator.map(fn, list(block)))
+            else:
+                for i, x in enumerate(block):
+                    av, d_cm, eps, overrides = self.model.split_x(x, self.operating_vars)
+                    try:
+                        res = self.model.simulate(av, d_cm, eps, return_profile=False, **overrides)
+                        out[s + i] = [res[k] for k in SCALAR_OUTPUTS]
+                    except Exception:
+                        out[s + i] = np.nan
+            print(f"  sobol: {min(s + self.chunk, len(X))}/{len(X)} simulations")
+        self.n_sims += len(X)
+        return out
+
+    def _outputs(self, X) -> np.ndarray:
+        """Outputs for all rows of X: cache first, the rest in chunks through the evaluator."""
+        Y = np.empty((len(X), len(SCALAR_OUTPUTS)))
+        todo = []
+        for i, x in enumerate(X):
+            v = self.cache.lookup(x)
+            if v is None:
+                todo.append(i)
+            else:
+                Y[i] = v
+        if todo:
+            Y_new = self._simulate(X[todo])
+            for i, y in zip(todo, Y_new):
+                self.cache.insert(X[i], tuple(y))
+            Y[todo] = Y_new
+        return Y
+
+    def extend(self, n: int):
+        """Evaluate rows self.n .. n-1 of A, B and all AB_i."""
+        n = min(int(n), self.n_max)
+        if n <= self.n:
+            return
+        rows = slice(self.n, n)
+        m = n - self.n
+        blocks = [self.A[rows], self.B[rows]]
+        for i in range(len(self.factors)):
+            AB = self.A[rows].copy()
+            AB[:, i] = self.B[rows, i]
+            blocks.append(AB)
+        Y = self._outputs(self._x(np.vstack(blocks)))
+        self.Y_A[rows] = Y[:m]
+        self.Y_B[rows] = Y[m:2 * m]
+        for i in range(len(self.factors)):
+            self.Y_AB[i, rows] = Y[(2 + i) * m:(3 + i) * m]
+        self.n = n
+
+    # --- Indizes -----------------------------------------------------
+    @staticmethod
+    def _metric(metric, Y) -> np.ndarray:
+        if callable(metric):
+            return np.asarray(metric({k: Y[..., j] for j, k in enumerate(SCALAR_OUTPUTS)}), dtype=float)
+        return Y[..., SCALAR_OUTPUTS.index(metric)]
+
+    def indices(self, metric="CH4", n: int | None = None, n_boot: int = 500, conf: float = 0.95,
+                seed: int = 0) -> dict:
+        """
+        S1 / ST with bootstrap percentile intervals from the first n evaluated rows.
+        metric: name in SCALAR_OUTPUTS or a function of {name: array}.
+        ValueError if fewer than two rows have finite values for all of A, B and AB.
+        """
+        n = self.n if n is None else min(int(n), self.n)
+        fA = self._metric(metric, self.Y_A[:n])
+        fB = self._metric(metric, self.Y_B[:n])
+        fAB = self._metric(metric, self.Y_AB[:, :n])
+        ok = np.isfinite(fA) & np.isfinite(fB) & np.isfinite(fAB).all(axis=0)
+        fA, fB, fAB = fA[ok], fB[ok], fAB[:, ok]
+        m = len(fA)
+        if m < 2:
+            raise ValueError(f"Sobol indices of {metric!r}: only {m} of {n} rows valid "
+                             f"(all others failed or are not finite)")
+
+        S1, ST = sobol_estimates(fA, fB, fAB)
+        rng = np.random.default_rng(seed)
+        bS1 = np.empty((n_boot, len(self.factors)))
+        bST = np.empty_like(bS1)
+        for b in range(n_boot):
+            idx = rng.integers(m, size=m)
+            bS1[b], bST[b] = sobol_estimates(fA[idx], fB[idx], fAB[:, idx])
+        a = (1.0 - conf) / 2.0
+        return {
+            "factor": list(self.factors), "n": m, "n_failed": int(n - m),
+            "S1": S1, "S1_lo": np.quantile(bS1, a, axis=0), "S1_hi": np.quantile(bS1, 1 - a, axis=0),
+            "ST": ST, "ST_lo": np.quantile(bST, a, axis=0), "ST_hi": np.quantile(bST, 1 - a, axis=0),
+        }
+
+    def run(self, metrics=("CH4", "T_max"), n_start: int = 64, n_max: int | None = None,
+            tol: float = 0.02, ci_tol: float = 0.1, n_boot: int = 500) -> dict:
+        """
+        Double N from n_start until, for all metrics, the indices moved by <= tol since
+        the previous stage and all ST intervals are narrower than ci_tol (or n_max).
+        """
+        n_max = min(n_max or self.n_max, self.n_max)
+        n = min(2 ** math.ceil(math.log2(max(2, n_start))), n_max)
+        prev = None
+        while True:
+            self.extend(n)
+            res = {m: self.indices(m, n, n_boot) for m in metrics}
+            self.history.append((n, res))
+            stable = prev is not None and all(
+                np.max(np.abs(res[m]["S1"] - prev[m]["S1"])) <= tol
+                and np.max(np.abs(res[m]["ST"] - prev[m]["ST"])) <= tol
+                and np.max(res[m]["ST_hi"] - res[m]["ST_lo"]) <= ci_tol
+                for m in metrics)
+            print(f"  sobol: N = {n}, {self.n_sims} simulations, stable = {stable}")
+            if stable or n >= n_max:
+                return res
+            prev = res
+            n *= 2
+
+    # --- Speichern ---------------------------------------------------
+    def save(self, path: str):
+        np.savez_compressed(
+            path, factors=np.array(self.factors), lo=self.lo, hi=self.hi,
+            nominal_names=np.array(list(self.nominal), dtype=str),
+            nominal_values=np.array(list(self.nominal.values()), dtype=float),
+            seed=np.array(self.seed), n=np.array(self.n), A=self.A, B=self.B,
+            Y_A=self.Y_A, Y_B=self.Y_B, Y_AB=self.Y_AB, outputs=np.array(SCALAR_OUTPUTS))
+        return path
+
+    @classmethod
+    def load(cls, path: str, model=None, evaluator=None, **kwargs) -> "SobolAnalysis":
+        """Design plus evaluated outputs; further extend() calls simulate only new rows."""
+        with np.load(path, allow_pickle=False) as z:
+            factors = {str(f): (float(lo), float(hi)) for f, lo, hi in zip(z["factors"], z["lo"], z["hi"])}
+            nominal = {str(k): float(v) for k, v in zip(z["nominal_names"], z["nominal_values"])}
+            if tuple(str(o) for o in z["outputs"]) != SCALAR_OUTPUTS:
+                raise ValueError("design was saved with different outputs")
+            sa = cls(factors, nominal, model=model, evaluator=evaluator, n_max=len(z["A"]),
+                     seed=int(z["seed"]), **kwargs)
+            sa.A, sa.B = z["A"], z["B"]
+            sa.Y_A, sa.Y_B, sa.Y_AB = z["Y_A"].copy(), z["Y_B"].copy(), z["Y_AB"].copy()
+            sa.n = int(z["n"])
+        return sa
+
+
+def write_indices(path: str, results: dict):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["metric", "factor", "N", "S1", "S1_lo", "S1_hi", "ST", "ST_lo", "ST_hi"])
+        for metric, r in results.items():
+            for i, name in enumerate(r["factor"]):
+                w.writerow([metric, name, r["n"], r["S1"][i], r["S1_lo"][i], r["S1_hi"][i],
+                            r["ST"][i], r["ST_lo"][i], r["ST_hi"][i]])
+
+
+def print_indices(results: dict):
+    for metric, r in results.items():
+        print(f"\n{metric}  (N = {r['n']}, failed rows: {r['n_failed']})")
+        print(f"  {'factor':<22} {'S1':>7} {'95% CI':>17}   {'ST':>7} {'95% CI':>17}")
+        for i, name in enumerate(r["factor"]):
+            print(f"  {name:<22} {r['S1'][i]:7.3f} [{r['S1_lo'][i]:6.3f}, {r['S1_hi'][i]:6.3f}]   "
+                  f"{r['ST'][i]:7.3f} [{r['ST_lo'][i]:6.3f}, {r['ST_hi'][i]:6.3f}]")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sobol sensitivity indices of the CSTR cascade")
+    ap.add_argument("--n-start", type=int, default=64)
+    ap.add_argument("--n-max", type=int, default=2048)
+    ap.add_argument("--tol", type=float, default=0.02, help="max. change of the indices between stages")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--metric", action="append", help="output(s) to analyse (default CH4, T_max)")
+    ap.add_argument("--design", default="../Ergebnisse/sobol_design.npz",
+                    help="design file: loaded if it exists, written after the run")
+    ap.add_argument("--out", default="../Ergebnisse/sobol_indices.csv")
+    args = ap.parse_args(argv)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    metrics = tuple(args.metric or ("CH4", "T_max"))
+
+    from concurrent.futures import ProcessPoolExecutor
+    from Kaskade_Klasse import CSTRCascadeModel, cm
+    from kaskade_worker import preload_model
+
+    model = CSTRCascadeModel(
+        yaml_file="methane_pox_on_pt.yaml", tc_C=800.0, p_Pa=101325.0, length_m=0.3 * cm,
+        mass_flow_rate_kg_s=1e-6, n_cstr=200, gas_comp="CH4:1, O2:0.6, AR:0.1", energy_enabled=True,
+    )
+    with ProcessPoolExecutor(args.workers, initializer=preload_model, initargs=(model.config,)) as pool:
+        if os.path.exists(args.design):
+            sa = SobolAnalysis.load(args.design, model=model, evaluator=pool)
+            print(f"design loaded: {args.design} ({sa.n} rows evaluated)")
+        else:
+            sa = SobolAnalysis(DEFAULT_FACTORS, model=model, evaluator=pool, n_max=args.n_max)
+        res = sa.run(metrics, n_start=args.n_start, n_max=args.n_max, tol=args.tol)
+
+    os.makedirs(os.path.dirname(args.design) or ".", exist_ok=True)
+    sa.save(args.design)
+    write_indices(args.out, res)
+    print_indices(res)
+    return res
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# warm_start.py
+"""
+Warmstart für NSGA-II aus den Auswertungen früherer Läufe.
+
+Jeder NSGA-II-Lauf begann mit einer Zufallspopulation, obwohl frühere Läufe (Ergebnis-
+Speicher, all_evaluated_points.csv / pareto_CH4_vs_Vcat.csv) die Front schon kennen:
+
+  - Cache vorladen: Auswertungen aus Läufen mit GLEICHEM model_hash (runs-Tabelle) kommen
+    als (CH4, T_max) in problem.cache -> bekannte Punkte werden nicht erneut simuliert.
+    T_max wird gespeichert, nicht die Nebenbedingung: ein geändertes Tmax_allowed wird
+    beim Auswerten neu angewandt.
+  - Startpopulation: pareto_front (mit dem AKTUELLEN Tmax_allowed) über alle Archive;
+    ist sie größer als der Seed-Anteil, eine möglichst gleichmäßig verteilte Teilmenge
+    (Farthest-Point-Sampling im normierten Zielraum, Extrempunkte zuerst). Der Rest der Population bleibt zufällig (LHS) für die Diversität.
+  - Seeds dürfen auch aus Läufen mit anderem Modell oder alten CSVs stammen (es sind nur
+    Startpunkte); in den Cache kommen nur Punkte mit passendem Hash.
+
+    X0, info = warm_start(problem, store, pop_size=50, legacy_csv=["../Auswertung/all_evaluated_points.csv"])
+    NSGA2(pop_size=50, sampling=X0, ...)
+"""
+import csv
+import os
+
+import numpy as np
+
+from pareto import pareto_front, tmax_constraint
+from results_store import DECISION_COLUMNS, OPERATING_COLUMNS
+
+
+def matching_runs(store, model_hash: str) -> list:
+    """run_ids whose runs-table entry has this model_hash."""
+    if not store.has("runs"):
+        return []
+    tbl = store.read_arrow("runs", columns=["run_id"], filters=[("model_hash", "==", model_hash)])
+    return sorted(set(tbl.column("run_id").to_pylist()))
+
+
+def archived_points(store, run_ids=None, operating_vars=()) -> dict:
+    """
+    Successful evaluations of `run_ids` (None: all runs) as arrays X, CH4, Vcat, T_max.
+    Rows that varied operating variables outside `operating_vars` are skipped.
+    """
+    cols = list(DECISION_COLUMNS) + list(operating_vars)
+    other = [c for c in OPERATING_COLUMNS if c not in operating_vars]
+    empty = {"X": np.empty((0, len(cols))), "CH4": np.empty(0), "Vcat": np.empty(0), "T_max": np.empty(0)}
+    if not store.has("evaluations") or run_ids == []:
+        return empty
+    flt = [("run_id", "in", list(run_ids))] if run_ids is not None else None
+    tbl = store.read_arrow("evaluations", columns=cols + other + ["CH4_out", "Vcat_m3", "T_max_K", "failed"],
+                           filters=flt)
+    if tbl.num_rows == 0:
+        return empty
+
+    def col(name, fill=np.nan):
+        return tbl.column(name).fill_null(fill).to_numpy().astype(float)
+
+    X = np.column_stack([col(c) for c in cols])
+    ch4, vcat, tmax = col("CH4_out"), col("Vcat_m3"), col("T_max_K")
+    ok = ~tbl.column("failed").fill_null(False).to_numpy() & np.isfinite(X).all(axis=1)
+    ok &= np.isfinite(ch4) & (ch4 < 1e3) & np.isfinite(tmax)
+    for c in other:
+        ok &= np.isnan(col(c))
+    return {"X": X[ok], "CH4": ch4[ok], "Vcat": vcat[ok], "T_max": tmax[ok]}
+
+
+def legacy_points(paths) -> dict:
+    """Points from old CSV exports (columns like all_evaluated_points.csv; T_max may be missing)."""
+    X, ch4, vcat, tmax = [], [], [], []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, newline="") as f:
+            for r in csv.DictReader(f):
+                X.append([float(r[c]) for c in DECISION_COLUMNS])
+                ch4.append(float(r["CH4_out"]))
+                vcat.append(float(r["Vcat_m3"]))
+                tmax.append(float(r.get("T_max_K") or np.nan))
+    return {"X": np.array(X, dtype=float).reshape(-1, len(DECISION_COLUMNS)), "CH4": np.array(ch4),
+            "Vcat": np.array(vcat), "T_max": np.array(tmax)}
+
+
+def preload_cache(problem, points: dict) -> int:
+    """Insert (CH4, T_max) of all points into problem.cache; returns the number inserted."""
+    n = 0
+    for x, c, t in zip(points["X"], points["CH4"], points["T_max"]):
+        key = tuple(float(v) for v in x)
+        if key not in problem.cache:
+            problem.cache[key] = (float(c), float(t))
+            n += 1
+    return n
+
+
+def diverse_subset(F, k: int) -> np.ndarray:
+    """k row indices of F: extreme points first, then farthest-point sampling (normalized)."""
+    F = np.asarray(F, dtype=float)
+    if len(F) <= k:
+        return np.arange(len(F))
+    lo, hi = F.min(axis=0), F.max(axis=0)
+    Z = (F - lo) / np.where(hi > lo, hi - lo, 1.0)
+    chosen = list(dict.fromkeys(int(np.argmin(Z[:, j])) for j in range(Z.shape[1])))[:k]
+    d = np.min(np.linalg.norm(Z[:, None, :] - Z[chosen][None, :, :], axis=2), axis=1)
+    while len(chosen) < k:
+        j = int(np.argmax(d))
+        chosen.append(j)
+        d = np.minimum(d, np.linalg.norm(Z - Z[j], axis=1))
+    return np.array(chosen, dtype=int)
+
+
+def seed_population(points: dict, xl, xu, pop_size: int, Tmax_allowed=None, seed_fraction: float = 0.5,
+                    log_ch4: bool = True, rng=None):
+    """
+    Initial population (pop_size, n_var): up to seed_fraction * pop_size points of the
+    first constrained front of `points`, the rest Latin hypercube samples.
+    Returns (X0, n_seeds); the seeds are the first n_seeds rows.
+    """
+    rng = np.random.default_rng(rng)
+    xl, xu = np.asarray(xl, dtype=float), np.asarray(xu, dtype=float)
+    X = points["X"]
+    inside = np.all((X >= xl) & (X <= xu), axis=1) if len(X) else np.zeros(0, bool)
+    seeds = np.empty((0, len(xl)))
+    if inside.any():
+        X, idx = np.unique(X[inside], axis=0, return_index=True)
+        sel = np.flatnonzero(inside)[idx]
+        F = np.column_stack([points["CH4"][sel], points["Vcat"][sel]])
+        G = tmax_constraint(points["T_max"][sel], Tmax_allowed) if Tmax_allowed is not None else None
+        front = np.flatnonzero(pareto_front(F, G))
+        Ff = F[front].copy()
+        if log_ch4:
+            Ff[:, 0] = np.log10(np.maximum(Ff[:, 0], 1e-300))
+        k = min(len(front), int(round(seed_fraction * pop_size)))
+        seeds = X[front[diverse_subset(Ff, k)]]
+
+    n_rand = pop_size - len(seeds)
+    u = (np.argsort(rng.random((n_rand, len(xl))), axis=0) + rng.random((n_rand, len(xl)))) / max(n_rand, 1)
+    return np.vstack([seeds, xl + u * (xu - xl)]), len(seeds)
+
+
+def warm_start(problem, store, pop_size: int, legacy_csv=(), seed_fraction: float = 0.5, rng=None):
+    """
+    Preload problem.cache from runs with the same model hash and build the initial
+    population from all archives. Returns (X0, info).
+    """
+    ops = tuple(getattr(problem, "operating_vars", ()))
+    same = archived_points(store, matching_runs(store, problem.model.config_hash), ops)
+    n_cached = preload_cache(problem, same)
+
+    pools = [archived_points(store, None, ops)]
+    if not ops:
+        pools.append(legacy_points(legacy_csv))
+    allp = {k: np.concatenate([p[k] for p in pools]) for k in ("X", "CH4", "Vcat", "T_max")}
+    X0, n_seeds = seed_population(allp, problem.xl, problem.xu, pop_size, problem.Tmax_allowed,
+                                  seed_fraction, rng=rng)
+    return X0, {"n_cached": n_cached, "n_archived": len(allp["X"]), "n_seeds": n_seeds}
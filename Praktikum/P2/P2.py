@@ -1,11 +1,15 @@
-import csv 
 import numpy as np 
 import matplotlib.pyplot as plt 
 import cantera as ct 
 import os 
+import sys
+from pathlib import Path
 
 os.chdir(os.path.dirname(__file__))
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from flow_recorder import FlowRecorder
+
 # unit conversion factors 
 cm = 0.01 #m
 minute = 60 #s
@@ -21,6 +25,7 @@ porosity = 0.3
 # input file 
 yaml_file = "methane_pox_on_pt.yaml"
 output_filename = "surf_pfr2_output.csv"
+n_points = 201   # Ausgabegitter (axiale Positionen), unabhängig von der Schrittzahl des Integrators
 
 t = 273.15 + tc 
 
@@ -44,24 +49,15 @@ rsurf = ct.ReactorSurface(surf, r)
 # Simulation 
 sim = ct.ReactorNet([r])
 
-output_data = []
-n = 0
-while sim.distance < length:
-    dist = sim.distance* 1e3 #in mm 
-    sim.step()
-    n += 1 
-    output_data.append(
-        [dist, r.T - 273.15, r.phase.P/ct.one_atm] + list(r.phase.X) + list(rsurf.kinetics.coverages)
-    )
-
+rec = FlowRecorder(sim, r, rsurf)
+rec.run(length, grid=np.linspace(0.0, length, n_points))
 
-with open(output_filename, "w", newline="") as outfile:
-    writer = csv.writer(outfile)
-    writer.writerow(["Distance (mm)", "T (C)", "P (atm)"] + gas.species_names + surf.species_names)
-    writer.writerows(output_data)
+rec.to_csv(output_filename)
 print("Ergebnisse wurden in csv geschrieben")
 
-data = np.array(output_data)
+# Spalten: [z, T, P, X..., coverages...]; Abstand für den Plot in mm
+data = rec.data.copy()
+data[:, 0] *= 1e3
 plt.plot(data[:,0], data[:,7], label = "CO")
 plt.plot(data[:,0], data[:,3], label = r"$\mathrm{H_2}$")
 plt.plot(data[:,0], data[:,6], label = r"$\mathrm{CH_4}$")
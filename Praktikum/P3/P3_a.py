@@ -4,10 +4,15 @@ import matplotlib.pyplot as plt
 from scipy import optimize
 import cantera as ct
 import os
+import sys
+from pathlib import Path
 
 os.chdir(os.path.dirname(__file__))     # changing working directory to this file's directory, 
                                         # allows output to be placed in the same directory without the need for absolute paths
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from flow_recorder import FlowRecorder
+
 # unit conversion factors to SI
 cm = 0.01
 minute = 60.0
@@ -62,12 +67,12 @@ def objective(params):
     
     sim = ct.ReactorNet([r]) # Integrate along the length of reactor 
     
-    max_c = 0.0
-    while sim.distance < length:
-        sim.step()
-        max_c=max(max_c,rsurf.kinetics.coverages[9])
+    # nur der Austritt wird gebraucht -> direkt bis zum Ende integrieren;
+    # max. Bedeckung bei Bedarf: FlowRecorder(..., coverages=[9]).run(length, every=1).max()
+    rec = FlowRecorder(sim, r, rsurf, species=["CH4"], coverages=False)
+    rec.run(length)
 
-    ch4 = r.phase['CH4'].X[0]
+    ch4 = rec.column('CH4')[-1]
     return ch4  
     # return max_c
 
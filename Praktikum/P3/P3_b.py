@@ -4,10 +4,15 @@ import matplotlib.pyplot as plt
 from scipy import optimize
 import cantera as ct
 import os
+import sys
+from pathlib import Path
 
 os.chdir(os.path.dirname(__file__))     # changing working directory to this file's directory, 
                                         # allows output to be placed in the same directory without the need for absolute paths
 
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from flow_recorder import FlowRecorder
+
 # unit conversion factors to SI
 cm = 0.01
 minute = 60.0
@@ -62,10 +67,11 @@ def objective(params):
     
     sim = ct.ReactorNet([r]) # Integrate along the length of reactor 
     
-    max_c = 0.0
-    while sim.distance < length:
-        sim.step()
-        max_c=max(max_c,rsurf.kinetics.coverages[9])
+    # jeder Integratorschritt, aber nur eine Spalte (Bedeckung 9) im Puffer;
+    # Maximum danach vektorisiert
+    rec = FlowRecorder(sim, r, rsurf, species=False, coverages=[9])
+    rec.run(length, every=1)
+    max_c = max(0.0, rec.max(rec.columns[-1]))
 
     return max_c
     # return max_c
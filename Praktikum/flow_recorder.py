@@ -0,0 +1,172 @@
+# flow_recorder.py
+"""
+Aufzeichnung von FlowReactor-Läufen auf einem Ausgabegitter.
+
+In P2.py wird für jeden internen Integratorschritt eine Python-Liste
+[dist, T, P] + list(X) + list(coverages) angehängt, in P3 wird pro Schritt
+max(max_c, coverages[9]) gerechnet. Größe und Kosten hängen damit an der
+Schrittzahl des Integrators statt an dem, was man braucht. FlowRecorder:
+
+  - grid=...   : sim.advance() auf vorgegebene axiale Positionen [m], eine Zeile je Punkt
+  - every=k    : sim.step(), jede k-te Zeile speichern (letzter Zustand immer)
+  - Spaltenwahl: nur ausgewählte Gas-Spezies / Bedeckungen
+  - Zeilen landen in einem vorab allozierten NumPy-Puffer (Kapazität wird verdoppelt)
+  - Extrema (max/min je Spalte) vektorisiert über den Puffer; mit track=... werden
+    ausgewählte Spalten zusätzlich bei jedem Schritt mitgeführt, auch wenn die
+    Zeile nicht gespeichert wird
+  - CSV in einem Aufruf (np.savetxt)
+
+    rec = FlowRecorder(sim, r, rsurf)
+    rec.run(length, grid=np.linspace(0.0, length, 201))
+    rec.to_csv("surf_pfr2_output.csv")
+"""
+import numpy as np
+
+
+class FlowRecorder:
+    """
+    Records distance, T, P, gas mole fractions and surface coverages of a
+    FlowReactor network.
+
+    Parameters
+    ----------
+    sim, reactor, surface:
+        ReactorNet, FlowReactor and (optional) ReactorSurface.
+    species:
+        True (all), False (none) or a list of gas species names.
+    coverages:
+        True (all), False (none) or a list of surface species names / indices.
+    track:
+        Column names whose running max/min is updated at every integrator step
+        (every=... mode), e.g. ["cov:PT(S)"].
+    """
+
+    def __init__(self, sim, reactor, surface=None, species=True, coverages=True, track=(),
+                 capacity: int = 256):
+        self.sim = sim
+        self.reactor = reactor
+        self.surface = surface
+        gas = reactor.phase
+
+        self._sp_idx = self._select(species, gas.species_names, gas.species_index)
+        if surface is not None:
+            names = surface.kinetics.species_names
+            self._cov_idx = self._select(coverages, names, surface.kinetics.species_index)
+            cov_names = [names[i] for i in self._cov_idx]
+        else:
+            self._cov_idx = np.empty(0, dtype=int)
+            cov_names = []
+
+        self.columns = (["z_m", "T_K", "P_Pa"] + [gas.species_names[i] for i in self._sp_idx]
+                        + [f"cov:{n}" for n in cov_names])
+        self._n_sp = len(self._sp_idx)
+        self._buf = np.empty((int(capacity), len(self.columns)))
+        self.n = 0
+        self.n_steps = 0
+
+        self._track = np.array([self.columns.index(c) for c in track], dtype=int)
+        self._tmax = np.full(len(self._track), -np.inf)
+        self._tmin = np.full(len(self._track), np.inf)
+
+    @staticmethod
+    def _select(which, names, index_of):
+        if which is True:
+            return np.arange(len(names))
+        if which is False or which is None:
+            return np.empty(0, dtype=int)
+        return np.array([w if isinstance(w, (int, np.integer)) else index_of(w) for w in which], dtype=int)
+
+    # --- Aufzeichnen -------------------------------------------------
+    def _state(self, row):
+        r = self.reactor
+        row[0] = self.sim.distance
+        row[1] = r.T
+        row[2] = r.phase.P
+        if self._n_sp:
+            row[3:3 + self._n_sp] = r.phase.X[self._sp_idx]
+        if self._cov_idx.size:
+            row[3 + self._n_sp:] = self.surface.kinetics.coverages[self._cov_idx]
+        return row
+
+    def _append(self):
+        if self.n == len(self._buf):
+            grown = np.empty((2 * len(self._buf), self._buf.shape[1]))
+            grown[:self.n] = self._buf[:self.n]
+            self._buf = grown
+        self._state(self._buf[self.n])
+        self.n += 1
+
+    def run(self, length: float, grid=None, every: int | None = None):
+        """
+        Integrate to `length` [m]. grid: axial positions to record (sorted; points
+        beyond length are ignored). every: record every k-th integrator step.
+        Without either, only the outlet is recorded.
+        """
+        if grid is not None:
+            for z in np.asarray(grid, dtype=float):
+                if z > length:
+                    break
+                if z > self.sim.distance:
+                    self.sim.advance(z)
+                self._append()
+            if self.sim.distance < length:
+                self.sim.advance(length)
+                self._append()
+            return self
+
+        if every is None:
+            self.sim.advance(length)
+            self._append()
+            return self
+
+        k = max(1, int(every))
+        scratch = np.empty(len(self.columns))
+        tracked = self._track.size > 0
+        while self.sim.distance < length:
+            self.sim.step()
+            self.n_steps += 1
+            if self.n_steps % k == 0:
+                self._append()
+                last = self._buf[self.n - 1]
+            elif tracked:
+                last = self._state(scratch)
+            else:
+                continue
+            if tracked:
+                np.maximum(self._tmax, last[self._track], out=self._tmax)
+                np.minimum(self._tmin, last[self._track], out=self._tmin)
+        if self.n_steps % k != 0:
+            self._append()      # Austrittszustand immer mitnehmen
+        return self
+
+    # --- Auswertung --------------------------------------------------
+    @property
+    def data(self) -> np.ndarray:
+        """Recorded rows (view, shape (n, n_columns))."""
+        return self._buf[:self.n]
+
+    def column(self, name: str) -> np.ndarray:
+        return self.data[:, self.columns.index(name)]
+
+    def max(self, name: str | None = None):
+        """Column maxima over the recorded rows (and tracked steps)."""
+        m = self.data.max(axis=0) if self.n else np.full(len(self.columns), -np.inf)
+        if self._track.size:
+            m[self._track] = np.maximum(m[self._track], self._tmax)
+        return m if name is None else float(m[self.columns.index(name)])
+
+    def min(self, name: str | None = None):
+        m = self.data.min(axis=0) if self.n else np.full(len(self.columns), np.inf)
+        if self._track.size:
+            m[self._track] = np.minimum(m[self._track], self._tmin)
+        return m if name is None else float(m[self.columns.index(name)])
+
+    def to_csv(self, path: str, header=None):
+        """Bulk CSV write: distance in mm, T in °C, P in atm (like the old P2 output)."""
+        out = self.data.copy()
+        out[:, 0] *= 1e3
+        out[:, 1] -= 273.15
+        out[:, 2] /= 101325.0
+        if header is None:
+            header = ["Distance (mm)", "T (C)", "P (atm)"] + [c.removeprefix("cov:") for c in self.columns[3:]]
+        np.savetxt(path, out, delimiter=",", header=",".join(header), comments="")
@@ -0,0 +1,231 @@
+# Benchmark.py
+"""
+Benchmark der Surrogatmodelle aus Analyse.py (Solid_Holdup.csv).
+
+Analyse.py trainiert sechs Regressoren seriell auf einem einzigen Train/Test-Split
+mit Standard-Hyperparametern. Hier:
+
+  - k-fach Kreuzvalidierung (KFold, gemischt, fester Seed)
+  - je Modell Grid- oder Random-Search über einen kleinen Parameterraum
+    (ParameterGrid, wenn das Gitter klein genug ist, sonst ParameterSampler)
+  - alle (Modell, Parameter, Fold)-Fits parallel über Prozesse (joblib, n_jobs)
+  - RMSE/R² je Fold-Fit sind mit joblib.Memory gecacht -> erneuter Lauf / erweitertes
+    Gitter rechnet nur neue Kombinationen
+  - Zeiten (Fit, Vorhersage-Latenz) NICHT gecacht und NICHT parallel gemessen: danach
+    seriell auf den ersten time_folds Folds (sonst Cache-Zeiten aus einem alten Lauf
+    bzw. Fits, die sich die Kerne teilen)
+  - Skalierung wie data_scaling() (min/max auf [0, 1]), aber pro Fold nur auf den
+    Trainingsdaten gefittet (MinMaxScaler in der Pipeline)
+  - Kennzahlen: RMSE, R², Fit-Zeit, Vorhersage-Latenz pro 1000 Samples
+
+Ergebnis: welches Surrogat genau genug UND schnell genug für die Optimierer-Schleife ist.
+
+    python Benchmark.py --folds 5 --n-iter 20 --n-jobs -1
+    python Benchmark.py --export surrogates     # beste Modelle zusätzlich als .npz (surrogate_npz)
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_squared_error, r2_score
+from sklearn.model_selection import KFold, ParameterGrid, ParameterSampler
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MinMaxScaler
+from sklearn.svm import SVR
+from sklearn.tree import DecisionTreeRegressor
+
+# kein chdir beim Import (joblib/loky-Worker importieren das Modul neu), siehe main()
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+FEATURE_COLS = ["Us", "Ul", "Ut", "D", "x", "x/L", "r/R"]
+TARGET_COL = "Solids Holdup"
+
+MODELS = {
+    "Linear Regression": LinearRegression,
+    "Ridge Regression": Ridge,
+    "Decision Tree": DecisionTreeRegressor,
+    "Random Forest": RandomForestRegressor,
+    "K-Neighbors": KNeighborsRegressor,
+    "SVR": SVR,
+}
+
+# Suchräume (Listen -> Gitter bzw. Stichprobe daraus)
+SEARCH_SPACES = {
+    "Linear Regression": {},
+    "Ridge Regression": {"alpha": [float(a) for a in np.logspace(-4, 2, 13)]},
+    "Decision Tree": {"max_depth": [None, 4, 6, 8, 12, 16], "min_samples_leaf": [1, 2, 4, 8]},
+    "Random Forest": {"n_estimators": [50, 100, 200, 400], "max_depth": [None, 8, 12, 16],
+                      "max_features": [1.0, 0.7, 0.5, "sqrt"], "min_samples_leaf": [1, 2, 4]},
+    "K-Neighbors": {"n_neighbors": [1, 2, 3, 5, 7, 10, 15], "weights": ["uniform", "distance"],
+                    "p": [1, 2]},
+    "SVR": {"C": [float(c) for c in np.logspace(-1, 3, 9)], "gamma": ["scale", 0.1, 0.3, 1.0, 3.0, 10.0],
+            "epsilon": [0.001, 0.005, 0.01, 0.05]},
+}
+
+# Modelle mit Zufall bekommen einen festen Seed
+SEEDED = {"Ridge Regression", "Decision Tree", "Random Forest"}
+
+memory = Memory(os.path.join(HERE, "cache", "benchmark"), verbose=0)
+
+
+def load_data(path="Daten/Solid_Holdup.csv"):
+    data = pd.read_csv(path).drop_duplicates(keep="first")
+    return data[FEATURE_COLS].to_numpy(float), data[TARGET_COL].to_numpy(float)
+
+
+def make_model(name: str, params: dict):
+    kwargs = dict(params)
+    if name in SEEDED:
+        kwargs.setdefault("random_state", 42)
+    return make_pipeline(MinMaxScaler(), MODELS[name](**kwargs))
+
+
+def candidates(name: str, n_iter: int, seed: int = 42) -> list:
+    """Full grid if it has at most n_iter points, else n_iter random samples of it."""
+    space = SEARCH_SPACES[name]
+    grid = ParameterGrid(space)
+    if len(grid) <= n_iter:
+        return list(grid)
+    return list(ParameterSampler(space, n_iter=n_iter, random_state=seed))
+
+
+@memory.cache
+def fit_fold(name: str, params: dict, X, y, train_idx, test_idx) -> dict:
+    """Fit one (model, params, fold); returns RMSE and R² (cached on disk, no timings)."""
+    model = make_model(name, params).fit(X[train_idx], y[train_idx])
+    y_pred = model.predict(X[test_idx])
+    return {"rmse": float(np.sqrt(mean_squared_error(y[test_idx], y_pred))),
+            "r2": float(r2_score(y[test_idx], y_pred))}
+
+
+def time_fold(name: str, params: dict, X, y, train_idx, test_idx, latency_batch: int = 1000) -> dict:
+    """Fit time and prediction latency of one (model, params, fold); never cached, run serially."""
+    model = make_model(name, params)
+    t0 = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_s = time.perf_counter() - t0
+
+    # Latenz auf einem festen Batch (Test-Fold auf latency_batch Zeilen aufgefüllt), bestes von 3
+    Xb = np.resize(X[test_idx], (latency_batch, X.shape[1]))
+    best = np.inf
+    for _ in range(3):
+        t0 = time.perf_counter()
+        model.predict(Xb)
+        best = min(best, time.perf_counter() - t0)
+    return {"fit_s": fit_s, "latency_ms_per_1k": best * 1e3 * 1000 / latency_batch}
+
+
+def run_benchmark(X, y, folds: int = 5, n_iter: int = 20, n_jobs: int = -1, seed: int = 42,
+                  models=None, time_folds: int = 1) -> pd.DataFrame:
+    """
+    All (model, params, fold) scores in parallel, then the timings serially on the
+    first time_folds folds; one row per (model, params), fold means.
+    """
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=seed).split(X))
+    tasks = [(name, params) for name in (models or MODELS) for params in candidates(name, n_iter, seed)]
+
+    out = Parallel(n_jobs=n_jobs)(
+        delayed(fit_fold)(name, params, X, y, tr, te)
+        for name, params in tasks for tr, te in splits
+    )
+    time_folds = max(1, min(time_folds, folds))
+    timings = [time_fold(name, params, X, y, tr, te)
+               for name, params in tasks for tr, te in splits[:time_folds]]
+
+    rows = []
+    for i, (name, params) in enumerate(tasks):
+        res = pd.DataFrame(out[i * folds:(i + 1) * folds])
+        tim = pd.DataFrame(timings[i * time_folds:(i + 1) * time_folds])
+        rows.append({
+            "Model": name,
+            "params": params,
+            "RMSE": res["rmse"].mean(),
+            "RMSE_std": res["rmse"].std(ddof=1),
+            "R2": res["r2"].mean(),
+            "fit_s": tim["fit_s"].mean(),
+            "latency_ms_per_1k": tim["latency_ms_per_1k"].median(),
+        })
+    return pd.DataFrame(rows)
+
+
+def best_per_model(df: pd.DataFrame) -> pd.DataFrame:
+    best = df.loc[df.groupby("Model")["RMSE"].idxmin()]
+    return best.sort_values("RMSE").reset_index(drop=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cross-validated surrogate benchmark (Solid_Holdup).")
+    ap.add_argument("--folds", type=int, default=5)
+    ap.add_argument("--n-iter", type=int, default=20, help="max. parameter sets per model")
+    ap.add_argument("--n-jobs", type=int, default=-1)
+    ap.add_argument("--time-folds", type=int, default=1,
+                    help="folds per parameter set on which fit time / latency are measured (serially)")
+    ap.add_argument("--latency-budget-ms", type=float, default=5.0,
+                    help="max. ms per 1000 predictions to count as fast enough for the optimizer loop")
+    ap.add_argument("--out", default="Benchmark_Ergebnisse.csv")
+    ap.add_argument("--export", default=None, metavar="DIR",
+                    help="refit the best parameter set per model on all data and export it as .npz")
+    args = ap.parse_args(argv)
+    os.chdir(HERE)
+
+    X, y = load_data()
+    print(f"Datashape: {X.shape}")
+
+    t0 = time.perf_counter()
+    df = run_benchmark(X, y, args.folds, args.n_iter, args.n_jobs, time_folds=args.time_folds)
+    print(f"{len(df)} parameter sets x {args.folds} folds in {time.perf_counter() - t0:.1f} s")
+
+    df.sort_values(["Model", "RMSE"]).to_csv(args.out, index=False)
+
+    best = best_per_model(df)
+    best["fast_enough"] = best["latency_ms_per_1k"] <= args.latency_budget_ms
+    pd.set_option("display.width", 160)
+    pd.set_option("display.max_colwidth", 60)
+    print("\n" + "=" * 50)
+    print(best[["Model", "RMSE", "RMSE_std", "R2", "fit_s", "latency_ms_per_1k", "fast_enough", "params"]]
+          .round(4).to_string(index=False))
+
+    usable = best[best["fast_enough"]]
+    if len(usable):
+        print(f"\nEmpfehlung: {usable.iloc[0]['Model']} {usable.iloc[0]['params']}")
+
+    if args.export:
+        export_best(best, X, y, args.export)
+    return df
+
+
+def export_best(best: pd.DataFrame, X, y, out_dir: str):
+    """Refit the best parameter set per model on all data, export to .npz and check it against sklearn."""
+    from surrogate_npz import NpzSurrogate, export_npz, validate
+
+    os.makedirs(out_dir, exist_ok=True)
+    Xb = np.resize(X, (1000, X.shape[1]))
+    print("\n" + "=" * 50)
+    for _, row in best.iterrows():
+        model = make_model(row["Model"], row["params"]).fit(X, y)
+        path = os.path.join(out_dir, row["Model"].replace(" ", "_").lower() + ".npz")
+        try:
+            export_npz(model, path, feature_names=FEATURE_COLS)
+        except ValueError as e:
+            print(f"{row['Model']:18s} not exported: {e}")
+            continue
+        check = validate(model, path, X)
+        t0 = time.perf_counter()
+        sur = NpzSurrogate(path)
+        load_ms = (time.perf_counter() - t0) * 1e3
+        t0 = time.perf_counter()
+        sur.predict(Xb)
+        pred_ms = (time.perf_counter() - t0) * 1e3
+        print(f"{row['Model']:18s} -> {path}  max|err| = {check['max_abs_err']:.2e} "
+              f"({'ok' if check['ok'] else str(check['n_mismatch']) + ' mismatches'}), "
+              f"load {load_ms:.1f} ms, {pred_ms:.2f} ms per 1k (NumPy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# surrogate_npz.py
+"""
+Trainierte Surrogate als reine NumPy-Arrays (.npz) exportieren und ohne sklearn auswerten.
+
+Die Modelle aus Analyse.py / Benchmark.py brauchen zum Vorhersagen sklearn + pandas;
+in Worker-Prozessen dominiert dieser Import den Start. Hier:
+
+  export_npz(model, path)       (braucht sklearn nur zum Lesen des Modells)
+      - Skalierung: MinMaxScaler aus einer Pipeline oder x_min/x_max wie data_scaling()
+      - unterstützt: LinearRegression / Ridge, DecisionTree / RandomForest,
+        KNeighborsRegressor, SVR (Kernel rbf oder linear)
+
+  NpzSurrogate(path).predict(X) (nur NumPy)
+      - linear:  X @ coef + b
+      - Bäume:   alle Bäume als flache Knoten-Arrays, Abstieg für alle Bäume und
+                 Samples gleichzeitig (eine Schleife über die Tiefe)
+      - kNN:     Brute-Force-Abstände blockweise, argpartition
+      - SVR:     RBF-Kernel gegen die Stützvektoren, mal dual_coef
+
+  validate(model, path, X)      Vergleich mit model.predict(X) (max. Abweichung)
+"""
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+# ----------------------------------------------------------------------
+# Export (sklearn-Objekte lesen)
+# ----------------------------------------------------------------------
+def _split_pipeline(model):
+    """(scaler or None, final estimator) for a Pipeline or a bare estimator."""
+    steps = getattr(model, "steps", None)
+    if steps is None:
+        return None, model
+    if len(steps) > 2:
+        raise ValueError("only Pipeline(MinMaxScaler, estimator) is supported")
+    return (steps[0][1] if len(steps) == 2 else None), steps[-1][1]
+
+
+def _tree_arrays(trees) -> dict:
+    # alle Bäume hintereinander; Kind-Indizes global verschoben, Blätter: left = -1
+    left, right, feat, thr, val, roots = [], [], [], [], [], []
+    offset = 0
+    depth = 0
+    for t in trees:
+        tr = t.tree_
+        n = tr.node_count
+        roots.append(offset)
+        l, r = tr.children_left.copy(), tr.children_right.copy()
+        leaf = l == -1
+        l[~leaf] += offset
+        r[~leaf] += offset
+        left.append(l)
+        right.append(r)
+        feat.append(np.where(leaf, 0, tr.feature))
+        thr.append(tr.threshold)
+        val.append(tr.value[:, 0, 0])
+        offset += n
+        depth = max(depth, tr.max_depth)
+    return {"left": np.concatenate(left).astype(np.int64), "right": np.concatenate(right).astype(np.int64),
+            "feature": np.concatenate(feat).astype(np.int64), "threshold": np.concatenate(thr),
+            "value": np.concatenate(val), "roots": np.array(roots, dtype=np.int64),
+            "max_depth": np.array(depth)}
+
+
+def export_npz(model, path: str, x_min=None, x_max=None, feature_names=None):
+    """
+    Write `model` (fitted estimator or Pipeline(MinMaxScaler, estimator)) to `path`.
+    Without a scaler in the pipeline, x_min/x_max (as in data_scaling) can be given.
+    """
+    scaler, est = _split_pipeline(model)
+    n_features = int(est.n_features_in_)
+    if scaler is not None:
+        scale, offset = np.asarray(scaler.scale_, float), np.asarray(scaler.min_, float)
+    elif x_min is not None and x_max is not None:
+        x_min, x_max = np.asarray(x_min, float), np.asarray(x_max, float)
+        scale = 1.0 / (x_max - x_min)
+        offset = -x_min * scale
+    else:
+        scale, offset = np.ones(n_features), np.zeros(n_features)
+
+    out = {"format_version": np.array(FORMAT_VERSION), "scale": scale, "offset": offset,
+           "estimator": np.array(type(est).__name__)}
+    if feature_names is not None:
+        out["feature_names"] = np.array(list(feature_names))
+
+    name = type(est).__name__
+    if name in ("LinearRegression", "Ridge"):
+        out["kind"] = np.array("linear")
+        out["coef"] = np.asarray(est.coef_, float).ravel()
+        out["intercept"] = np.array(float(np.ravel(est.intercept_)[0]))
+    elif name in ("DecisionTreeRegressor", "RandomForestRegressor", "ExtraTreesRegressor"):
+        out["kind"] = np.array("trees")
+        trees = est.estimators_ if hasattr(est, "estimators_") else [est]
+        out.update(_tree_arrays(trees))
+    elif name == "KNeighborsRegressor":
+        if callable(est.weights) or est.effective_metric_ not in ("minkowski", "euclidean", "manhattan"):
+            raise ValueError("kNN export supports uniform/distance weights and Minkowski metrics")
+        p = est.effective_metric_params_.get("p", 2) if est.effective_metric_ == "minkowski" else (
+            2 if est.effective_metric_ == "euclidean" else 1)
+        out["kind"] = np.array("knn")
+        out["X_train"] = np.asarray(est._fit_X, float)
+        out["y_train"] = np.asarray(est._y, float).ravel()
+        out["n_neighbors"] = np.array(int(est.n_neighbors))
+        out["weights"] = np.array(est.weights)
+        out["p"] = np.array(float(p))
+    elif name == "SVR":
+        if est.kernel not in ("rbf", "linear"):
+            raise ValueError("SVR export supports kernel='rbf' and 'linear'")
+        out["kind"] = np.array("svr")
+        out["kernel"] = np.array(est.kernel)
+        out["support_vectors"] = np.asarray(est.support_vectors_, float)
+        out["dual_coef"] = np.asarray(est.dual_coef_, float).ravel()
+        out["intercept"] = np.array(float(est.intercept_[0]))
+        out["gamma"] = np.array(float(est._gamma))
+    else:
+        raise ValueError(f"unsupported estimator {name}")
+
+    np.savez_compressed(path, **out)
+    return path
+
+
+# ----------------------------------------------------------------------
+# Vorhersage (nur NumPy)
+# ----------------------------------------------------------------------
+class NpzSurrogate:
+    """Vectorized NumPy predictor for a model written by export_npz()."""
+
+    def __init__(self, path: str, block: int = 4096):
+        with np.load(path, allow_pickle=False) as z:
+            self._a = {k: z[k] for k in z.files}
+        if int(self._a["format_version"]) != FORMAT_VERSION:
+            raise ValueError(f"unsupported surrogate format {int(self._a['format_version'])}")
+        self.kind = str(self._a["kind"])
+        self.estimator = str(self._a["estimator"])
+        self.block = int(block)
+        self._scale, self._offset = self._a["scale"], self._a["offset"]
+
+    @property
+    def n_features(self) -> int:
+        return len(self._scale)
+
+    def transform(self, X) -> np.ndarray:
+        return np.atleast_2d(np.asarray(X, dtype=float)) * self._scale + self._offset
+
+    def predict(self, X) -> np.ndarray:
+        Z = self.transform(X)
+        if self.kind == "linear":
+            return Z @ self._a["coef"] + float(self._a["intercept"])
+        out = np.empty(len(Z))
+        f = {"trees": self._trees, "knn": self._knn, "svr": self._svr}[self.kind]
+        for s in range(0, len(Z), self.block):
+            out[s:s + self.block] = f(Z[s:s + self.block])
+        return out
+
+    def _trees(self, Z):
+        a = self._a
+        # sklearn vergleicht in float32 -> gleiche Rundung für identische Verzweigungen
+        Zf = Z.astype(np.float32).astype(np.float64)
+        node = np.repeat(a["roots"][:, None], len(Z), axis=1)        # (n_trees, n_samples)
+        cols = np.arange(len(Z))[None, :]
+        for _ in range(int(a["max_depth"])):
+            left = a["left"][node]
+            inner = left != -1
+            if not inner.any():
+                break
+            go_left = Zf[cols, a["feature"][node]] <= a["threshold"][node]
+            node = np.where(inner, np.where(go_left, left, a["right"][node]), node)
+        return a["value"][node].mean(axis=0)
+
+    def _knn(self, Z):
+        a = self._a
+        Xt = a["X_train"]
+        step = max(1, 2_000_000 // Xt.size)     # Abstandsblock begrenzen
+        if len(Z) > step:
+            return np.concatenate([self._knn(Z[s:s + step]) for s in range(0, len(Z), step)])
+        yt, k, p = a["y_train"], int(a["n_neighbors"]), float(a["p"])
+        diff = np.abs(Z[:, None, :] - Xt[None, :, :])
+        d = np.sqrt((diff ** 2).sum(axis=2)) if p == 2 else (diff ** p).sum(axis=2) ** (1.0 / p)
+        idx = np.argpartition(d, k - 1, axis=1)[:, :k]
+        dn = np.take_along_axis(d, idx, axis=1)
+        yn = yt[idx]
+        if str(a["weights"]) == "uniform":
+            return yn.mean(axis=1)
+        # wie sklearn: exakte Treffer bekommen das ganze Gewicht
+        with np.errstate(divide="ignore"):
+            w = 1.0 / dn
+        exact = dn == 0.0
+        has_exact = exact.any(axis=1)
+        w[has_exact] = exact[has_exact]
+        return (w * yn).sum(axis=1) / w.sum(axis=1)
+
+    def _svr(self, Z):
+        a = self._a
+        SV = a["support_vectors"]
+        if str(a["kernel"]) == "linear":
+            K = Z @ SV.T
+        else:
+            d2 = (Z ** 2).sum(axis=1)[:, None] + (SV ** 2).sum(axis=1)[None, :] - 2.0 * Z @ SV.T
+            K = np.exp(-float(a["gamma"]) * np.maximum(d2, 0.0))
+        return K @ a["dual_coef"] + float(a["intercept"])
+
+
+def validate(model, path: str, X, atol: float = 1e-9, rtol: float = 1e-7) -> dict:
+    """Compare the exported predictor with model.predict(X)."""
+    ref = np.asarray(model.predict(X), dtype=float).ravel()
+    got = NpzSurrogate(path).predict(np.asarray(X, dtype=float))
+    err = np.abs(got - ref)
+    tol = atol + rtol * np.abs(ref)
+    return {"max_abs_err": float(err.max()) if err.size else 0.0,
+            "n_mismatch": int((err > tol).sum()), "ok": bool(np.all(err <= tol))}